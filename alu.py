@@ -0,0 +1,38 @@
+"""
+    alu, precomputed results of the ADC and SBC instructions for puce6502
+
+    ADDITION and SUBTRACTION are indexed by D << 17 | C << 16 | A << 8 | M,
+    the decimal and carry flags, the accumulator and the operand. An entry
+    is the (A, C, V) tuple the instruction leaves, N and Z come from A as
+    usual. The 1024 possible tuples are shared by the 256K entries.
+
+    The entries are computed with the arithmetic the cpu cores used inline,
+    the NMOS decimal adjustment included, so both the binary and the BCD
+    paths give the same results and flags as before, only faster.
+"""
+
+
+def table(subtract) :
+    """ the ADDITION table, or the SUBTRACTION one """
+
+    results = [(value & 0xFF, value >> 8 & 1, value >> 9) for value in range(0x400)]
+    entries = []
+    for decimal in (0, 1) :
+        for carry in (0, 1) :
+            for accumulator in range(0x100) :
+                for operand in range(0x100) :
+                    value8 = operand
+                    if subtract :
+                        value8 ^= 0xFF
+                        if decimal :
+                            value8 -= 0x0066
+                    value16 = (accumulator + value8 + carry) & 0xFFFF
+                    overflow = ((value16 ^ accumulator) & (value16 ^ value8) & 0x0080) != 0
+                    if decimal :
+                        value16 += ((((value16 + 0x66) ^ accumulator ^ value8) >> 3) & 0x22) * 3
+                    entries.append(results[(value16 & 0xFF) | (value16 > 0xFF) << 8 | overflow << 9])
+    return entries
+
+
+ADDITION = table(False)
+SUBTRACTION = table(True)
@@ -0,0 +1,903 @@
+"""
+    applesoft, high level emulation of the Applesoft floating point routines
+
+    The 'traps' dictionary maps the entry points of FADD, FSUB, FMULT and
+    FDIV, and of their FADDT, FSUBT, FMULTT and FDIVT variants taking ARG
+    already loaded, to python functions. The transcendental functions (SIN,
+    COS, ATN, LOG, EXP, SQR, ^) are built upon these and run faster too.
+
+    Numbers are kept in the 5 bytes format of the ROM : the exponent biased
+    by $80 (0 for zero), then 4 bytes of mantissa whose top bit is the sign
+    in memory and always set once unpacked into FAC or ARG. The functions
+    follow the ROM routines step by step, their rounding byte FACEXT and
+    their quirks included, so the results are bit exact. The registers, the
+    flags, the zero page, the return addresses and status bytes left on the
+    stack and the cycles counted by puce6502.run() are the ROM's as well.
+
+    The work is done on a copy of the zero page and of the stack, written
+    back to Memory.ram at the end. A trap returns None and lets the ROM run
+    when the language card RAM is read enabled, the cpu is in decimal mode,
+    the number to load lies in the $C000-$CFFF I/O space, or the operation
+    ends with an OVERFLOW or a DIVISION BY ZERO error.
+"""
+
+import clock
+from monitor import taken
+
+
+FAC = 0x9D                                                                      # exponent, 4 bytes of mantissa, sign
+FACSGN = 0xA2
+SHIFTSIGNEXT = 0xA4                                                             # fills the bytes shifted into FAC or RESULT
+ARG = 0xA5                                                                      # exponent, 4 bytes of mantissa, sign
+ARGSGN = 0xAA
+SGNCPR = 0xAB                                                                   # FACSGN xor ARGSGN
+FACEXT = 0xAC                                                                   # rounding byte of FAC
+RESULT = 0x62                                                                   # 4 bytes, product or quotient
+INDEX = 0x5E                                                                    # pointer to the number loaded into ARG
+EXTENSION = 0x92                                                                # rounding byte of the number not shifted
+
+PAGES = (0x00, 0x01)
+
+
+class Applesoft() :
+
+    def __init__(self, memory) :
+
+        self.memory = memory
+        self.ram = memory.ram
+        self.work = bytearray(0x200)                                            # zero page and stack
+        self.cycles = 0                                                         # cycles of the routine being emulated
+        self.traps = {0xE7A7 : self.subtract,
+                      0xE7AA : self.subtractArg,
+                      0xE7BE : self.add,
+                      0xE7C1 : self.addArg,
+                      0xE97F : self.multiply,
+                      0xE982 : self.multiplyArg,
+                      0xEA66 : self.divide,
+                      0xEA69 : self.divideArg}
+
+
+    #===================================================================== TRAPS
+
+    def subtract(self, cpu) :
+        """ $E7A7 FSUB, FAC = number at (A,Y) - FAC """
+        return self.call(cpu, True, self.fsub)
+
+
+    def subtractArg(self, cpu) :
+        """ $E7AA FSUBT, FAC = ARG - FAC """
+        return self.call(cpu, False, self.fsubt)
+
+
+    def add(self, cpu) :
+        """ $E7BE FADD, FAC = number at (A,Y) + FAC """
+        return self.call(cpu, True, self.fadd)
+
+
+    def addArg(self, cpu) :
+        """ $E7C1 FADDT, FAC = ARG + FAC, Z set when FAC is zero """
+        return self.call(cpu, False, self.faddt)
+
+
+    def multiply(self, cpu) :
+        """ $E97F FMULT, FAC = number at (A,Y) * FAC """
+        return self.call(cpu, True, self.fmult)
+
+
+    def multiplyArg(self, cpu) :
+        """ $E982 FMULTT, FAC = ARG * FAC, Z set when FAC is zero """
+        return self.call(cpu, False, self.fmultt)
+
+
+    def divide(self, cpu) :
+        """ $EA66 FDIV, FAC = number at (A,Y) / FAC """
+        return self.call(cpu, True, self.fdiv)
+
+
+    def divideArg(self, cpu) :
+        """ $EA69 FDIVT, FAC = ARG / FAC, Z set when FAC is zero """
+        return self.call(cpu, False, self.fdivt)
+
+
+    def call(self, cpu, loading, routine) :
+        """ runs the routine on a copy of the registers, the zero page and the stack """
+
+        if self.memory.LCRD or cpu.D :
+            return None
+        if loading and 0xBFFC <= cpu.A | (cpu.Y << 8) < 0xD000 :
+            return None
+
+        work = self.work
+        work[:] = self.ram[0:0x200]
+        self.A, self.X, self.Y, self.SP = cpu.A, cpu.X, cpu.Y, cpu.SP
+        self.C, self.Z, self.I, self.D = cpu.C, cpu.Z, cpu.I, cpu.D
+        self.B, self.U, self.V, self.S = cpu.B, cpu.U, cpu.V, cpu.S
+        self.cycles = 0
+        try :
+            routine()
+        except (OverflowError, ZeroDivisionError) :                             # the ROM prints the error message
+            return None
+
+        self.ram[0:0x200] = work
+        cpu.A, cpu.X, cpu.Y, cpu.SP = self.A, self.X, self.Y, self.SP
+        cpu.C, cpu.Z, cpu.I, cpu.D = self.C, self.Z, self.I, self.D
+        cpu.B, cpu.U, cpu.V, cpu.S = self.B, self.U, self.V, self.S
+        cpu.PC = ((work[0x100 + ((self.SP - 1) & 0xFF)] | (work[0x100 + self.SP] << 8)) + 1) & 0xFFFF
+        clock.ticks += self.cycles
+        return PAGES
+
+
+    #================================================================== ROUTINES
+
+    def fsub(self) :
+        """ $E7A7 FSUB """
+
+        self.jsr(0xE7A7)
+        self.loadArg()
+        self.fsubt()
+
+
+    def fsubt(self) :
+        """ $E7AA FSUBT, changes the sign of FAC and adds """
+
+        work = self.work
+        self.load(work[FACSGN] ^ 0xFF)                                          # LDA FACSGN, EOR #$FF, STA FACSGN
+        work[FACSGN] = self.A
+        self.load(self.A ^ work[ARGSGN])                                        # EOR ARGSGN, STA SGNCPR
+        work[SGNCPR] = self.A
+        self.load(work[FAC])                                                    # LDA FAC, JMP FADDT
+        self.cycles += 20
+        self.faddt()
+
+
+    def fadd(self) :
+        """ $E7BE FADD """
+
+        self.jsr(0xE7BE)
+        self.loadArg()
+        self.faddt()
+
+
+    def faddt(self) :
+        """ $E7C1 FADDT """
+
+        if self.Z :                                                             # BNE, JMP COPY_ARG_TO_FAC
+            self.cycles += 5
+            self.copyArg()
+            return
+        self.cycles += taken(0xE7C1, 0xE7C6)
+
+        work = self.work
+        self.X = work[FACEXT]                                                   # LDX FACEXT, STX ARGEXT, LDX #ARG, LDA ARG, TAY
+        work[EXTENSION] = self.X
+        self.X = ARG
+        self.load(work[ARG])
+        self.Y = self.A
+        self.cycles += 13
+        if self.Z :                                                             # BEQ to an RTS, ARG is zero
+            self.cycles += taken(0xE7CF, 0xE79F)
+            self.rts()
+            return
+        self.cycles += 2
+
+        self.C = True                                                           # SEC, SBC FAC
+        self.sbc(work[FAC])
+        self.cycles += 5
+        if self.Z :                                                             # BEQ, same exponents
+            self.cycles += taken(0xE7D4, 0xE7FA)
+        else :
+            self.cycles += 2
+            if not self.C :                                                     # BCC, shift ARG : LDY #0, STY FACEXT
+                self.cycles += taken(0xE7D6, 0xE7EA) + 5
+                self.Y = 0
+                work[FACEXT] = 0
+                self.nz(0)
+            else :                                                              # swap the roles, shift FAC
+                work[FAC] = self.Y                                              # STY FAC, LDY ARGSGN, STY FACSGN
+                self.Y = work[ARGSGN]
+                work[FACSGN] = self.Y
+                self.load(self.A ^ 0xFF)                                        # EOR #$FF, ADC #0
+                self.adc(0x00)
+                self.Y = 0                                                      # LDY #0, STY ARGEXT, LDX #FAC
+                work[EXTENSION] = 0
+                self.X = FAC
+                self.nz(FAC)
+                self.cycles += 22 + taken(0xE7E8, 0xE7EE)
+            self.compare(self.A, 0xF9)                                          # CMP #$F9
+            self.cycles += 2
+            if self.S :                                                         # BMI, JSR SHIFT_RIGHT, BCC
+                self.cycles += taken(0xE7F0, 0xE7B9)
+                self.jsr(0xE7B9)
+                self.shiftRight()
+                self.cycles += taken(0xE7BC, 0xE7FA)
+            else :                                                              # TAY, LDA FACEXT, LSR 1,X, JSR SHIFT_RIGHT_4
+                self.Y = self.A
+                self.load(work[FACEXT])
+                self.lsr(self.X + 1)
+                self.cycles += 13
+                self.jsr(0xE7F7)
+                self.shiftBits(0xE907)
+
+        value = work[SGNCPR]                                                    # BIT SGNCPR
+        self.S = value > 0x7F
+        self.V = (value & 0x40) != 0
+        self.Z = (self.A & value) == 0
+        self.cycles += 3
+        if not self.S :                                                         # BPL, same signs
+            self.cycles += taken(0xE7FC, 0xE855)
+            self.sum()
+        else :
+            self.cycles += 2
+            self.difference()
+
+
+    def sum(self) :
+        """ $E855, adds the mantissas """
+
+        work = self.work
+        self.adc(work[EXTENSION])                                               # ADC ARGEXT, STA FACEXT
+        work[FACEXT] = self.A
+        for target, source in ((0xA1, 0xA9), (0xA0, 0xA8), (0x9F, 0xA7), (0x9E, 0xA6)) :
+            self.load(work[target])
+            self.adc(work[source])
+            work[target] = self.A
+        self.cycles += 45                                                       # JMP included
+        self.carry(0xE88D)
+
+
+    def difference(self) :
+        """ $E7FE, subtracts the shifted mantissa from the other one """
+
+        work = self.work
+        self.Y = FAC                                                            # LDY #FAC, CPX #ARG, BEQ
+        self.nz(FAC)
+        self.compare(self.X, ARG)
+        if self.Z :
+            self.cycles += 4 + taken(0xE802, 0xE806)
+        else :
+            self.Y = ARG                                                        # LDY #ARG
+            self.nz(ARG)
+            self.cycles += 8
+
+        self.C = True                                                           # SEC, EOR #$FF, ADC ARGEXT, STA FACEXT
+        self.load(self.A ^ 0xFF)
+        self.adc(work[EXTENSION])
+        work[FACEXT] = self.A
+        for offset, target in ((4, 0xA1), (3, 0xA0), (2, 0x9F), (1, 0x9E)) :    # LDA 4,Y, SBC 4,X, STA FAC+4 ...
+            self.load(work[self.Y + offset])
+            self.sbc(work[(self.X + offset) & 0xFF])
+            work[target] = self.A
+        self.cycles += 54
+
+        if self.C :                                                             # BCS NORMALIZE
+            self.cycles += taken(0xE829, 0xE82E)
+        else :                                                                  # JSR COMPLEMENT
+            self.cycles += 2
+            self.jsr(0xE82B)
+            self.complement()
+        self.normalize()
+
+
+    def normalize(self) :
+        """ $E82E NORMALIZE_FAC, shifts the mantissa left until its top bit is set """
+
+        work = self.work
+        self.Y = 0                                                              # LDY #0, TYA, CLC
+        self.load(0)
+        self.C = False
+        self.cycles += 6
+
+        while True :
+            self.X = work[0x9E]                                                 # LDX FAC+1, BNE
+            self.nz(self.X)
+            self.cycles += 3
+            if not self.Z :
+                self.cycles += taken(0xE834, 0xE880)
+                break
+            work[0x9E] = work[0x9F]                                             # shifts the bytes, STY FACEXT
+            work[0x9F] = work[0xA0]
+            work[0xA0] = work[0xA1]
+            work[0xA1] = self.X = work[FACEXT]
+            work[FACEXT] = self.Y
+            self.nz(self.X)
+            self.adc(0x08)                                                      # ADC #8, CMP #32, BNE
+            self.compare(self.A, 0x20)
+            self.cycles += 33
+            if self.Z :
+                self.cycles += 2
+                self.zero(0xE84E)
+                return
+            self.cycles += taken(0xE84C, 0xE832)
+
+        while not self.S :                                                      # BPL, ADC #1, ASL FACEXT, ROL FAC+4 ... FAC+1
+            self.cycles += taken(0xE880, 0xE874) + 27
+            self.adc(0x01)
+            self.asl(FACEXT)
+            for address in (0xA1, 0xA0, 0x9F, 0x9E) :
+                self.rol(address)
+        self.cycles += 2
+
+        self.C = True                                                           # SEC, SBC FAC, BCS
+        self.sbc(work[FAC])
+        self.cycles += 5
+        if self.C :
+            self.cycles += taken(0xE885, 0xE84E)
+            self.zero(0xE84E)
+            return
+        self.load(self.A ^ 0xFF)                                                # EOR #$FF, ADC #1, STA FAC
+        self.adc(0x01)
+        work[FAC] = self.A
+        self.cycles += 9
+        self.carry(0xE88D)
+
+
+    def zero(self, entry) :
+        """ $E84E ZERO_FAC, or $E852 """
+
+        if entry == 0xE84E :                                                    # LDA #0, STA FAC
+            self.load(0)
+            self.work[FAC] = 0
+            self.cycles += 5
+        self.work[FACSGN] = self.A                                              # STA FACSGN
+        self.cycles += 3
+        self.rts()
+
+
+    def carry(self, entry) :
+        """ $E88D, or $E88F, shifts the carry into the mantissa """
+
+        work = self.work
+        if entry == 0xE88D :                                                    # BCC to an RTS
+            if not self.C :
+                self.cycles += taken(0xE88D, 0xE89D)
+                self.rts()
+                return
+            self.cycles += 2
+
+        self.inc(FAC)                                                           # INC FAC, BEQ OVERFLOW
+        if self.Z :
+            raise OverflowError
+        for address in (0x9E, 0x9F, 0xA0, 0xA1, FACEXT) :                       # ROR FAC+1 ... FACEXT
+            self.ror(address)
+        self.cycles += 32
+        self.rts()
+
+
+    def complement(self) :
+        """ $E89E COMPLEMENT_FAC, negates the mantissa and the sign """
+
+        work = self.work
+        for address in (FACSGN, 0x9E, 0x9F, 0xA0, 0xA1, FACEXT) :               # LDA, EOR #$FF, STA
+            self.load(work[address] ^ 0xFF)
+            work[address] = self.A
+        self.cycles += 48
+        self.increment(0xE8C2)
+
+
+    def increment(self, entry) :
+        """ $E8C2 INCREMENT_FAC_MANTISSA, from FACEXT, or $E8C6 from FAC+4 """
+
+        chain = ((FACEXT, 0xE8C4), (0xA1, 0xE8C8), (0xA0, 0xE8CC), (0x9F, 0xE8D0), (0x9E, None))
+        if entry == 0xE8C6 :
+            chain = chain[1:]
+        for address, branch in chain :                                          # INC, BNE to an RTS
+            self.inc(address)
+            self.cycles += 5
+            if branch is None :
+                break
+            if not self.Z :
+                self.cycles += taken(branch, 0xE8D4)
+                break
+            self.cycles += 2
+        self.rts()
+
+
+    def shiftRight(self, entry = 0xE8F0) :
+        """ $E8F0 SHIFT_RIGHT, or $E8DA from RESULT : shifts the number at X+1 by -A bits """
+
+        if entry == 0xE8DA :                                                    # LDX #RESULT-1
+            self.X = RESULT - 1
+            self.nz(self.X)
+            self.cycles += 2
+            self.shiftBytes()
+
+        work = self.work
+        while True :                                                            # ADC #8, BMI, BEQ
+            self.adc(0x08)
+            self.cycles += 2
+            if self.S :
+                self.cycles += taken(0xE8F2, 0xE8DC)
+                self.shiftBytes()
+                continue
+            self.cycles += 2
+            if self.Z :
+                self.cycles += taken(0xE8F4, 0xE8DC)
+                self.shiftBytes()
+                continue
+            self.cycles += 2
+            break
+
+        self.sbc(0x08)                                                          # SBC #8, TAY, LDA FACEXT, BCS
+        self.Y = self.A
+        self.load(work[FACEXT])
+        self.cycles += 7
+        if self.C :
+            self.cycles += taken(0xE8FB, 0xE911) + 2                            # CLC
+            self.C = False
+            self.rts()
+            return
+        self.cycles += 2
+        self.shiftBits(0xE8FD)
+
+
+    def shiftBytes(self) :
+        """ $E8DC, shifts the number at X+1 right by one byte into FACEXT """
+
+        work = self.work
+        x = self.X
+        work[FACEXT] = work[(x + 4) & 0xFF]                                     # LDY 4,X, STY FACEXT ... LDY SHIFTSIGNEXT, STY 1,X
+        work[(x + 4) & 0xFF] = work[(x + 3) & 0xFF]
+        work[(x + 3) & 0xFF] = work[(x + 2) & 0xFF]
+        work[(x + 2) & 0xFF] = work[(x + 1) & 0xFF]
+        work[(x + 1) & 0xFF] = self.Y = work[SHIFTSIGNEXT]
+        self.nz(self.Y)
+        self.cycles += 38
+
+
+    def shiftBits(self, entry) :
+        """ $E8FD, or $E907, shifts the number at X+1 and A right by one bit, -Y times """
+
+        x = self.X
+        while True :
+            if entry == 0xE8FD :                                                # ASL 1,X, BCC, INC 1,X
+                self.asl(x + 1)
+                if self.C :
+                    self.inc(x + 1)
+                    self.cycles += 8
+                else :
+                    self.cycles += taken(0xE8FF, 0xE903)
+                self.ror(x + 1)                                                 # ROR 1,X, ROR 1,X
+                self.ror(x + 1)
+                self.cycles += 18
+            entry = 0xE8FD
+            self.ror(x + 2)                                                     # ROR 2,X ... ROR A, INY, BNE
+            self.ror(x + 3)
+            self.ror(x + 4)
+            self.rorA()
+            self.Y = (self.Y + 1) & 0xFF
+            self.nz(self.Y)
+            self.cycles += 22
+            if self.Z :
+                break
+            self.cycles += taken(0xE90F, 0xE8FD)
+
+        self.C = False                                                          # CLC
+        self.cycles += 4
+        self.rts()
+
+
+    def fmult(self) :
+        """ $E97F FMULT """
+
+        self.jsr(0xE97F)
+        self.loadArg()
+        self.fmultt()
+
+
+    def fmultt(self) :
+        """ $E982 FMULTT """
+
+        if self.Z :                                                             # BNE, JMP to an RTS
+            self.cycles += 5
+            self.rts()
+            return
+        self.cycles += taken(0xE982, 0xE987)
+        self.jsr(0xE987)
+        if not self.addExponents() :
+            return
+
+        work = self.work
+        self.load(0)                                                            # LDA #0, STA RESULT ... RESULT+3
+        work[RESULT : RESULT + 4] = bytes(4)
+        self.cycles += 14
+        for address, call in ((FACEXT, 0xE996), (0xA1, 0xE99B), (0xA0, 0xE9A0), (0x9F, 0xE9A5)) :
+            self.load(work[address])                                            # LDA, JSR MULTIPLY_1
+            self.cycles += 3
+            self.jsr(call)
+            if self.Z :                                                         # BNE, JMP SHIFT_RESULT_RIGHT
+                self.cycles += 5
+                self.shiftRight(0xE8DA)
+            else :
+                self.cycles += taken(0xE9B0, 0xE9B5)
+                self.multiplyBits()
+        self.load(work[0x9E])                                                   # LDA FAC+1, JSR MULTIPLY_2
+        self.cycles += 3
+        self.jsr(0xE9AA)
+        self.multiplyBits()
+        self.cycles += 3                                                        # JMP COPY_RESULT_INTO_FAC
+        self.copyResult()
+
+
+    def multiplyBits(self) :
+        """ $E9B5, adds ARG to RESULT for each bit of A and shifts RESULT right """
+
+        work = self.work
+        self.lsrA()                                                             # LSR, ORA #$80
+        self.load(self.A | 0x80)
+        self.cycles += 4
+        while True :
+            self.Y = self.A                                                     # TAY, BCC
+            self.nz(self.Y)
+            if self.C :                                                         # CLC, LDA RESULT+3, ADC ARG+4, STA RESULT+3 ...
+                self.C = False
+                for target, source in ((0x65, 0xA9), (0x64, 0xA8), (0x63, 0xA7), (0x62, 0xA6)) :
+                    self.load(work[target])
+                    self.adc(work[source])
+                    work[target] = self.A
+                self.cycles += 42
+            else :
+                self.cycles += 2 + taken(0xE9B9, 0xE9D4)
+            for address in (0x62, 0x63, 0x64, 0x65, FACEXT) :                   # ROR RESULT ... FACEXT, TYA, LSR, BNE
+                self.ror(address)
+            self.load(self.Y)
+            self.lsrA()
+            self.cycles += 29
+            if self.Z :
+                break
+            self.cycles += taken(0xE9E0, 0xE9B8)
+        self.cycles += 2
+        self.rts()
+
+
+    def loadArg(self) :
+        """ $E9E3 LOAD_ARG_FROM_YA, unpacks the number at (A,Y) into ARG """
+
+        work = self.work
+        address = self.A | (self.Y << 8)
+        work[INDEX] = self.A                                                    # STA INDEX, STY INDEX+1
+        work[INDEX + 1] = self.Y
+        work[0xA9] = self.read(address + 4)                                     # LDY #4, LDA (INDEX),Y, STA ARG+4 ...
+        work[0xA8] = self.read(address + 3)
+        work[0xA7] = self.read(address + 2)
+        work[ARGSGN] = self.read(address + 1)
+        work[SGNCPR] = work[ARGSGN] ^ work[FACSGN]
+        work[0xA6] = work[ARGSGN] | 0x80
+        work[ARG] = self.read(address)
+        self.Y = 0
+        self.load(work[FAC])                                                    # LDA FAC
+        crossed = sum(1 for offset in range(5) if (address & 0xFF) + offset > 0xFF)
+        self.cycles += 73 + crossed
+        self.rts()
+
+
+    def addExponents(self) :
+        """ $EA0E ADD_EXPONENTS, returns False when the caller is left with a zero FAC """
+
+        work = self.work
+        self.load(work[ARG])                                                    # LDA ARG, BEQ
+        self.cycles += 3
+        if self.Z :
+            self.cycles += taken(0xEA10, 0xEA31)
+            self.underflow()
+            return False
+        self.C = False                                                          # CLC, ADC FAC
+        self.adc(work[FAC])
+        self.cycles += 7
+        if not self.C :                                                         # BCC, BPL
+            self.cycles += taken(0xEA15, 0xEA1B)
+            if not self.S :
+                self.cycles += taken(0xEA1B, 0xEA31)
+                self.underflow()
+                return False
+            self.cycles += 2
+        else :                                                                  # BMI OVERFLOW, CLC, BIT $1410
+            if self.S :
+                raise OverflowError
+            self.C = False
+            self.cycles += 10
+
+        self.adc(0x80)                                                          # ADC #$80, STA FAC, BNE
+        work[FAC] = self.A
+        self.cycles += 5
+        if self.Z :                                                             # JMP to STA FACSGN, RTS
+            self.cycles += 5
+            self.zero(0xE852)
+            return True
+        self.cycles += taken(0xEA21, 0xEA26)
+        self.load(work[SGNCPR])                                                 # LDA SGNCPR, STA FACSGN
+        work[FACSGN] = self.A
+        self.cycles += 6
+        self.rts()
+        return True
+
+
+    def underflow(self) :
+        """ $EA31, drops the caller's return address and zeroes FAC """
+
+        self.pull()                                                             # PLA, PLA, JMP ZERO_FAC
+        self.pull()
+        self.cycles += 3
+        self.zero(0xE84E)
+
+
+    def fdiv(self) :
+        """ $EA66 FDIV """
+
+        self.jsr(0xEA66)
+        self.loadArg()
+        self.fdivt()
+
+
+    def fdivt(self) :
+        """ $EA69 FDIVT """
+
+        if self.Z :                                                             # BEQ DIVISION BY ZERO
+            raise ZeroDivisionError
+        self.cycles += 2
+        self.jsr(0xEA6B)                                                        # JSR ROUND_FAC
+        self.roundFac()
+
+        work = self.work
+        self.load(0)                                                            # LDA #0, SEC, SBC FAC, STA FAC
+        self.C = True
+        self.sbc(work[FAC])
+        work[FAC] = self.A
+        self.cycles += 10
+        self.jsr(0xEA75)
+        if not self.addExponents() :
+            return
+        self.inc(FAC)                                                           # INC FAC, BEQ OVERFLOW
+        if self.Z :
+            raise OverflowError
+        self.X = 0xFC                                                           # LDX #-4, LDA #1
+        self.load(0x01)
+        self.cycles += 11
+
+        comparing = True
+        while True :
+            if comparing :                                                      # LDY ARG+1, CPY FAC+1, BNE ...
+                pairs = ((0xA6, 0x9E, 0xEA84), (0xA7, 0x9F, 0xEA8A), (0xA8, 0xA0, 0xEA90), (0xA9, 0xA1, None))
+                for source, target, branch in pairs :
+                    self.Y = work[source]
+                    self.compare(self.Y, work[target])
+                    self.cycles += 6
+                    if branch is None :
+                        break
+                    if not self.Z :
+                        self.cycles += taken(branch, 0xEA96)
+                        break
+                    self.cycles += 2
+
+            self.php()                                                          # PHP, ROL, BCC
+            self.rolA()
+            self.cycles += 2
+            if not self.C :
+                self.cycles += taken(0xEA98, 0xEAA3)
+            else :                                                              # INX, STA RESULT+3,X, BEQ, BPL
+                self.X = (self.X + 1) & 0xFF
+                self.nz(self.X)
+                work[(0x65 + self.X) & 0xFF] = self.A
+                self.cycles += 8
+                if self.Z :                                                     # LDA #$40, BNE
+                    self.load(0x40)
+                    self.cycles += taken(0xEA9D, 0xEAD1) + 2 + taken(0xEAD3, 0xEAA3)
+                else :
+                    self.cycles += 2
+                    if not self.S :                                             # ASL x6, STA FACEXT, PLP, JMP COPY_RESULT_INTO_FAC
+                        self.cycles += taken(0xEA9F, 0xEAD5)
+                        self.C = (self.A & 0x04) != 0
+                        self.load((self.A << 6) & 0xFF)
+                        work[FACEXT] = self.A
+                        self.cycles += 15
+                        self.plp()
+                        self.cycles += 3
+                        self.copyResult()
+                        return
+                    self.load(0x01)                                             # LDA #1
+                    self.cycles += 4
+
+            self.plp()                                                          # PLP, BCS
+            if self.C :                                                         # TAY, LDA ARG+4, SBC FAC+4, STA ARG+4 ... TYA, JMP
+                self.cycles += taken(0xEAA4, 0xEAB4)
+                self.Y = self.A
+                for target, source in ((0xA9, 0xA1), (0xA8, 0xA0), (0xA7, 0x9F), (0xA6, 0x9E)) :
+                    self.load(work[target])
+                    self.sbc(work[source])
+                    work[target] = self.A
+                self.load(self.Y)
+                self.cycles += 43
+            else :
+                self.cycles += 2
+            self.asl(0xA9)                                                      # ASL ARG+4, ROL ARG+3 ... ARG+1
+            for address in (0xA8, 0xA7, 0xA6) :
+                self.rol(address)
+            self.cycles += 20
+            if self.C :                                                         # BCS, BMI, BPL
+                self.cycles += taken(0xEAAE, 0xEA96)
+                comparing = False
+            elif self.S :
+                self.cycles += 2 + taken(0xEAB0, 0xEA80)
+                comparing = True
+            else :
+                self.cycles += 4 + taken(0xEAB2, 0xEA96)
+                comparing = False
+
+
+    def copyResult(self) :
+        """ $EAE6 COPY_RESULT_INTO_FAC, then normalizes """
+
+        work = self.work
+        work[0x9E : 0xA2] = work[RESULT : RESULT + 4]                           # LDA RESULT, STA FAC+1 ... JMP NORMALIZE_FAC
+        self.load(work[0x9E + 3])
+        self.cycles += 27
+        self.normalize()
+
+
+    def copyArg(self) :
+        """ $EB53 COPY_ARG_TO_FAC """
+
+        work = self.work
+        self.load(work[ARGSGN])                                                 # LDA ARGSGN, STA FACSGN, LDX #5
+        work[FACSGN] = self.A
+        work[FAC : FAC + 5] = work[ARG : ARG + 5]                               # LDA ARG-1,X, STA FAC-1,X, DEX, BNE
+        self.load(work[ARG])
+        self.X = 0
+        self.nz(0)
+        work[FACEXT] = 0                                                        # STX FACEXT
+        self.cycles += 8 + 4 * (10 + taken(0xEB5E, 0xEB59)) + 12 + 3
+        self.rts()
+
+
+    def roundFac(self) :
+        """ $EB72 ROUND_FAC, adds the top bit of FACEXT to the mantissa """
+
+        self.load(self.work[FAC])                                               # LDA FAC, BEQ to an RTS
+        self.cycles += 3
+        if self.Z :
+            self.cycles += taken(0xEB74, 0xEB71)
+            self.rts()
+            return
+        self.asl(FACEXT)                                                        # ASL FACEXT, BCC to an RTS
+        self.cycles += 7
+        if not self.C :
+            self.cycles += taken(0xEB78, 0xEB71)
+            self.rts()
+            return
+        self.cycles += 2
+        self.jsr(0xEB7A)                                                        # JSR INCREMENT_MANTISSA, BNE to an RTS
+        self.increment(0xE8C6)
+        if not self.Z :
+            self.cycles += taken(0xEB7D, 0xEB71)
+            self.rts()
+            return
+        self.cycles += 5                                                        # JMP
+        self.carry(0xE88F)
+
+
+    #=================================================================== HELPERS
+
+    def read(self, address) :
+        address &= 0xFFFF
+        return self.work[address] if address < 0x200 else self.memory.readMem(address)
+
+
+    def nz(self, value) :
+        self.Z = value == 0
+        self.S = value > 0x7F
+
+
+    def load(self, value) :
+        self.A = value
+        self.Z = value == 0
+        self.S = value > 0x7F
+
+
+    def adc(self, value) :
+        value16 = self.A + value + self.C
+        self.V = ((value16 ^ self.A) & (value16 ^ value) & 0x80) != 0
+        self.C = value16 > 0xFF
+        self.load(value16 & 0xFF)
+
+
+    def sbc(self, value) :
+        self.adc(value ^ 0xFF)
+
+
+    def compare(self, register, value) :
+        self.Z = register == value
+        self.S = ((register - value) & 0x80) != 0
+        self.C = register >= value
+
+
+    def asl(self, address) :                                                    # the callers count the cycles
+        value = self.work[address & 0xFF] << 1
+        self.C = value > 0xFF
+        self.work[address & 0xFF] = value & 0xFF
+        self.nz(value & 0xFF)
+
+
+    def rol(self, address) :
+        value = (self.work[address & 0xFF] << 1) | self.C
+        self.C = value > 0xFF
+        self.work[address & 0xFF] = value & 0xFF
+        self.nz(value & 0xFF)
+
+
+    def ror(self, address) :
+        value = self.work[address & 0xFF]
+        result = (value >> 1) | (self.C << 7)
+        self.C = (value & 0x01) != 0
+        self.work[address & 0xFF] = result
+        self.nz(result)
+
+
+    def lsr(self, address) :
+        value = self.work[address & 0xFF]
+        self.C = (value & 0x01) != 0
+        self.work[address & 0xFF] = value >> 1
+        self.nz(value >> 1)
+
+
+    def inc(self, address) :
+        value = (self.work[address & 0xFF] + 1) & 0xFF
+        self.work[address & 0xFF] = value
+        self.nz(value)
+
+
+    def rolA(self) :
+        value = (self.A << 1) | self.C
+        self.C = value > 0xFF
+        self.load(value & 0xFF)
+
+
+    def rorA(self) :
+        value = self.A
+        result = (value >> 1) | (self.C << 7)
+        self.C = (value & 0x01) != 0
+        self.load(result)
+
+
+    def lsrA(self) :
+        self.C = (self.A & 0x01) != 0
+        self.load(self.A >> 1)
+
+
+    def push(self, value) :
+        self.work[0x100 + self.SP] = value
+        self.SP = (self.SP - 1) & 0xFF
+        self.cycles += 3
+
+
+    def pull(self) :
+        self.SP = (self.SP + 1) & 0xFF
+        self.load(self.work[0x100 + self.SP])
+        self.cycles += 4
+
+
+    def php(self) :
+        self.push(self.C | self.Z << 1 | self.I << 2 | self.D << 3 | 0x10 | self.U << 5 | self.V << 6 | self.S << 7)
+
+
+    def plp(self) :
+        self.SP = (self.SP + 1) & 0xFF
+        value = self.work[0x100 + self.SP]
+        self.C = value & 0x01
+        self.Z = value >> 1 & 0x01
+        self.I = value >> 2 & 0x01
+        self.D = value >> 3 & 0x01
+        self.B = value >> 4 & 0x01
+        self.U = 1
+        self.V = value >> 6 & 0x01
+        self.S = value >> 7 & 0x01
+        self.cycles += 4
+
+
+    def jsr(self, address) :
+        back = (address + 2) & 0xFFFF                                           # the address pushed is the last byte of JSR
+        self.push(back >> 8)
+        self.push(back & 0xFF)
+
+
+    def rts(self) :
+        self.SP = (self.SP + 2) & 0xFF
+        self.cycles += 6
@@ -0,0 +1,114 @@
+#!/bin/env python3
+
+"""
+  Tests of the Applesoft floating point traps against the ROM
+
+  FSUB, FADD, FMULT and FDIV, and their FSUBT, FADDT, FMULTT and FDIVT
+  entries taking ARG already loaded, are called with a JSR, once trapped by
+  applesoft.Applesoft and once running the Apple II+ ROM, from the same
+  seeded random state : FAC, ARG, FACEXT, the number packed at (A,Y), the
+  stack pointer and the flags, the decimal one included. Both must return
+  with the same registers, flags, RAM below $C000 and clock ticks.
+
+  The entries taking ARG are called as the ROM does, A holding the exponent
+  of FAC and SGNCPR the sign of the result. The overflows and divisions by
+  zero end in the error handler of the ROM, waiting for a key at the prompt :
+  those calls must not return when trapped either.
+"""
+
+import headless, applesoft, puce6502, clock
+import random, sys
+
+
+CALL = 0x0300                                                                   # JSR routine
+RETURN = 0x0303                                                                 # JMP RETURN, where the calls stop
+NUMBER = 0x0310                                                                 # the number packed at (A,Y)
+LIMIT = 100000                                                                  # cycles, FADD takes up to about 12000
+ROUTINES = {"FSUB" : 0xE7A7, "FSUBT" : 0xE7AA, "FADD" : 0xE7BE, "FADDT" : 0xE7C1,
+            "FMULT" : 0xE97F, "FMULTT" : 0xE982, "FDIV" : 0xEA66, "FDIVT" : 0xEA69}
+
+
+def setup(rng, ram, cpu, loading) :
+    """ a random state, the same for the same seed """
+
+    ram[: 0xC000] = bytes(0xC000)
+    ram[applesoft.FAC : applesoft.FACEXT + 1] = bytes(rng.randrange(0x100) for i in range(16))
+    ram[NUMBER : NUMBER + 5] = bytes(rng.randrange(0x100) for i in range(5))
+    for address in (applesoft.FAC, applesoft.ARG, NUMBER) :                     # zero, now and then
+        if rng.random() < 0.1 :
+            ram[address] = 0x00
+    ram[applesoft.FAC + 1] |= 0x80                                              # FAC and ARG are unpacked, their mantissa normalized
+    ram[applesoft.ARG + 1] |= 0x80
+    ram[applesoft.SGNCPR] = ram[applesoft.FACSGN] ^ ram[applesoft.ARGSGN]
+    cpu.X, cpu.SP = rng.randrange(0x100), rng.randrange(0x100)
+    cpu.setP(rng.randrange(0x100) & ~cpu.DECIM if rng.random() < 0.9 else rng.randrange(0x100))
+    if loading :
+        cpu.A, cpu.Y = NUMBER & 0xFF, NUMBER >> 8
+    else :                                                                      # LDA FAC, as before the JMP
+        cpu.A, cpu.Y = ram[applesoft.FAC], rng.randrange(0x100)
+        cpu.Z, cpu.S = cpu.A == 0, cpu.A > 0x7F
+
+
+def call(cpu, ram, routine, seed) :
+    """ the state left by the routine called from the random state 'seed' """
+
+    setup(random.Random(seed), ram, cpu, routine in (0xE7A7, 0xE7BE, 0xE97F, 0xEA66))
+    ram[CALL : RETURN + 3] = bytes((0x20, routine & 0xFF, routine >> 8, 0x4C, RETURN & 0xFF, RETURN >> 8))
+    for cache in (getattr(cpu, "translator", None), getattr(cpu, "decoder", None)) :
+        if cache is not None :                                                  # the code changed behind the cpu's back
+            cache.flush()
+    cpu.PC = CALL
+
+    start = clock.ticks
+    while cpu.PC != RETURN and clock.ticks - start < LIMIT :
+        cpu.run(1)
+    return {"A" : cpu.A, "X" : cpu.X, "Y" : cpu.Y, "SP" : cpu.SP, "P" : cpu.getP(),
+            "PC" : cpu.PC, "ticks" : clock.ticks - start, "ram" : bytes(ram[: 0xC000])}
+
+
+def compare(expected, state) :
+    """ the differences between two states, as text """
+
+    differences = []
+    for name in expected :
+        if name == "ram" and expected["ram"] != state["ram"] :
+            address = next(i for i in range(0xC000) if expected["ram"][i] != state["ram"][i])
+            differences.append(f"ram[{address:04X}]={state['ram'][address]:02X} instead of {expected['ram'][address]:02X}")
+        elif name != "ram" and expected[name] != state[name] :
+            differences.append(f"{name}={state[name]:X} instead of {expected[name]:X}")
+    return ", ".join(differences)
+
+
+if len(sys.argv) > 1 and not sys.argv[1].isdigit() :
+    print("Usage : applesoftTests.py [calls] [tree|table|locals|lazy|decoded|blocks ...]", end = '\n\n')
+    print("calls FSUB, FADD, FMULT and FDIV, and their T entries, from random states (200 each),")
+    print("trapped and from the ROM, and compares the registers, the RAM and the cycles")
+    print("the optional last arguments select the cpu cores running the trapped calls (default is tree, lazy and decoded)")
+    exit()
+
+calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+cores = sys.argv[2:] or ["tree", "lazy", "decoded"]
+
+machine = headless.Machine(None, "tree", traps = False)                         # the ROM, without traps
+mem = machine.mem
+fpu = applesoft.Applesoft(mem)
+trapped = {core : puce6502.Puce6502(mem.readMem, mem.writeMem, core, mem.getBank, mem.ram, fpu.traps) for core in cores}
+
+failures = 0
+for name, routine in ROUTINES.items() :
+    for seed in range(calls) :
+        expected = call(machine.cpu, mem.ram, routine, seed)
+        for core, cpu in trapped.items() :
+            state = call(cpu, mem.ram, routine, seed)
+            if expected["PC"] != RETURN :                                       # the trap must have declined too
+                differences = "a return" if state["PC"] == RETURN else ""
+            else :
+                differences = compare(expected, state)
+            if differences :
+                print(f"{name} seed {seed} : the trap on the {core} core left {differences}")
+                failures += 1
+
+if failures :
+    print(f"\n{failures} failures")
+    exit(1)
+print(f"{calls} calls of {', '.join(ROUTINES)}, traps on the {', '.join(cores)} cores : SUCCESS !")
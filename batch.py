@@ -0,0 +1,170 @@
+#!/bin/env python3
+
+"""
+    batch, boots a library of floppy images and checks what they display
+
+    Each .nib is booted in its own process by a headless.Machine and run for
+    a number of frames. The sha1 of the framebuffer is recorded at the chosen
+    frames, and optionally saved as a PNG. As many images as there are cores
+    run at the same time, an image still running after the timeout is killed.
+
+    With --save, the hashes of each image are written into a baseline
+    directory, one json file per image. With --baseline, they are compared
+    with the ones of a previous run, any difference is flagged as a
+    regression and the exit status is 1.
+
+    Usage : python3 batch.py nib/                         run every image of nib/
+            python3 batch.py --save baseline nib/           record the hashes
+            python3 batch.py --baseline baseline nib/       and compare later
+            python3 batch.py --at 60,300,600 --png frames "nib/DOS 3.3.nib"
+"""
+
+import sys, os, time, json, glob, hashlib, argparse
+import multiprocessing, multiprocessing.connection
+
+
+def boot(floppy, frames, at, core, backend, png) :
+    """ runs floppy in a headless machine, returns the hashes of the frames listed in at """
+
+    import headless, clock                                                      # in the worker process, each one has its own clock.ticks
+
+    machine = headless.Machine(floppy, core, backend = backend)
+    name = os.path.basename(floppy)[:-4]
+    hashes = {}
+    ticks = clock.ticks
+    skipped = machine.skippedCycles()
+    start = time.perf_counter()
+    for frame in range(1, frames + 1) :
+        machine.run(1)
+        if frame in at :
+            pixels = machine.framebuffer()
+            hashes[frame] = hashlib.sha1(pixels).hexdigest()
+            if png :
+                os.makedirs(os.path.join(png, name), exist_ok = True)
+                with open(os.path.join(png, name, f"{frame:05d}.png"), "wb") as file :
+                    file.write(machine.screen.png())
+    elapsed = time.perf_counter() - start
+    return {"hashes" : hashes,
+            "seconds" : elapsed,
+            "mhz" : (clock.ticks - ticks) / elapsed / 1e6,
+            "cycles" : clock.ticks - ticks,
+            "skippedCycles" : machine.skippedCycles() - skipped,                # the gain of the "blocks" core's idle and counted loops
+            "toggles" : machine.speaker.toggles}
+
+
+def worker(connection, *arguments) :
+    try :
+        connection.send(("done", boot(*arguments)))
+    except Exception as error :
+        connection.send(("error", f"{type(error).__name__} : {error}"))
+    connection.close()
+
+
+def runAll(floppies, frames, at, core, backend, png, jobs, timeout) :
+    """ boots the floppies, jobs at a time, and returns their results by name """
+
+    pending = list(floppies)
+    running = {}                                                                # connection -> (floppy, process, deadline)
+    results = {}
+    while pending or running :
+        while pending and len(running) < jobs :
+            floppy = pending.pop(0)
+            receiver, sender = multiprocessing.Pipe(False)
+            process = multiprocessing.Process(target = worker, args = (sender, floppy, frames, at, core, backend, png))
+            process.start()
+            sender.close()                                                      # only the worker holds it, recv() fails if it dies
+            running[receiver] = (floppy, process, time.monotonic() + timeout)
+
+        wait = max(0, min(deadline for floppy, process, deadline in running.values()) - time.monotonic())
+        for receiver in multiprocessing.connection.wait(list(running), wait) :
+            floppy, process, deadline = running.pop(receiver)
+            try :
+                status, result = receiver.recv()
+            except EOFError :
+                status, result = "error", "worker died"
+            results[floppy] = {"status" : status, "result" : result}
+            process.join()
+
+        now = time.monotonic()
+        for receiver, (floppy, process, deadline) in list(running.items()) :
+            if now >= deadline :                                                # still running, kill it
+                process.terminate()
+                process.join()
+                del running[receiver]
+                results[floppy] = {"status" : "timeout", "result" : f"killed after {timeout} s"}
+
+    return results
+
+
+def compare(name, result, baseline) :
+    """ the verdict for an image : ok, new, or the frames that differ from the baseline """
+
+    filename = os.path.join(baseline, name + ".json")
+    if not os.path.exists(filename) :
+        return "new", []
+    with open(filename) as file :
+        expected = json.load(file)["hashes"]
+    hashes = {str(frame) : sha1 for frame, sha1 in result["hashes"].items()}
+    differ = sorted((frame for frame in expected.keys() | hashes.keys() if expected.get(frame) != hashes.get(frame)), key = int)
+    return ("REGRESSION", differ) if differ else ("ok", [])
+
+
+def main() :
+    parser = argparse.ArgumentParser(description = "boots floppy images headless and checks the frames they display")
+    parser.add_argument("images", nargs = "+", help = ".nib files, or directories holding them")
+    parser.add_argument("--frames", type = int, default = 600, help = "frames to run each image for (600, ten seconds)")
+    parser.add_argument("--at", default = "", help = "comma separated frames to hash, the last one by default")
+    parser.add_argument("--core", default = "locals", help = "cpu core (locals)")
+    parser.add_argument("--video", default = "numpy", help = "video backend, numpy when installed or python (numpy)")
+    parser.add_argument("--jobs", type = int, default = os.cpu_count(), help = "images run at the same time (all the cores)")
+    parser.add_argument("--timeout", type = float, default = 300, help = "seconds before an image is killed (300)")
+    parser.add_argument("--png", help = "directory where the hashed frames are saved")
+    parser.add_argument("--baseline", help = "directory of a previous run to compare with")
+    parser.add_argument("--save", help = "directory where the hashes are saved as the new baseline")
+    parser.add_argument("--report", help = "json file where the results are written")
+    options = parser.parse_args()
+
+    floppies = []
+    for path in options.images :
+        floppies += sorted(glob.glob(os.path.join(path, "*.nib"))) if os.path.isdir(path) else [path]
+    at = {int(frame) for frame in options.at.split(",") if frame} or {options.frames}
+    at = {frame for frame in at if 0 < frame <= options.frames}
+
+    start = time.perf_counter()
+    results = runAll(floppies, options.frames, at, options.core, options.video, options.png, options.jobs, options.timeout)
+    elapsed = time.perf_counter() - start
+
+    failed = 0
+    report = {}
+    for floppy in floppies :
+        name = os.path.basename(floppy)[:-4]
+        status, result = results[floppy]["status"], results[floppy]["result"]
+        entry = report[name] = {"status" : status}
+        if status != "done" :
+            failed += 1
+            print(f"{name[:40]:40}  {status.upper():10}  {result}")
+            entry["error"] = result
+            continue
+        entry.update(result)
+        verdict, differ = compare(name, result, options.baseline) if options.baseline else ("done", [])
+        entry["status"] = verdict
+        if verdict == "REGRESSION" :
+            failed += 1
+            entry["differ"] = differ
+        print(f"{name[:40]:40}  {verdict:10}  {result['seconds']:6.1f} s  {result['mhz']:6.3f} MHz" +
+              f"  {100 * result['skippedCycles'] / max(1, result['cycles']):5.1f} % skipped" +
+              (f"  frames {', '.join(differ)} differ" if differ else ""))
+        if options.save :
+            os.makedirs(options.save, exist_ok = True)
+            with open(os.path.join(options.save, name + ".json"), "w") as file :
+                json.dump({"frames" : options.frames, "core" : options.core, "hashes" : result["hashes"]}, file, indent = 1)
+
+    print(f"\n{len(floppies)} images, {failed} failed, {elapsed:.1f} s")
+    if options.report :
+        with open(options.report, "w") as file :
+            json.dump(report, file, indent = 1)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__" :
+    sys.exit(main())
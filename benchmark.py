@@ -0,0 +1,186 @@
+#!/bin/env python3
+
+"""
+    benchmark, the standard workloads of reinette II plus
+
+    Each workload runs a headless.Machine (the Klaus test only a cpu) and
+    reports the emulated MHz, the wall time and the frames per second :
+
+    - klaus     : Klaus Dormann's 6502 functional test, to its success trap.
+                  6502_functional_test.bin is not shipped, see puce6502Tests.py
+    - dos       : booting DOS 3.3 to the prompt
+    - applesoft : a floating point FOR loop, from RUN back to the prompt
+    - hgr       : ten seconds of Choplifter's HGR animation
+    - scroll    : printing 400 lines, from RUN back to the prompt
+
+    Every frame is rendered into the framebuffer, as the SDL renderer would,
+    the share of the time spent rendering is reported as 'render', and the
+    frames skipped as they did not change as 'skipped'. The setup of a
+    workload (booting to BASIC, typing the program) is not timed.
+
+    The results are printed as json. Given a baseline, a previous output, the
+    workloads slower by more than --slowdown percent are listed and the exit
+    status is 1.
+
+    Usage : python3 benchmark.py [--core locals] [--video python] [--track] [--repeat 5] [--output bench.json]
+            python3 benchmark.py --baseline bench.json --slowdown 10
+"""
+
+import sys, os, time, json, argparse, platform
+
+import headless, puce6502, clock, video
+
+
+KLAUS = "6502_functional_test.bin"
+KLAUS_SUCCESS = 0x3469                                                          # the JMP * of the success trap, see puce6502Tests.py
+KLAUS_LIMIT = 200000000                                                         # cycles, the cores count about 96 to 100 millions
+KLAUS_CHUNK = 10000
+
+FOR_LOOP = "10 FOR I = 1 TO 500 : A = A * 1.0001 + I / 3 : NEXT\n"
+SCROLL   = "10 FOR I = 1 TO 400 : PRINT \"LINE \";I;\" OF THE TEXT SCROLLING BENCHMARK\" : NEXT\n"
+
+
+#================================================================== MEASURES
+
+def prompt(machine) :
+    """ True when Applesoft waits for a key at its prompt, the cursor after the ']' """
+
+    ram = machine.mem.ram
+    base = ram[0x28] | ram[0x29] << 8                                           # BASL, start of the cursor line
+    waiting = 0xFD1B <= machine.cpu.PC <= 0xFD25                                # polling the keyboard in KEYIN
+    return waiting and ram[0x24] == 1 and ram[base] == 0xDD and not machine.keyctrl.keyQueue
+
+
+def frames(machine, count = None, until = None, limit = 3600) :
+    """ runs count frames, or until until(machine) is true, and times them """
+
+    ticks = clock.ticks
+    skipped = machine.screen.skippedFrames
+    skippedCycles = machine.skippedCycles()
+    render = 0
+    frame = 0
+    start = time.perf_counter()
+    while frame < (count or limit) :
+        machine.run(1)
+        rendering = time.perf_counter()
+        machine.framebuffer()
+        render += time.perf_counter() - rendering
+        frame += 1
+        if until and until(machine) :
+            break
+    seconds = time.perf_counter() - start
+    if until and not until(machine) :
+        raise RuntimeError(f"not done after {limit} frames")
+    return {"cycles" : clock.ticks - ticks, "seconds" : seconds, "frames" : frame, "render" : render / seconds,
+            "skipped" : machine.screen.skippedFrames - skipped, "skippedCycles" : machine.skippedCycles() - skippedCycles}
+
+
+def basic(core, display, program) :
+    """ a machine without floppy at the Applesoft prompt, program typed in """
+
+    machine = headless.Machine(None, core, **display)
+    machine.run(20)
+    machine.cpu.rst()                                                           # RESET, the drive is empty
+    frames(machine, until = prompt)
+    machine.type(program)
+    frames(machine, until = prompt)
+    machine.type("RUN\n")
+    return machine
+
+
+#================================================================= WORKLOADS
+
+def klaus(core, display) :
+    ram = bytearray(0x10000)
+    with open(KLAUS, "rb") as file :
+        file.readinto(ram)
+    cpu = puce6502.Puce6502(ram.__getitem__, ram.__setitem__, core, ram = ram)
+    cpu.rst()
+    cpu.PC = 0x400                                                              # start of code
+    ticks = clock.ticks
+    start = time.perf_counter()
+    while cpu.PC != KLAUS_SUCCESS and clock.ticks - ticks < KLAUS_LIMIT :       # the cores do not count the same cycles
+        cpu.run(KLAUS_CHUNK)
+    seconds = time.perf_counter() - start
+    if cpu.PC != KLAUS_SUCCESS :
+        raise RuntimeError(f"functional test failed at ${cpu.PC:04X}")
+    return {"cycles" : clock.ticks - ticks, "seconds" : seconds}
+
+
+def dos(core, display) :
+    machine = headless.Machine("nib/DOS 3.3.nib", core, **display)
+    return frames(machine, until = prompt)
+
+
+def applesoft(core, display) :
+    return frames(basic(core, display, FOR_LOOP), until = prompt)
+
+
+def hgr(core, display) :
+    machine = headless.Machine("nib/Choplifter.nib", core, **display)
+    machine.run(300)                                                            # boot, not timed
+    return frames(machine, 600)
+
+
+def scroll(core, display) :
+    return frames(basic(core, display, SCROLL), until = prompt)
+
+
+WORKLOADS = {"klaus" : klaus, "dos" : dos, "applesoft" : applesoft, "hgr" : hgr, "scroll" : scroll}
+
+
+#====================================================================== MAIN
+
+def bench(name, core, display, repeat) :
+    """ the best of repeat runs of a workload """
+
+    if name == "klaus" and not os.path.exists(KLAUS) :
+        return {"skipped" : f"{KLAUS} not found"}
+    best = min((WORKLOADS[name](core, display) for run in range(repeat)), key = lambda result : result["seconds"])
+    best["mhz"] = best["cycles"] / best["seconds"] / 1e6
+    if "frames" in best :
+        best["fps"] = best["frames"] / best["seconds"]
+    return best
+
+
+def main() :
+    parser = argparse.ArgumentParser(description = "runs the standard workloads and reports the emulated speed")
+    parser.add_argument("workloads", nargs = "*", default = list(WORKLOADS), help = f"among {', '.join(WORKLOADS)} (all)")
+    parser.add_argument("--core", default = "locals", help = "cpu core (locals)")
+    parser.add_argument("--video", default = "numpy", help = "video backend, numpy when installed or python (numpy)")
+    parser.add_argument("--track", action = "store_true", help = "the renderer reads the video pages written, see Memory.trackVideo()")
+    parser.add_argument("--repeat", type = int, default = 3, help = "runs of each workload, the fastest is kept (3)")
+    parser.add_argument("--output", help = "json file where the results are written")
+    parser.add_argument("--baseline", help = "json results of a previous run to compare with")
+    parser.add_argument("--slowdown", type = float, default = 10, help = "percent of slowdown tolerated against the baseline (10)")
+    options = parser.parse_args()
+
+    display = {"backend" : options.video, "track" : options.track}              # the options of headless.Machine
+    results = {"core" : options.core,
+               "video" : options.video if video.videoNumpy else "python",
+               "track" : options.track,
+               "python" : platform.python_version(),
+               "workloads" : {name : bench(name, options.core, display, options.repeat) for name in options.workloads}}
+    report = json.dumps(results, indent = 1)
+    print(report)
+    if options.output :
+        with open(options.output, "w") as file :
+            file.write(report)
+
+    if not options.baseline :
+        return 0
+    with open(options.baseline) as file :
+        baseline = json.load(file)["workloads"]
+    slower = 0
+    for name, result in results["workloads"].items() :
+        if "mhz" not in result or "mhz" not in baseline.get(name, {}) :
+            continue
+        change = 100 * (result["mhz"] / baseline[name]["mhz"] - 1)
+        verdict = "SLOWER" if change < -options.slowdown else "ok"
+        slower += verdict != "ok"
+        print(f"{name:10}  {baseline[name]['mhz']:7.3f} -> {result['mhz']:7.3f} MHz  {change:+6.1f} %  {verdict}", file = sys.stderr)
+    return 1 if slower else 0
+
+
+if __name__ == "__main__" :
+    sys.exit(main())
@@ -0,0 +1,147 @@
+#!/bin/env python3
+
+"""
+    headless, reinette II plus without a display nor an audio device
+
+    Screen and Speaker stand in for the ones of screen.py and speaker.py, SDL
+    is never initialized : the video is generated into the framebuffer of
+    video.Video when it is asked for, and the speaker only counts its toggles.
+
+    Machine wires the cpu and the peripherals the way reinetteII+.py does and
+    runs the frames back to back, without any frame pacing, so the emulated
+    code runs as fast as the interpreter allows. The frames are rendered by the
+    NumPy rasterizer of videoNumpy when NumPy is installed, by the renderer of
+    video.Video otherwise.
+
+    Usage : python3 headless.py [floppy.nib] [frames] [core]
+
+    runs 600 frames (ten emulated seconds) by default, prints the emulated
+    speed and the hash of the last frame and saves it under screenshots/
+"""
+
+import sys, os, time, hashlib
+from datetime import datetime
+
+import puce6502, memory, keyctrl, paddle, disk, clock, monitor, applesoft, video
+
+
+class Screen(video.Video) :
+    """ the video soft switches and the framebuffer, without a window """
+
+    def update(self, ram) :                                                     # called once per frame, renders nothing
+        if self.TEXT or self.MIXED :
+            self.frameNumber = (self.frameNumber + 1) % self.FPS                # for flashing characters, as the SDL renderer
+
+    def toggleMonochrome(self) :
+        self.monochrome = not self.monochrome
+
+    def setZoom(self, value) :
+        pass
+
+    def takeScreenshot(self, ram) :
+        self.render(ram)
+        date = datetime.now().strftime("-%Y-%m-%d-%H-%M-%S")                    # forge the filename
+        filename = f"screenshots/{self.title['nib']}{date}.png"
+        with open(filename, "wb") as file :
+            file.write(self.png())
+        return filename
+
+
+class Speaker() :
+    """ counts the toggles of the speaker instead of playing them """
+
+    def __init__(self) :
+        self.muted = False
+        self.previousTick = clock.ticks                                         # kept for the save states
+        self.SPKR = 1                                                           # $C030 Speaker toggle
+        self.toggles = 0
+
+    def toggleMute(self) :
+        self.muted = not self.muted
+
+    def playSound(self) :
+        self.SPKR = 0 if self.SPKR else 1
+        self.previousTick = clock.ticks
+        self.toggles += 1
+
+
+class Machine() :
+
+    def __init__(self, floppy = None, core = "tree", traps = True, profile = None, backend = "numpy", track = False) :
+
+        self.screen  = Screen(backend)
+        self.speaker = Speaker()
+        self.paddle0 = paddle.Paddle()
+        self.paddle1 = paddle.Paddle()
+        self.keyctrl = keyctrl.Keyctrl()
+
+        self.disk = disk.Disk()
+        if floppy :
+            self.disk.insertFloppy(floppy)
+            self.screen.setWindowTitle("nib", os.path.basename(floppy)[:-4])    # removing the .nib extension
+
+        self.mem = memory.Memory(self.disk, self.keyctrl, self.paddle0, self.paddle1, self.screen, self.speaker)
+        if traps :                                                              # high level emulation, as in reinetteII+.py
+            hle = monitor.Monitor(self.mem)
+            fpu = applesoft.Applesoft(self.mem)
+            traps = {**hle.traps, **fpu.traps}
+        if track :                                                              # the renderer reads the pages written instead of comparing them
+            self.screen.dirtyPages = self.mem.trackVideo()
+        self.cpu = puce6502.Puce6502(self.mem.readMem, self.mem.writeMem, core, self.mem.getBank, self.mem.ram, traps or None, profile)
+        if hasattr(self.cpu, "translator") :                                    # the keyboard loops are idle while no key is queued
+            self.cpu.translator.keyboard = self.keyctrl
+        self.frames = 0
+
+
+    def run(self, frames = 1) :
+        """ runs frames, each one as the main loop of reinetteII+.py, without waiting """
+
+        for frame in range(frames) :
+            self.cpu.run(clock.CPU_FREQUENCY / self.screen.FPS)
+            retries = 20                                                        # OVERCLOCKING CPU during disk access
+            while self.disk.getMotorOn() and retries :
+                self.cpu.run(10000)
+                retries -= 1
+            self.screen.update(self.mem.ram)
+            self.frames += 1
+
+
+    def type(self, text) :
+        """ queues text as if it was typed on the keyboard """
+
+        for c in text :
+            self.keyctrl.setKey(0x8D if c == "\n" else ord(c.upper()) | 0x80)   # Carriage Returns, bit 7 on
+
+
+    def skippedCycles(self) :
+        """ cycles the "blocks" core did not run in idle and counted loops, 0 for the other cores """
+
+        return self.cpu.translator.skipped if hasattr(self.cpu, "translator") else 0
+
+
+    def framebuffer(self) :
+        """ renders the current frame and returns it, 280 x 192 RGB """
+
+        return self.screen.render(self.mem.ram)
+
+
+def main() :
+    floppy = sys.argv[1] if len(sys.argv) > 1 else None
+    frames = int(sys.argv[2]) if len(sys.argv) > 2 else 600
+    core   = sys.argv[3] if len(sys.argv) > 3 else "tree"
+
+    machine = Machine(floppy, core)
+    ticks = clock.ticks
+    start = time.perf_counter()
+    machine.run(frames)
+    elapsed = time.perf_counter() - start
+
+    print(f"{frames} frames in {elapsed:.2f} s, {frames / elapsed:.1f} FPS, {(clock.ticks - ticks) / elapsed / 1e6:.3f} MHz")
+    print(f"speaker toggles : {machine.speaker.toggles}")
+    print(f"video backend   : {machine.screen.backend}")
+    print(f"frame sha1      : {hashlib.sha1(machine.framebuffer()).hexdigest()}")
+    print(f"screenshot      : {machine.screen.takeScreenshot(machine.mem.ram)}")
+
+
+if __name__ == "__main__" :
+    main()
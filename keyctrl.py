@@ -1,4 +1,7 @@
-from sdl2 import keycode
+try :
+    from sdl2 import keycode                                                    # pip install pysdl2
+except ImportError :                                                            # headless, keys only come from setKey()
+    keycode = None
 
 class Keyctrl() :
 
@@ -55,7 +58,7 @@ class Keyctrl() :
     keycode.SDLK_PERIOD      : [0xAE, 0x00, 0xBE, 0x00],
     keycode.SDLK_SLASH       : [0xAF, 0x00, 0xBF, 0x00],
     keycode.SDLK_MINUS       : [0xAD, 0x00, 0xDF, 0x00],
-    keycode.SDLK_BACKQUOTE   : [0xE0, 0x00, 0xFE, 0x00]}
+    keycode.SDLK_BACKQUOTE   : [0xE0, 0x00, 0xFE, 0x00]} if keycode else {}
 
 
     """
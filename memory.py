@@ -1,3 +1,6 @@
+import functools
+
+
 class Memory() :
 
     #============================================================ SOME CONSTANTS
@@ -15,6 +18,8 @@ class Memory() :
     SL6START = 0xC600                                                           # disk ][ prom in slot 6
     SL6SIZE  = 0x0100
 
+    VIDEOPAGES = [*range(0x04, 0x0C), *range(0x20, 0x60)]                       # TEXT/GR and HGR, pages 1 and 2
+
     #============================================================ INITIALIZATION
 
     def __init__(self, disk, keyctrl, paddle0, paddle1, screen, speaker) :
@@ -41,190 +46,191 @@ class Memory() :
         open('assets/appleII+.rom', 'rb').readinto(self.rom)                    # load APPLESOFT ROM
         open('assets/diskII.rom',   'rb').readinto(self.sl6)                    # load disk ][ PROM
 
+        self.zeros = bytearray(0x100)                                           # read by the empty slots
+        self.void  = bytearray(0x100)                                           # written to when the target is not writable
+
+        self.readPages  = [None] * 0x100                                        # what is read and written in each page,
+        self.writePages = [None] * 0x100                                        # None for the pages handled by the soft switches
+        self.lcState = None                                                     # language card state the pages were mapped for
+        self.dirty = bytearray(0x100)                                           # flags the pages written, see trackVideo()
+
+        ram = memoryview(self.ram)
+        for page in range(Memory.RAMSIZE >> 8) :
+            self.readPages[page] = self.writePages[page] = ram[page << 8 : (page + 1) << 8]
+        for page in range(0xC1, 0xCF) :
+            self.readPages[page] = memoryview(self.zeros)
+            self.writePages[page] = memoryview(self.void)
+        self.readPages[Memory.SL6START >> 8] = memoryview(self.sl6)
+        self.writePages[0xCF] = memoryview(self.void)                           # but $CFxx reads go through readMem() because of $CFFF
+        self.mapLanguageCard()
+
+        self.buildSoftSwitches()
+
 
-    #======================================= MEMORY MAPPED SOFT SWITCHES HANDLER
+    #====================================== MEMORY MAPPED SOFT SWITCHES HANDLERS
 
-    def softSwitches(self, address, value = None) :
-        """ this function is called from readMem and writeMem
+    def buildSoftSwitches(self) :
+        """ fills the handler tables of page $C0, used by readMem and writeMem
 
-            it complements both functions when address is in page $C0
+            readSwitches[address & 0xFF]() returns the value read and
+            writeSwitches[address & 0xFF](value) handles a write. Unlisted
+            addresses read as 0 and ignore writes.
         """
-        if address < 0xC080 :
-            if address < 0xC050 :
-                if address >= 0xC020 and address <= 0xC03F :                    # TAPEOUT, SPEAKER and space invaders strange behaviour
-                    self.speaker.playSound()
-                    return 0
-
-                elif address == 0xC000 :                                        # KEYBOARD
-                    return self.keyctrl.getKey()
-                elif address == 0xC010 :                                        # KBDSTROBE
-                    self.keyctrl.strobe()
-                    return 0
-
-            elif address < 0xC060 :                                             # VIDEO MODES
-
-                if   address == 0xC050 :                                        # Text off
-                    self.screen.setTEXT(False)
-                    return 0
-                elif address == 0xC051 :                                        # Text on
-                    self.screen.setTEXT(True)
-                    return 0
-                elif address == 0xC052 :                                        # Mixed off
-                    self.screen.setMIXED(False)
-                    return 0
-                elif address == 0xC053 :                                        # Mixed on
-                    self.screen.setMIXED(True)
-                    return 0
-                elif address == 0xC054 :                                        # PAGE2 off
-                    self.screen.setPAGE2(False)
-                    return 0
-                elif address == 0xC055 :                                        # PAGE2 on
-                    self.screen.setPAGE2(True)
-                    return 0
-                elif address == 0xC056 :                                        # HiRes off
-                    self.screen.setHIRES(False)
-                    return 0
-                elif address == 0xC057 :                                        # HiRes on
-                    self.screen.setHIRES(True)
-                    return 0
-
-            else:                                                               # PADDLES
-
-                if   address == 0xC061 :                                        # Push Button paddle 0
-                    return self.paddle0.getButton()
-                elif address == 0xC062 :                                        # Push Button paddle 1
-                    return self.paddle1.getButton()
-                elif address == 0xC064 :                                        # Paddle 0 read
-                    return self.paddle0.read()
-                elif address == 0xC065 :                                        # Paddle 1 read
-                    return self.paddle1.read()
-                elif address == 0xC070 :                                        # paddle timer RST
-                    self.paddle0.reset()
-                    self.paddle1.reset()
-                    return 0
-
-        elif address < 0xC0E0 :
-
-            if   address == 0xC080 or address == 0xC084 :                       # LC2RD
-                self.LCBK2 = True
-                self.LCRD  = True
-                self.LCWR  = False
-                self.LCWFF = False
-                return 0
-            elif address == 0xC081 or address == 0xC085 :                       # LC2WR
-                self.LCBK2 = True
-                self.LCRD  = False
-                self.LCWR |= self.LCWFF
-                self.LCWFF = value is None
-                return 0
-            elif address == 0xC082 or address == 0xC086 :                       # ROMONLY2
-                self.LCBK2 = True
-                self.LCRD  = False
-                self.LCWR  = False
-                self.LCWFF = False
-                return 0
-            elif address == 0xC083 or address == 0xC087 :                       # LC2RW
-                self.LCBK2 = True
-                self.LCRD  = True
-                self.LCWR |= self.LCWFF
-                self.LCWFF = value is None
-                return 0
-            elif address == 0xC088 or address == 0xC08C :                       # LC1RD
-                self.LCBK2 = False
-                self.LCRD  = True
-                self.LCWR  = False
-                self.LCWFF = False
-                return 0
-            elif address == 0xC089 or address == 0xC08D :                       # LC1WR
-                self.LCBK2 = False
-                self.LCRD  = False
-                self.LCWR |= self.LCWFF
-                self.LCWFF = value is None
-                return 0
-            elif address == 0xC08A or address == 0xC08E :                       # ROMONLY1
-                self.LCBK2 = False
-                self.LCRD  = False
-                self.LCWR  = False
-                self.LCWFF = False
-                return 0
-            elif address == 0xC08B or address == 0xC08F :                       # LC1RW
-                self.LCBK2 = False
-                self.LCRD  = True
-                self.LCWR |= self.LCWFF
-                self.LCWFF = value is None
-                return 0
 
-        else :                                                                  # DISK ][ card in slot 6
-
-            if address == 0xC0EC :
-                if self.disk.getWriteMode() :                                   # writting dLatch
-                    self.disk.write(self.DLATCH)
-                    self.screen.setWindowTitle("r/w",
-                        f"W[0x{self.disk.track:02X}, 0x{self.disk.nibble:04X}]")
-                else :                                                          # reading dLatch
-                    self.DLATCH = self.disk.read()
-                    self.screen.setWindowTitle("r/w",
-                        f"R[0x{self.disk.track:02X}, 0x{self.disk.nibble:04X}]")
-                return self.DLATCH
-
-            elif address >= 0xC0E0 and address <= 0xC0E7 :                      # MOVE DRIVE HEAD
-                self.disk.stepMotor(address)
-                return 0
-            elif address == 0xC0ED :                                            # Load Data Latch
-                if value :
-                    self.DLATCH = value
-                return 0
-            elif address == 0xC0EE :                                            # latch for READ
-                self.disk.setWriteMode(False)
-                return 0x80 if self.disk.getReadOnly() else 0x00                # check protection
-            elif address == 0xC0EF :                                            # latch for WRITE
-                self.disk.setWriteMode(True)
-                return 0
-            elif address == 0xC0E8 :                                            # MOTOROFF
-                self.disk.setMotorOn(False)
-                return 0
-            elif address == 0xC0E9 :                                            # MOTORON
-                self.disk.setMotorOn(True)
-                return 0
-            elif address == 0xC0EA :                                            # DRIVE0EN (not implemented)
-                return 0
-            elif address == 0xC0EB :                                            # DRIVE1EN (not implemented)
+        def action(function, *arguments) :                                      # handler calling function, reading as 0
+            def handler() :
+                function(*arguments)
                 return 0
+            return handler
+
+        def both(index, handler) :                                              # same effect when read or written
+            self.readSwitches[index] = handler
+            self.writeSwitches[index] = lambda value : handler()
+
+        self.readSwitches  = [lambda : 0] * 0x100
+        self.writeSwitches = [lambda value : None] * 0x100
+
+        both(0x00, self.keyctrl.getKey)                                         # KEYBOARD
+        both(0x10, action(self.keyctrl.strobe))                                 # KBDSTROBE
+        for index in range(0x20, 0x40) :                                        # TAPEOUT, SPEAKER and space invaders strange behaviour
+            both(index, action(self.speaker.playSound))
+
+        setters = (self.screen.setTEXT, self.screen.setMIXED, self.screen.setPAGE2, self.screen.setHIRES)
+        for index in range(0x50, 0x58) :                                        # VIDEO MODES : off on even, on on odd addresses
+            both(index, action(setters[(index - 0x50) >> 1], bool(index & 1)))
+
+        both(0x61, self.paddle0.getButton)                                      # Push Button paddle 0
+        both(0x62, self.paddle1.getButton)                                      # Push Button paddle 1
+        both(0x64, self.paddle0.read)                                           # Paddle 0 read
+        both(0x65, self.paddle1.read)                                           # Paddle 1 read
+        both(0x70, action(self.resetPaddles))                                   # paddle timer RST
+
+        for index in range(0x80, 0x90) :                                        # LANGUAGE CARD
+            self.readSwitches[index] = functools.partial(self.languageCard, index, True)
+            self.writeSwitches[index] = functools.partial(self.languageCard, index, False)
+
+        for index in range(0xE0, 0xE8) :                                        # MOVE DRIVE HEAD
+            both(index, action(self.disk.stepMotor, 0xC000 + index))
+        both(0xE8, action(self.disk.setMotorOn, False))                         # MOTOROFF
+        both(0xE9, action(self.disk.setMotorOn, True))                          # MOTORON
+        both(0xEC, self.diskLatch)                                              # read or write the data latch
+        self.writeSwitches[0xED] = self.loadLatch                               # Load Data Latch
+        both(0xEE, self.readMode)                                               # latch for READ
+        both(0xEF, action(self.disk.setWriteMode, True))                        # latch for WRITE
+
+
+    def resetPaddles(self) :
+        self.paddle0.reset()
+        self.paddle1.reset()
+
+
+    def languageCard(self, index, read, value = None) :                         # $C080-$C08F
+        self.LCBK2 = not index & 0x08                                           # bank 2 for $C080-$C087, bank 1 for $C088-$C08F
+        self.LCRD  = (index & 0x03) in (0x00, 0x03)                             # RD and RW switches
+        if index & 0x01 :                                                       # WR and RW switches, two accesses needed
+            self.LCWR |= self.LCWFF
+            self.LCWFF = read
+        else :                                                                  # RD and ROMONLY switches
+            self.LCWR  = False
+            self.LCWFF = False
+        self.mapLanguageCard()                                                  # remap $D000-$FFFF if needed
+        return 0
+
+
+    def diskLatch(self) :                                                       # $C0EC
+        if self.disk.getWriteMode() :                                           # writting dLatch
+            self.disk.write(self.DLATCH)
+            self.screen.setWindowTitle("r/w",
+                f"W[0x{self.disk.track:02X}, 0x{self.disk.nibble:04X}]")
+        else :                                                                  # reading dLatch
+            self.DLATCH = self.disk.read()
+            self.screen.setWindowTitle("r/w",
+                f"R[0x{self.disk.track:02X}, 0x{self.disk.nibble:04X}]")
+        return self.DLATCH
+
+
+    def loadLatch(self, value) :                                                # $C0ED
+        if value :
+            self.DLATCH = value
+
+
+    def readMode(self) :                                                        # $C0EE
+        self.disk.setWriteMode(False)
+        return 0x80 if self.disk.getReadOnly() else 0x00                        # check protection
+
+
+    #================================================================ PAGE TABLE
+
+    def mapLanguageCard(self) :
+        """ maps $D000-$FFFF in the page tables according to the LC switches
+
+            the pages are only rebuilt when LCRD, LCWR or LCBK2 have changed
+        """
+        state = (self.LCRD, self.LCWR, self.LCBK2)
+        if state == self.lcState :
+            return
+        self.lcState = state
+
+        rom, lgc, bk2 = memoryview(self.rom), memoryview(self.lgc), memoryview(self.bk2)
+        for page in range(Memory.ROMSTART >> 8, 0x100) :
+            offset = (page << 8) - Memory.ROMSTART
+            if self.LCBK2 and page < 0xE0 :
+                card = bk2[offset : offset + 0x100]                             # BK2
+            else :
+                card = lgc[offset : offset + 0x100]                             # LC
+            self.readPages[page] = card if self.LCRD else rom[offset : offset + 0x100]
+            self.writePages[page] = card if self.LCWR else memoryview(self.void)
+
+
+    def trackVideo(self) :
+        """ flags the writes to the video pages in 'dirty', returned for the renderer
+
+            The video pages are taken out of writePages, their writes go down
+            the slow path of writeMem() which flags them. The renderer reads
+            and clears the flags. Until this is called, nothing is flagged and
+            the writes cost what they did.
+        """
+        for page in Memory.VIDEOPAGES :
+            self.writePages[page] = None
+        return self.dirty
+
+
+    def wrote(self, pages) :
+        """ flags pages written directly into ram, by the traps, and returns them """
+
+        for page in pages :
+            self.dirty[page] = 1
+        return pages
 
-        return 0x00                                                             # catch all
 
     #============================================================= MEMORY ACCESS
 
 
     def readMem(self, address) :                                                # read
-        if address < Memory.RAMSIZE :
-            return self.ram[address]                                            # RAM
+        page = self.readPages[address >> 8]
+        if page is not None :
+            return page[address & 0xFF]                                         # RAM, ROM, LC, disk][ PROM
+        if address & 0xFF00 == 0xC000 :
+            return self.readSwitches[address & 0xFF]()                          # Soft Switches
         if address == 0xCFFF :
             self.disk.setMotorOn(False)                                         # reset hardware flag (switches motor off)
-            return 0
-        if address & 0xFF00 == 0xC000 :
-            return self.softSwitches(address)                                   # Soft Switches
-        if address & 0xFF00 == Memory.SL6START :
-            return self.sl6[address - Memory.SL6START]                          # disk][
-        if address >= Memory.ROMSTART :
-            if not self.LCRD :
-                return self.rom[address - Memory.ROMSTART]                      # ROM
-            if self.LCBK2 and address < 0xE000 :
-                return self.bk2[address - Memory.BK2START]                      # BK2
-            return self.lgc[address - Memory.LGCSTART]                          # LC
         return 0                                                                # catch all
 
 
     def writeMem(self, address, value) :                                        # write
-        if address < Memory.RAMSIZE :
-            self.ram[address] = value                                           # RAM
+        page = self.writePages[address >> 8]
+        if page is not None :
+            page[address & 0xFF] = value                                        # RAM, LC or the void
             return
-        if address & 0xFF00 == 0xC000 :
-            self.softSwitches(address, value)                                   # Soft Switches
+        if address < Memory.RAMSIZE :                                           # a video page, tracked
+            self.ram[address] = value
+            self.dirty[address >> 8] = 1
             return
-        if self.LCWR and (address >= Memory.ROMSTART) :                         # Language Card
-            if self.LCBK2 and address < 0xE000 :
-                self.bk2[address - Memory.BK2START] = value                     # BK2
-                return
-            self.lgc[address - Memory.LGCSTART] = value                         # LC
+        self.writeSwitches[address & 0xFF](value)                               # Soft Switches
+
+
+    def getBank(self) :                                                         # what is read in $D000-$FFFF
+        if not self.LCRD :
+            return 0                                                            # ROM
+        return 2 if self.LCBK2 else 1                                           # LC bank 2 or bank 1
 
@@ -0,0 +1,286 @@
+"""
+    monitor, high level emulation of some Apple II+ Monitor routines
+
+    The 'traps' dictionary maps the entry points of WAIT, SCROLL, HOME and
+    CLREOL to python functions doing the same work directly in Memory.ram.
+    A trap is called with the cpu when its PC reaches the entry point. It
+    leaves the registers, the flags, the zero page, the stack and the text
+    screen as the ROM routine would, charges the cycles the cpu core would
+    have counted to clock.ticks and returns from the routine like RTS does.
+
+    A trap returns the pages it wrote to, or None when it declines to run :
+    the ROM is not mapped (the language card RAM is read enabled), the cpu
+    is in decimal mode or the arguments fall outside what is emulated. The
+    ROM code is then executed as usual. The pages written are also flagged
+    by Memory.wrote(), for the renderer.
+"""
+
+import clock
+
+
+WNDLFT = 0x20                                                                   # zero page locations used by the Monitor
+WNDWDTH = 0x21
+WNDTOP = 0x22
+WNDBTM = 0x23
+CH = 0x24
+CV = 0x25
+BASL = 0x28
+BASH = 0x29
+BAS2L = 0x2A
+BAS2H = 0x2B
+
+TEXT = (0x00, 0x01, 0x04, 0x05, 0x06, 0x07, 0x08)                               # pages written while clearing or scrolling the text window
+
+
+def taken(address, target) :
+    """ cycles of the branch at address when taken, one more when crossing a page """
+
+    following = (address + 2) & 0xFFFF
+    offset = (target - following) & 0xFF
+    if offset & 0x80 :
+        offset |= 0xFF00
+    return 4 if ((following & 0xFF) + offset) & 0xFF00 else 3
+
+
+class Monitor() :
+
+    def __init__(self, memory) :
+
+        self.memory = memory
+        self.ram = memory.ram
+        self.cycles = 0                                                         # cycles of the routine being emulated
+        self.traps = {0xFCA8 : self.wait,
+                      0xFC70 : self.scroll,
+                      0xFC58 : self.home,
+                      0xFC9C : self.clearEndOfLine}
+
+
+    #===================================================================== TRAPS
+
+    def wait(self, cpu) :
+        """ $FCA8 WAIT, delays 1/2(26 + 27A + 5A^2) microseconds """
+
+        if self.memory.LCRD or cpu.D or not cpu.A :
+            return None
+
+        count = cpu.A                                                           # SEC, then PHA, SBC #1 and BNE down to 0, PLA, SBC #1 and BNE down to 0
+        self.cycles = 2 + count * 11 + count * (count + 1) + count * (count - 1) // 2 * taken(0xFCAC, 0xFCAA) + \
+                      (count - 1) * taken(0xFCB1, 0xFCA9) + 2
+        self.ram[0x100 + cpu.SP] = 0x01                                         # the last value pushed
+        cpu.A = 0
+        cpu.C = cpu.Z = True
+        cpu.S = cpu.V = False
+        self.rts(cpu)
+        self.leave(cpu)
+        return self.memory.wrote((0x01,))
+
+
+    def scroll(self, cpu) :
+        """ $FC70 SCROLL, moves the text window one line up and clears its last line """
+
+        ram = self.ram
+        width = ram[WNDWDTH]
+        if self.memory.LCRD or cpu.D or not 0 < width <= 0x80 :
+            return None
+
+        self.cycles = 3
+        self.load(cpu, "A", ram[WNDTOP])                                        # LDA WNDTOP
+        self.push(cpu, cpu.A)                                                   # PHA
+        self.jsr(cpu, 0xFC73)
+        self.basCalc(cpu)
+
+        while True :
+            ram[BAS2L] = ram[BASL]                                              # LDA BASL, STA BAS2L, LDA BASH, STA BAS2H
+            ram[BAS2H] = ram[BASH]
+            self.load(cpu, "Y", width - 1)                                      # LDY WNDWDTH, DEY
+            self.pull(cpu)                                                      # PLA
+            self.adc(cpu, 0x01)                                                 # ADC #1
+            self.compare(cpu, cpu.A, ram[WNDBTM])                               # CMP WNDBTM
+            self.cycles += 17 + 2 + 3
+            if cpu.C :
+                self.cycles += taken(0xFC86, 0xFC95)                            # BCS
+                break
+            self.cycles += 2
+            self.push(cpu, cpu.A)                                               # PHA
+            self.jsr(cpu, 0xFC89)
+            self.basCalc(cpu)
+
+            source = ram[BASL] | (ram[BASH] << 8)                               # LDA (BASL),Y, STA (BAS2L),Y, DEY and BPL down to 0
+            target = ram[BAS2L] | (ram[BAS2H] << 8)
+            if source + width <= target or target + width <= source :
+                ram[target : target + width] = ram[source : source + width]
+            else :
+                for index in reversed(range(width)) :
+                    ram[target + index] = ram[source + index]
+            self.load(cpu, "Y", 0xFF)
+            crossed = max(0, width - (0x100 - ram[BASL]))                       # reads crossing a page
+            self.cycles += width * 13 + crossed + (width - 1) * taken(0xFC91, 0xFC8C) + 2
+            self.cycles += taken(0xFC93, 0xFC76)                                # BMI
+
+        self.load(cpu, "Y", 0x00)                                               # LDY #0
+        self.cycles += 2
+        self.jsr(cpu, 0xFC97)
+        self.clearLine(cpu)
+        self.cycles += taken(0xFC9A, 0xFC22)                                    # BCS
+        self.verticalTab(cpu)
+        self.leave(cpu)
+        return self.memory.wrote(TEXT)
+
+
+    def home(self, cpu) :
+        """ $FC58 HOME, clears the text window and moves the cursor to its top left corner """
+
+        ram = self.ram
+        if self.memory.LCRD or cpu.D :
+            return None
+
+        self.load(cpu, "A", ram[WNDTOP])                                        # LDA WNDTOP, STA CV
+        ram[CV] = cpu.A
+        self.load(cpu, "Y", 0x00)                                               # LDY #0, STY CH
+        ram[CH] = 0x00
+        self.cycles = 11 + taken(0xFC60, 0xFC46)                                # BEQ
+
+        while True :                                                            # CLREOP
+            self.push(cpu, cpu.A)                                               # PHA
+            self.jsr(cpu, 0xFC47)
+            self.basCalc(cpu)
+            self.jsr(cpu, 0xFC4A)
+            self.clearLine(cpu)
+            self.load(cpu, "Y", 0x00)                                           # LDY #0
+            self.pull(cpu)                                                      # PLA
+            self.adc(cpu, 0x00)                                                 # ADC #0
+            self.compare(cpu, cpu.A, ram[WNDBTM])                               # CMP WNDBTM
+            self.cycles += 2 + 2 + 3
+            if cpu.C :
+                break
+            self.cycles += taken(0xFC54, 0xFC46)                                # BCC
+
+        self.cycles += 2 + taken(0xFC56, 0xFC22)                                # BCS
+        self.verticalTab(cpu)
+        self.leave(cpu)
+        return self.memory.wrote(TEXT)
+
+
+    def clearEndOfLine(self, cpu) :
+        """ $FC9C CLREOL, clears the text line from the cursor to the right edge of the window """
+
+        ram = self.ram
+        base = ram[BASL] | (ram[BASH] << 8)
+        if self.memory.LCRD or base + 0xFF >= self.memory.RAMSIZE :
+            return None
+
+        self.cycles = 3
+        self.load(cpu, "Y", ram[CH])                                            # LDY CH
+        self.clearLine(cpu)
+        self.leave(cpu)
+        return self.memory.wrote((base >> 8, (base + 0xFF) >> 8))
+
+
+    #=============================================================== SUBROUTINES
+
+    def verticalTab(self, cpu) :
+        """ $FC22 VTAB, with VTABZ's RTS returning from the routine trapped """
+
+        self.load(cpu, "A", self.ram[CV])                                       # LDA CV
+        self.cycles += 3
+        self.basCalc(cpu)
+
+
+    def basCalc(self, cpu) :
+        """ $FC24 VTABZ, computes BASL and BASH for the line in A """
+
+        ram = self.ram
+        line = cpu.A
+        self.jsr(cpu, 0xFC24)                                                   # JSR BASCALC
+        self.push(cpu, line)                                                    # PHA, LSR, AND #3, ORA #4, STA BASH, PLA, AND #$18
+        ram[BASH] = ((line >> 1) & 0x03) | 0x04
+        self.pull(cpu)
+        address = line & 0x18
+        self.cycles += 11
+        if line & 0x01 :                                                        # ADC #$7F with the carry set by LSR
+            address += 0x80
+            cpu.V = True
+            self.cycles += 4
+        else :
+            self.cycles += taken(0xFBCC, 0xFBD0)                                # BCC
+        cpu.C = (address & 0x40) != 0                                           # STA BASL, ASL, ASL, ORA BASL, STA BASL
+        self.load(cpu, "A", ((address << 2) & 0xFF) | address)
+        self.cycles += 13
+        self.rts(cpu)
+
+        self.adc(cpu, ram[WNDLFT])                                              # ADC WNDLFT, STA BASL
+        ram[BASL] = cpu.A
+        self.cycles += 6
+        self.rts(cpu)
+
+
+    def clearLine(self, cpu) :
+        """ $FC9E CLEOLZ, fills the line with spaces from Y to the right edge of the window """
+
+        ram = self.ram
+        base = ram[BASL] | (ram[BASH] << 8)
+        width = ram[WNDWDTH]
+        start = cpu.Y
+        if width == 0 or start + 1 >= width :                                   # the loop runs at least once
+            count = 1 if start < 0xFF else 1 + width
+        else :
+            count = width - start
+        for index in range(start, start + count) :                              # LDA #$A0, STA (BASL),Y, INY, CPY WNDWDTH, BCC
+            ram[base + (index & 0xFF)] = 0xA0
+
+        cpu.A = 0xA0
+        cpu.Y = (start + count) & 0xFF
+        self.compare(cpu, cpu.Y, width)
+        self.cycles += 2 + count * 11 + (count - 1) * taken(0xFCA5, 0xFCA0) + 2
+        self.rts(cpu)
+
+
+    #=================================================================== HELPERS
+
+    def load(self, cpu, register, value) :
+        setattr(cpu, register, value)
+        cpu.Z = value == 0
+        cpu.S = value > 0x7F
+
+
+    def adc(self, cpu, value) :
+        value16 = cpu.A + value + cpu.C
+        cpu.V = ((value16 ^ cpu.A) & (value16 ^ value) & 0x80) != 0
+        cpu.C = value16 > 0xFF
+        self.load(cpu, "A", value16 & 0xFF)
+
+
+    def compare(self, cpu, register, value) :
+        cpu.Z = register == value
+        cpu.S = ((register - value) & 0x80) != 0
+        cpu.C = register >= value
+
+
+    def push(self, cpu, value) :
+        self.ram[0x100 + cpu.SP] = value
+        cpu.SP = (cpu.SP - 1) & 0xFF
+        self.cycles += 3
+
+
+    def pull(self, cpu) :
+        cpu.SP = (cpu.SP + 1) & 0xFF
+        self.load(cpu, "A", self.ram[0x100 + cpu.SP])
+        self.cycles += 4
+
+
+    def jsr(self, cpu, address) :
+        back = (address + 2) & 0xFFFF                                           # the address pushed is the last byte of JSR
+        self.push(cpu, back >> 8)
+        self.push(cpu, back & 0xFF)
+
+
+    def rts(self, cpu) :
+        cpu.SP = (cpu.SP + 2) & 0xFF
+        self.cycles += 6
+
+
+    def leave(self, cpu) :
+        """ jumps to the address pulled by the last RTS, and charges the cycles """
+
+        cpu.PC = ((self.ram[0x100 + ((cpu.SP - 1) & 0xFF)] | (self.ram[0x100 + cpu.SP] << 8)) + 1) & 0xFFFF
+        clock.ticks += self.cycles
@@ -0,0 +1,109 @@
+#!/bin/env python3
+
+"""
+  Tests of the Monitor traps against the ROM
+
+  WAIT, SCROLL, HOME and CLREOL are called with a JSR, once trapped by
+  monitor.Monitor and once running the Apple II+ ROM, from the same seeded
+  random state : the text page, the window, the cursor and the registers,
+  the decimal flag included. Both must return with the same registers, flags,
+  RAM below $C000 and clock ticks.
+
+  Most windows are the ones of the Monitor and Applesoft, the others are
+  random bytes, where the traps either decline or must do what the ROM does.
+  In decimal mode, some of them make SCROLL and HOME loop forever : those
+  calls must not return when trapped either.
+"""
+
+import headless, monitor, puce6502, clock
+import random, sys
+
+
+CALL = 0x0300                                                                   # JSR routine
+RETURN = 0x0303                                                                 # JMP RETURN, where the calls stop
+LIMIT = 1000000                                                                 # cycles, WAIT 255 takes about 170000
+ROUTINES = {"WAIT" : 0xFCA8, "SCROLL" : 0xFC70, "HOME" : 0xFC58, "CLREOL" : 0xFC9C}
+
+
+def setup(rng, ram, cpu) :
+    """ a random state, the same for the same seed """
+
+    ram[: 0xC000] = bytes(0xC000)                                               # the windows outside the screen write anywhere
+    ram[0x400 : 0x800] = bytes(rng.randrange(0x100) for i in range(0x400))     # the text page
+    if rng.random() < 0.8 :                                                     # a window inside the screen
+        left = rng.randrange(40)
+        top = rng.randrange(24)
+        window = (left, rng.randint(1, 40 - left), top, rng.randint(top + 1, 24))
+    else :
+        window = [rng.randrange(0x100) for i in range(4)]
+    ram[monitor.WNDLFT : monitor.WNDBTM + 1] = bytes(window)
+    ram[monitor.CH] = rng.randrange(window[1] if rng.random() < 0.8 else 0x100)
+    ram[monitor.CV] = rng.randrange(window[2], max(window[2], window[3]) + 1) & 0xFF
+    ram[monitor.BASL] = rng.randrange(0x100)                                    # set by VTAB, as the ROM does for CLREOL
+    ram[monitor.BASH] = rng.randrange(0x04, 0x08)
+    cpu.A, cpu.X, cpu.Y, cpu.SP = (rng.randrange(0x100) for i in range(4))
+    cpu.setP(rng.randrange(0x100) & ~cpu.DECIM if rng.random() < 0.9 else rng.randrange(0x100))
+
+
+def call(cpu, ram, routine, seed) :
+    """ the state left by the routine called from the random state 'seed' """
+
+    setup(random.Random(seed), ram, cpu)
+    ram[CALL : RETURN + 3] = bytes((0x20, routine & 0xFF, routine >> 8, 0x4C, RETURN & 0xFF, RETURN >> 8))
+    for cache in (getattr(cpu, "translator", None), getattr(cpu, "decoder", None)) :
+        if cache is not None :                                                  # the code changed behind the cpu's back
+            cache.flush()
+    cpu.PC = CALL
+
+    start = clock.ticks
+    while cpu.PC != RETURN and clock.ticks - start < LIMIT :
+        cpu.run(1)
+    return {"A" : cpu.A, "X" : cpu.X, "Y" : cpu.Y, "SP" : cpu.SP, "P" : cpu.getP(),
+            "PC" : cpu.PC, "ticks" : clock.ticks - start, "ram" : bytes(ram[: 0xC000])}
+
+
+def compare(expected, state) :
+    """ the differences between two states, as text """
+
+    differences = []
+    for name in expected :
+        if name == "ram" and expected["ram"] != state["ram"] :
+            address = next(i for i in range(0xC000) if expected["ram"][i] != state["ram"][i])
+            differences.append(f"ram[{address:04X}]={state['ram'][address]:02X} instead of {expected['ram'][address]:02X}")
+        elif name != "ram" and expected[name] != state[name] :
+            differences.append(f"{name}={state[name]:X} instead of {expected[name]:X}")
+    return ", ".join(differences)
+
+
+if len(sys.argv) > 1 and not sys.argv[1].isdigit() :
+    print("Usage : monitorTests.py [calls] [tree|table|locals|lazy|decoded|blocks]", end = '\n\n')
+    print("calls WAIT, SCROLL, HOME and CLREOL from random states (200 each), trapped and")
+    print("from the ROM, and compares the registers, the RAM and the cycles")
+    print("the optional second argument selects the cpu core running the trapped calls (default is tree)")
+    exit()
+
+calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+core = sys.argv[2] if len(sys.argv) > 2 else "tree"
+
+machine = headless.Machine(None, "tree", traps = False)                         # the ROM, without traps
+mem = machine.mem
+hle = monitor.Monitor(mem)
+trapped = puce6502.Puce6502(mem.readMem, mem.writeMem, core, mem.getBank, mem.ram, hle.traps)
+
+failures = 0
+for name, routine in ROUTINES.items() :
+    for seed in range(calls) :
+        expected = call(machine.cpu, mem.ram, routine, seed)
+        state = call(trapped, mem.ram, routine, seed)
+        if expected["PC"] != RETURN :                                           # the trap must have declined too
+            differences = "a return" if state["PC"] == RETURN else ""
+        else :
+            differences = compare(expected, state)
+        if differences :
+            print(f"{name} seed {seed} : the trap left {differences}")
+            failures += 1
+
+if failures :
+    print(f"\n{failures} failures")
+    exit(1)
+print(f"{calls} calls of {', '.join(ROUTINES)}, traps on the {core} core : SUCCESS !")
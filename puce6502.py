@@ -23,13 +23,19 @@
 """
 
 import clock                                                                    # global variable ticks
+import puce6502Gen                                                              # source code generator for the "locals" core
+import puce6502Jit                                                              # basic block translator for the "blocks" core
+import puce6502Dec                                                              # predecoded instruction cache for the "decoded" core
+from alu import ADDITION, SUBTRACTION                                           # ADC and SBC results, binary and decimal
 
 class Puce6502() :
 
-    def __init__(self, readMem, writeMem):
+    def __init__(self, readMem, writeMem, core = "tree", bank = None, ram = None, traps = None, profile = None):
 
         self.readMem = readMem
         self.writeMem = writeMem
+        self.ram = ram                                                          # optional RAM bytearray, indexed directly below $C000 by the generated cores
+        self.traps = traps or {}                                                # optional functions run instead of the code at their address
 
         # CONSTANTS
         self.CARRY = 0x01
@@ -56,6 +62,23 @@ class Puce6502() :
         self.PC = 0                                                             # Program Counter
         self.SP = 0                                                             # Stack Pointer
 
+        self.opcodes = [getattr(self, name) for name in Puce6502.OPCODES]       # opcode handlers used by runTable()
+
+        if core == "table" :                                                    # select the cpu core
+            self.run = self.runTable
+        elif core == "locals" :                                                 # registers kept in local variables during run(), profile shapes the dispatch
+            self.run = puce6502Gen.Generator(ram is not None, bool(self.traps), False, puce6502Gen.FUSIONS, profile).build(self)
+        elif core == "lazy" :                                                   # the same, N and Z derived from the last result when needed
+            self.run = puce6502Gen.Generator(ram is not None, bool(self.traps), True, puce6502Gen.FUSIONS, profile).build(self)
+        elif core == "blocks" :                                                 # whole basic blocks compiled into python functions
+            self.translator = puce6502Jit.Translator(self, bank)                # bank tells what the language card maps in $D000-$FFFF
+            self.run = self.translator.run
+        elif core == "decoded" :                                                # opcode, operand and cycles cached by address
+            self.decoder = puce6502Dec.Decoder(self, bank)                      # bank as for the "blocks" core
+            self.run = self.decoder.run
+        elif core != "tree" :
+            raise ValueError(f"unknown cpu core : {core}")
+
         self.rst()                                                              # perform a reset
 
 
@@ -156,10 +179,18 @@ class Puce6502() :
     def run(self, cycleCount) :
 
         cycleCount += clock.ticks                                               # cycleCount becomes the target ticks value
+        traps = self.traps
+        trapped = frozenset(traps)                                              # their addresses, empty and false without traps
+        addition = ADDITION                                                     # local lookups are faster
+        subtraction = SUBTRACTION
         while (clock.ticks < cycleCount) :
 
-            inst = self.readMem(self.PC)                                        # fetch instruction
-            self.PC = (self.PC + 1) & 0xFFFF                                    # increment Program Counter
+            PC = self.PC
+            if trapped and PC in trapped and traps[PC](self) is not None :      # a trap did the work of the routine at PC
+                continue
+
+            inst = self.readMem(PC)                                             # fetch instruction
+            self.PC = (PC + 1) & 0xFFFF                                         # increment Program Counter
 
             if inst < 0x80 :
                 if inst < 0x40 :
@@ -755,15 +786,15 @@ class Puce6502() :
                                     clock.ticks += 6
                                     continue
 
-                                elif inst ==  0x58 :                            # IMP CLI
+                            else :
+                                # 0x58 to 0x5F
+
+                                if inst ==  0x58 :                              # IMP CLI
                                     self.I = 0
                                     clock.ticks += 2
                                     continue
 
-                            else :
-                                # 0x58 to 0x5F
-
-                                if inst ==  0x59 :                              # ABY EOR
+                                elif inst ==  0x59 :                            # ABY EOR
                                     address = self.readMem(self.PC)
                                     self.PC = (self.PC + 1) & 0xFFFF
                                     if (address + self.Y) & 0xFF00 :
@@ -829,12 +860,7 @@ class Puce6502() :
                                     value8 = (value8 + 1) & 0xFF
                                     address |= self.readMem(value8) << 8
                                     value8 = self.readMem(address)
-                                    value16 = (self.A + value8 + self.C) & 0xFFFF
-                                    self.V = ((value16 ^ self.A) & (value16 ^ value8) & 0x0080) != 0
-                                    if self.D :
-                                        value16 += ((((value16 + 0x66) ^ self.A ^ value8) >> 3) & 0x22) * 3
-                                    self.C = value16 > 0xFF
-                                    self.A = value16 & 0xFF
+                                    self.A, self.C, self.V = addition[self.D << 17 | self.C << 16 | self.A << 8 | value8]
                                     self.Z = self.A == 0
                                     self.S = self.A > 0x7F
                                     clock.ticks += 6
@@ -844,12 +870,7 @@ class Puce6502() :
                                     address = self.readMem(self.PC)
                                     self.PC = (self.PC + 1) & 0xFFFF
                                     value8 = self.readMem(address)
-                                    value16 = (self.A + value8 + self.C) & 0xFFFF
-                                    self.V = ((value16 ^ self.A) & (value16 ^ value8) & 0x0080) != 0
-                                    if self.D :
-                                        value16 += ((((value16 + 0x66) ^ self.A ^ value8) >> 3) & 0x22) * 3
-                                    self.C = value16 > 0xFF
-                                    self.A = value16 & 0xFF
+                                    self.A, self.C, self.V = addition[self.D << 17 | self.C << 16 | self.A << 8 | value8]
                                     self.Z = self.A == 0
                                     self.S = self.A > 0x7F
                                     clock.ticks += 3
@@ -881,12 +902,7 @@ class Puce6502() :
                                 elif inst ==  0x69 :                            # IMM ADC
                                     value8 = self.readMem(self.PC)
                                     self.PC = (self.PC + 1) & 0xFFFF
-                                    value16 = (self.A + value8 + self.C) & 0xFFFF
-                                    self.V = ((value16 ^ self.A) & (value16 ^ value8) & 0x0080) != 0
-                                    if self.D :
-                                        value16 += ((((value16 + 0x66) ^ self.A ^ value8) >> 3) & 0x22) * 3
-                                    self.C = value16 > 0xFF
-                                    self.A = value16 & 0xFF
+                                    self.A, self.C, self.V = addition[self.D << 17 | self.C << 16 | self.A << 8 | value8]
                                     self.Z = self.A == 0
                                     self.S = self.A > 0x7F
                                     clock.ticks += 2
@@ -913,12 +929,7 @@ class Puce6502() :
                                     address |= self.readMem(self.PC) << 8
                                     self.PC = (self.PC + 1) & 0xFFFF
                                     value8 = self.readMem(address)
-                                    value16 = (self.A + value8 + self.C) & 0xFFFF
-                                    self.V = ((value16 ^ self.A) & (value16 ^ value8) & 0x0080) != 0
-                                    if self.D :
-                                        value16 += ((((value16 + 0x66) ^ self.A ^ value8) >> 3) & 0x22) * 3
-                                    self.C = value16 > 0xFF
-                                    self.A = value16 & 0xFF
+                                    self.A, self.C, self.V = addition[self.D << 17 | self.C << 16 | self.A << 8 | value8]
                                     self.Z = self.A == 0
                                     self.S = self.A > 0x7F
                                     clock.ticks += 4
@@ -948,10 +959,10 @@ class Puce6502() :
                                     self.PC = (self.PC + 1) & 0xFFFF
                                     if self.V :
                                         clock.ticks += 1
-                                        if ((self.PC & 0xFF) + address) & 0xFF00 :
-                                            clock.ticks += 1
                                         if address & self.SIGN :
                                             address |= 0xFF00
+                                        if ((self.PC & 0xFF) + address) & 0xFF00 :
+                                            clock.ticks += 1
                                         self.PC = (self.PC + address) & 0xFFFF
                                     clock.ticks += 2
                                     continue
@@ -966,12 +977,7 @@ class Puce6502() :
                                     address |= self.readMem(value8) << 8
                                     address = (address + self.Y) & 0xFFFF
                                     value8 = self.readMem(address)
-                                    value16 = (self.A + value8 + self.C) & 0xFFFF
-                                    self.V = ((value16 ^ self.A) & (value16 ^ value8) & 0x0080) != 0
-                                    if self.D :
-                                        value16 += ((((value16 + 0x66) ^ self.A ^ value8) >> 3) & 0x22) * 3
-                                    self.C = value16 > 0xFF
-                                    self.A = value16 & 0xFF
+                                    self.A, self.C, self.V = addition[self.D << 17 | self.C << 16 | self.A << 8 | value8]
                                     self.Z = self.A == 0
                                     self.S = self.A > 0x7F
                                     clock.ticks += 5
@@ -981,12 +987,7 @@ class Puce6502() :
                                     address = (self.readMem(self.PC) + self.X) & 0xFF
                                     self.PC = (self.PC + 1) & 0xFFFF
                                     value8 = self.readMem(address)
-                                    value16 = (self.A + value8 + self.C) & 0xFFFF
-                                    self.V = ((value16 ^ self.A) & (value16 ^ value8) & 0x0080) != 0
-                                    if self.D :
-                                        value16 += ((((value16 + 0x66) ^ self.A ^ value8) >> 3) & 0x22) * 3
-                                    self.C = value16 > 0xFF
-                                    self.A = value16 & 0xFF
+                                    self.A, self.C, self.V = addition[self.D << 17 | self.C << 16 | self.A << 8 | value8]
                                     self.Z = self.A == 0
                                     self.S = self.A > 0x7F
                                     clock.ticks += 4
@@ -1022,12 +1023,7 @@ class Puce6502() :
                                     self.PC = (self.PC + 1) & 0xFFFF
                                     address = (address + self.Y) & 0xFFFF
                                     value8 = self.readMem(address)
-                                    value16 = (self.A + value8 + self.C) & 0xFFFF
-                                    self.V = ((value16 ^ self.A) & (value16 ^ value8) & 0x0080) != 0
-                                    if self.D:
-                                        value16 += ((((value16 + 0x66) ^ self.A ^ value8) >> 3) & 0x22) * 3
-                                    self.C = value16 > 0xFF
-                                    self.A = value16 & 0xFF
+                                    self.A, self.C, self.V = addition[self.D << 17 | self.C << 16 | self.A << 8 | value8]
                                     self.Z = self.A == 0
                                     self.S = self.A > 0x7F
                                     clock.ticks += 4
@@ -1042,12 +1038,7 @@ class Puce6502() :
                                     self.PC = (self.PC + 1) & 0xFFFF
                                     address = (address + self.X) & 0xFFFF
                                     value8 = self.readMem(address)
-                                    value16 = (self.A + value8 + self.C) & 0xFFFF
-                                    self.V = ((value16 ^ self.A) & (value16 ^ value8) & 0x0080) != 0
-                                    if self.D :
-                                        value16 += ((((value16 + 0x66) ^ self.A ^ value8) >> 3) & 0x22) * 3
-                                    self.C = value16 > 0xFF
-                                    self.A = value16 & 0xFF
+                                    self.A, self.C, self.V = addition[self.D << 17 | self.C << 16 | self.A << 8 | value8]
                                     self.Z = self.A == 0
                                     self.S = self.A > 0x7F
                                     clock.ticks += 4
@@ -1169,10 +1160,10 @@ class Puce6502() :
                                     self.PC = (self.PC + 1) & 0xFFFF
                                     if not self.C  :
                                         clock.ticks += 1
-                                        if ((self.PC & 0xFF) + address) & 0xFF00 :
-                                            clock.ticks += 1
                                         if address & self.SIGN :
                                             address |= 0xFF00
+                                        if ((self.PC & 0xFF) + address) & 0xFF00 :
+                                            clock.ticks += 1
                                         self.PC = (self.PC + address) & 0xFFFF
                                     clock.ticks += 2
                                     continue
@@ -1601,7 +1592,7 @@ class Puce6502() :
                                     self.writeMem(address, value8)
                                     self.Z = value8 == 0
                                     self.S = value8 > 0x7F
-                                    clock.ticks += 3
+                                    clock.ticks += 6
                                     continue
 
                         else :
@@ -1744,15 +1735,7 @@ class Puce6502() :
                                     value8 = (value8 + 1) & 0xFF
                                     address |= self.readMem(value8) << 8
                                     value8 = self.readMem(address)
-                                    value8 ^= 0xFF
-                                    if self.D :
-                                        value8 -= 0x0066
-                                    value16 = (self.A + value8 + self.C) & 0xFFFF
-                                    self.V = ((value16 ^ self.A) & (value16 ^ value8) & 0x0080) != 0
-                                    if self.D :
-                                        value16 += ((((value16 + 0x66) ^ self.A ^ value8) >> 3) & 0x22) * 3
-                                    self.C = value16 > 0xFF
-                                    self.A = value16 & 0xFF
+                                    self.A, self.C, self.V = subtraction[self.D << 17 | self.C << 16 | self.A << 8 | value8]
                                     self.Z = self.A == 0
                                     self.S = self.A > 0x7F
                                     clock.ticks += 6
@@ -1770,15 +1753,7 @@ class Puce6502() :
                                 elif inst ==  0xE5 :                            # ZPG SBC
                                     value8 = self.readMem(self.readMem(self.PC))
                                     self.PC = (self.PC + 1) & 0xFFFF
-                                    value8 ^= 0xFF
-                                    if self.D :
-                                        value8 -= 0x0066
-                                    value16 = (self.A + value8 + self.C) & 0xFFFF
-                                    self.V = ((value16 ^ self.A) & (value16 ^ value8) & 0x0080) != 0
-                                    if self.D :
-                                        value16 += ((((value16 + 0x66) ^ self.A ^ value8) >> 3) & 0x22) * 3
-                                    self.C = value16 > 0xFF
-                                    self.A = value16 & 0xFF
+                                    self.A, self.C, self.V = subtraction[self.D << 17 | self.C << 16 | self.A << 8 | value8]
                                     self.Z = self.A == 0
                                     self.S = self.A > 0x7F
                                     clock.ticks += 3
@@ -1800,15 +1775,7 @@ class Puce6502() :
                                 elif inst ==  0xE9 :                            # IMM SBC
                                     value8 = self.readMem(self.PC)
                                     self.PC = (self.PC + 1) & 0xFFFF
-                                    value8 ^= 0xFF
-                                    if self.D :
-                                        value8 -= 0x0066
-                                    value16 = (self.A + value8 + self.C) & 0xFFFF
-                                    self.V = ((value16 ^ self.A) & (value16 ^ value8) & 0x0080) != 0
-                                    if self.D :
-                                        value16 += ((((value16 + 0x66) ^ self.A ^ value8) >> 3) & 0x22) * 3
-                                    self.C = value16 > 0xFF
-                                    self.A = value16 & 0xFF
+                                    self.A, self.C, self.V = subtraction[self.D << 17 | self.C << 16 | self.A << 8 | value8]
                                     self.Z = self.A == 0
                                     self.S = self.A > 0x7F
                                     clock.ticks += 2
@@ -1832,15 +1799,7 @@ class Puce6502() :
                                     address |= self.readMem(self.PC) << 8
                                     self.PC = (self.PC + 1) & 0xFFFF
                                     value8 = self.readMem(address)
-                                    value8 ^= 0xFF
-                                    if self.D :
-                                        value8 -= 0x0066
-                                    value16 = (self.A + value8 + self.C) & 0xFFFF
-                                    self.V = ((value16 ^ self.A) & (value16 ^ value8) & 0x0080) != 0
-                                    if self.D :
-                                        value16 += ((((value16 + 0x66) ^ self.A ^ value8) >> 3) & 0x22) * 3
-                                    self.C = value16 > 0xFF
-                                    self.A = value16 & 0xFF
+                                    self.A, self.C, self.V = subtraction[self.D << 17 | self.C << 16 | self.A << 8 | value8]
                                     self.Z = self.A == 0
                                     self.S = self.A > 0x7F
                                     clock.ticks += 4
@@ -1886,15 +1845,7 @@ class Puce6502() :
                                     address |= self.readMem(value8) << 8
                                     address = (address + self.Y) & 0xFFFF
                                     value8 = self.readMem(address)
-                                    value8 ^= 0xFF
-                                    if self.D :
-                                        value8 -= 0x0066
-                                    value16 = (self.A + value8 + self.C) & 0xFFFF
-                                    self.V = ((value16 ^ self.A) & (value16 ^ value8) & 0x0080) != 0
-                                    if self.D :
-                                        value16 += ((((value16 + 0x66) ^ self.A ^ value8) >> 3) & 0x22) * 3
-                                    self.C = value16 > 0xFF
-                                    self.A = value16 & 0xFF
+                                    self.A, self.C, self.V = subtraction[self.D << 17 | self.C << 16 | self.A << 8 | value8]
                                     self.Z = self.A == 0
                                     self.S = self.A > 0x7F
                                     clock.ticks += 5
@@ -1904,15 +1855,7 @@ class Puce6502() :
                                     address = (self.readMem(self.PC) + self.X) & 0xFF
                                     self.PC = (self.PC + 1) & 0xFFFF
                                     value8 = self.readMem(address)
-                                    value8 ^= 0xFF
-                                    if self.D :
-                                        value8 -= 0x0066
-                                    value16 = (self.A + value8 + self.C) & 0xFFFF
-                                    self.V = ((value16 ^ self.A) & (value16 ^ value8) & 0x0080) != 0
-                                    if self.D :
-                                        value16 += ((((value16 + 0x66) ^ self.A ^ value8) >> 3) & 0x22) * 3
-                                    self.C = value16 > 0xFF
-                                    self.A = value16 & 0xFF
+                                    self.A, self.C, self.V = subtraction[self.D << 17 | self.C << 16 | self.A << 8 | value8]
                                     self.Z = self.A == 0
                                     self.S = self.A > 0x7F
                                     clock.ticks += 4
@@ -1946,15 +1889,7 @@ class Puce6502() :
                                     self.PC = (self.PC + 1) & 0xFFFF
                                     address = (address + self.Y) & 0xFFFF
                                     value8 = self.readMem(address)
-                                    value8 ^= 0xFF
-                                    if self.D :
-                                        value8 -= 0x0066
-                                    value16 = (self.A + value8 + self.C) & 0xFFFF
-                                    self.V = ((value16 ^ self.A) & (value16 ^ value8) & 0x0080) != 0
-                                    if self.D :
-                                        value16 += ((((value16 + 0x66) ^ self.A ^ value8) >> 3) & 0x22) * 3
-                                    self.C = value16 > 0xFF
-                                    self.A = value16 & 0xFF
+                                    self.A, self.C, self.V = subtraction[self.D << 17 | self.C << 16 | self.A << 8 | value8]
                                     self.Z = self.A == 0
                                     self.S = self.A > 0x7F
                                     clock.ticks += 4
@@ -1969,15 +1904,7 @@ class Puce6502() :
                                     self.PC = (self.PC + 1) & 0xFFFF
                                     address = (address + self.X) & 0xFFFF
                                     value8 = self.readMem(address)
-                                    value8 ^= 0xFF
-                                    if self.D :
-                                        value8 -= 0x0066
-                                    value16 = (self.A + value8 + self.C) & 0xFFFF
-                                    self.V = ((value16 ^ self.A) & (value16 ^ value8) & 0x0080) != 0
-                                    if self.D :
-                                        value16 += ((((value16 + 0x66) ^ self.A ^ value8) >> 3) & 0x22) * 3
-                                    self.C =  (value16 & 0xFF00) != 0
-                                    self.A = value16 & 0xFF
+                                    self.A, self.C, self.V = subtraction[self.D << 17 | self.C << 16 | self.A << 8 | value8]
                                     self.Z = self.A == 0
                                     self.S = self.A > 0x7F
                                     clock.ticks += 4
@@ -1998,3 +1925,1663 @@ class Puce6502() :
                                     continue
 
         return(self.PC)
+
+
+
+    """  Table driven dispatch
+
+    An alternative to the binary search tree used by run() : every opcode is
+    implemented by its own method, and the methods are indexed by opcode in a
+    256 entries table (undefined opcodes are mapped to und(), doing nothing).
+
+    Select it by passing core = "table" when instantiating the cpu. The
+    handlers are the exact same code as the branches of run(), so both cores
+    must give the same results with the functionnal tests in puce6502Tests.py
+
+    """
+
+    OPCODES = [
+        "brk", "oraIZX", "und", "und", "und", "oraZPG", "aslZPG", "und", "php", "oraIMM", "aslACC", "und", "und", "oraABS", "aslABS", "und",
+        "bpl", "oraIZY", "und", "und", "und", "oraZPX", "aslZPX", "und", "clc", "oraABY", "und", "und", "und", "oraABX", "aslABX", "und",
+        "jsrABS", "andIZX", "und", "und", "bitZPG", "andZPG", "rolZPG", "und", "plp", "andIMM", "rolACC", "und", "bitABS", "andABS", "rolABS", "und",
+        "bmi", "andIZY", "und", "und", "und", "andZPX", "rolZPX", "und", "sec", "andABY", "und", "und", "und", "andABX", "rolABX", "und",
+        "rti", "eorIZX", "und", "und", "und", "eorZPG", "lsrZPG", "und", "pha", "eorIMM", "lsrACC", "und", "jmpABS", "eorABS", "lsrABS", "und",
+        "bvc", "eorIZY", "und", "und", "und", "eorZPX", "lsrZPX", "und", "cli", "eorABY", "und", "und", "und", "eorABX", "lsrABX", "und",
+        "rts", "adcIZX", "und", "und", "und", "adcZPG", "rorZPG", "und", "pla", "adcIMM", "rorACC", "und", "jmpIND", "adcABS", "rorABS", "und",
+        "bvs", "adcIZY", "und", "und", "und", "adcZPX", "rorZPX", "und", "sei", "adcABY", "und", "und", "und", "adcABX", "rorABX", "und",
+        "und", "staIZX", "und", "und", "styZPG", "staZPG", "stxZPG", "und", "dey", "und", "txa", "und", "styABS", "staABS", "stxABS", "und",
+        "bcc", "staIZY", "und", "und", "styZPX", "staZPX", "stxZPY", "und", "tya", "staABY", "txs", "und", "und", "staABX", "und", "und",
+        "ldyIMM", "ldaIZX", "ldxIMM", "und", "ldyZPG", "ldaZPG", "ldxZPG", "und", "tay", "ldaIMM", "tax", "und", "ldyABS", "ldaABS", "ldxABS", "und",
+        "bcs", "ldaIZY", "und", "und", "ldyZPX", "ldaZPX", "ldxZPY", "und", "clv", "ldaABY", "tsx", "und", "ldyABX", "ldaABX", "ldxABY", "und",
+        "cpyIMM", "cmpIZX", "und", "und", "cpyZPG", "cmpZPG", "decZPG", "und", "iny", "cmpIMM", "dex", "und", "cpyABS", "cmpABS", "decABS", "und",
+        "bne", "cmpIZY", "und", "und", "und", "cmpZPX", "decZPX", "und", "cld", "cmpABY", "und", "und", "und", "cmpABX", "decABX", "und",
+        "cpxIMM", "sbcIZX", "und", "und", "cpxZPG", "sbcZPG", "incZPG", "und", "inx", "sbcIMM", "nop", "und", "cpxABS", "sbcABS", "incABS", "und",
+        "beq", "sbcIZY", "und", "und", "und", "sbcZPX", "incZPX", "und", "sed", "sbcABY", "und", "und", "und", "sbcABX", "incABX", "und"
+    ]
+
+
+    def runTable(self, cycleCount) :
+
+        cycleCount += clock.ticks                                               # cycleCount becomes the target ticks value
+        opcodes = self.opcodes
+        readMem = self.readMem
+        traps = self.traps
+        trapped = frozenset(traps)                                              # their addresses, empty and false without traps
+        while (clock.ticks < cycleCount) :
+
+            PC = self.PC
+            if trapped and PC in trapped and traps[PC](self) is not None :      # a trap did the work of the routine at PC
+                continue
+
+            inst = readMem(PC)                                                  # fetch instruction
+            self.PC = (PC + 1) & 0xFFFF                                         # increment Program Counter
+            opcodes[inst]()                                                     # and execute it
+
+        return(self.PC)
+
+
+    def und(self) :                                                             # undefined opcodes
+        pass
+
+
+    def brk(self) :                                                             # 0x00
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.writeMem(0x100 + self.SP, ((self.PC) >> 8) & 0xFF)
+        self.SP = (self.SP - 1) & 0xFF
+        self.writeMem(0x100 + self.SP, self.PC & 0xFF)
+        self.SP = (self.SP - 1) & 0xFF
+        self.writeMem(0x100 + self.SP, self.getP() | self.BREAK)
+        self.SP = (self.SP - 1) & 0xFF
+        self.I = 1
+        self.D = 0
+        self.PC = self.readMem(0xFFFE) | (self.readMem(0xFFFF) << 8)
+        clock.ticks += 7
+
+
+    def oraIZX(self) :                                                          # 0x01
+        value8 = (self.readMem(self.PC) + self.X) & 0xFF
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = self.readMem(value8)
+        value8 = (value8 + 1) & 0xFF
+        address |= self.readMem(value8) << 8
+        self.A |= self.readMem(address)
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 6
+
+
+    def oraZPG(self) :                                                          # 0x05
+        self.A |= self.readMem(self.readMem(self.PC))
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 3
+
+
+    def aslZPG(self) :                                                          # 0x06
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        value16 = self.readMem(address) << 1
+        self.C = value16 > 0xFF
+        value16 &= 0xFF
+        self.writeMem(address, value16)
+        self.Z = value16 == 0
+        self.S = value16 > 0x7F
+        clock.ticks += 5
+
+
+    def php(self) :                                                             # 0x08
+        self.writeMem(0x100 + self.SP, self.getP() | self.BREAK)
+        self.SP = (self.SP - 1) & 0xFF
+        clock.ticks += 3
+
+
+    def oraIMM(self) :                                                          # 0x09
+        self.A |= self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 2
+
+
+    def aslACC(self) :                                                          # 0x0A
+        value16 = self.A << 1
+        self.C = value16 > 0xFF
+        self.A = value16 & 0xFF
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 2
+
+
+    def oraABS(self) :                                                          # 0x0D
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.A |= self.readMem(address)
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 4
+
+
+    def aslABS(self) :                                                          # 0x0E
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        value16 = self.readMem(address) << 1
+        self.C = value16 > 0xFF
+        value16 &= 0xFF
+        self.writeMem(address, value16)
+        self.Z = value16 == 0
+        self.S = value16 > 0x7F
+        clock.ticks += 6
+
+
+    def bpl(self) :                                                             # 0x10
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        if not self.S :                             # jump taken
+            clock.ticks += 1
+            if address & self.SIGN :
+                address |= 0xFF00
+            if ((self.PC & 0xFF) + address) & 0xFF00 :
+                clock.ticks += 1
+            self.PC = (self.PC + address) & 0xFFFF
+        clock.ticks += 2
+
+
+    def oraIZY(self) :                                                          # 0x11
+        value8 = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = self.readMem(value8)
+        value8 = (value8 + 1) & 0xFF
+        address |= self.readMem(value8) << 8
+        if ((address & 0xFF) + self.Y) & 0xFF00 :
+            clock.ticks += 6
+        else :
+            clock.ticks += 5
+        address = (address + self.Y) & 0xFFFF
+        self.A |= self.readMem(address)
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+
+
+    def oraZPX(self) :                                                          # 0x15
+        self.A |= self.readMem((self.readMem(self.PC) + self.X) & 0xFF)
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 4
+
+
+    def aslZPX(self) :                                                          # 0x16
+        address = (self.readMem(self.PC) + self.X) & 0xFF
+        self.PC = (self.PC + 1) & 0xFFFF
+        value16 = self.readMem(address) << 1
+        self.writeMem(address, value16 & 0xFF)
+        self.C = value16 > 0xFF
+        self.Z = value16 == 0
+        self.S = (value16 & 0xFF) > 0x7F
+        clock.ticks += 6
+
+
+    def clc(self) :                                                             # 0x18
+        self.C = 0
+        clock.ticks += 2
+
+
+    def oraABY(self) :                                                          # 0x19
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        if (address + self.Y) & 0xFF00 :
+            clock.ticks += 5
+        else:
+            clock.ticks += 4
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = (address + self.Y) & 0xFFFF
+        self.A |= self.readMem(address)
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+
+
+    def oraABX(self) :                                                          # 0x1D
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        if (address + self.X) & 0xFF00 :
+            clock.ticks += 5
+        else :
+            clock.ticks += 4
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = (address + self.X) & 0xFFFF
+        self.A |= self.readMem(address)
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+
+
+    def aslABX(self) :                                                          # 0x1E
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = (address + self.X) & 0xFFFF
+        value16 = self.readMem(address) << 1
+        self.C = value16 > 0xFF
+        value16 &= 0xFF
+        self.writeMem(address, value16)
+        self.Z = value16 == 0
+        self.S = value16 > 0x7F
+        clock.ticks += 7
+
+
+    def jsrABS(self) :                                                          # 0x20
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address |= self.readMem(self.PC) << 8
+        self.writeMem(0x100 + self.SP, (self.PC >> 8) & 0xFF)
+        self.SP = (self.SP - 1) & 0xFF
+        self.writeMem(0x100 + self.SP, self.PC & 0xFF)
+        self.SP = (self.SP - 1) & 0xFF
+        self.PC = address
+        clock.ticks += 6
+
+
+    def andIZX(self) :                                                          # 0x21
+        value8 = (self.readMem(self.PC) + self.X) & 0xFF
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = self.readMem(value8)
+        value8 = (value8 + 1) & 0xFF
+        address |= self.readMem(value8) << 8
+        self.A &= self.readMem(address)
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 6
+
+
+    def bitZPG(self) :                                                          # 0x24
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        value8 = self.readMem(address)
+        self.Z = (self.A & value8) == 0
+        self.setP((self.getP() & 0x3F) | (value8 & 0xC0))
+        clock.ticks += 3
+
+
+    def andZPG(self) :                                                          # 0x25
+        self.A &= self.readMem(self.readMem(self.PC))
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 3
+
+
+    def rolZPG(self) :                                                          # 0x26
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        value16 = (self.readMem(address) << 1) | self.C
+        self.C = (value16 & 0x100) != 0
+        value16 &= 0xFF
+        self.writeMem(address, value16)
+        self.Z = value16 == 0
+        self.S = value16 > 0x7F
+        clock.ticks += 5
+
+
+    def plp(self) :                                                             # 0x28
+        self.SP = (self.SP + 1) & 0xFF
+        self.setP(self.readMem(0x100 + self.SP) | self.UNDEF)
+        clock.ticks += 4
+
+
+    def andIMM(self) :                                                          # 0x29
+        self.A &= self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 2
+
+
+    def rolACC(self) :                                                          # 0x2A
+        value16 = (self.A << 1) | self.C
+        self.C = (value16 & 0x100) != 0
+        self.A = value16 & 0xFF
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 2
+
+
+    def bitABS(self) :                                                          # 0x2C
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        value8 = self.readMem(address)
+        self.Z = (self.A & value8) == 0
+        self.setP((self.getP() & 0x3F) | (value8 & 0xC0))
+        clock.ticks += 4
+
+
+    def andABS(self) :                                                          # 0x2D
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.A &= self.readMem(address)
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 4
+
+
+    def rolABS(self) :                                                          # 0x2E
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        value16 = (self.readMem(address) << 1) | self.C
+        self.C = (value16 & 0x100) != 0
+        value16 &= 0xFF
+        self.writeMem(address, value16)
+        self.Z = value16 == 0
+        self.S = value16 > 0x7F
+        clock.ticks += 6
+
+
+    def bmi(self) :                                                             # 0x30
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        if self.S :
+            clock.ticks += 1
+            if address & self.SIGN :
+                address |= 0xFF00
+            if ((self.PC & 0xFF) + address) & 0xFF00 :
+                clock.ticks += 1
+            self.PC = (self.PC + address) & 0xFFFF
+        clock.ticks += 2
+
+
+    def andIZY(self) :                                                          # 0x31
+        value8 = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = self.readMem(value8)
+        value8 = (value8 + 1) & 0xFF
+        address |= self.readMem(value8) << 8
+        if ((address & 0xFF) + self.Y) & 0xFF00 :
+            clock.ticks += 6
+        else :
+            clock.ticks += 5
+        address = (address + self.Y) & 0xFFFF
+        self.A &= self.readMem(address)
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+
+
+    def andZPX(self) :                                                          # 0x35
+        address = (self.readMem(self.PC) + self.X) & 0xFF
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.A &= self.readMem(address)
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 4
+
+
+    def rolZPX(self) :                                                          # 0x36
+        address = (self.readMem(self.PC) + self.X) & 0xFF
+        self.PC = (self.PC + 1) & 0xFFFF
+        value16 = (self.readMem(address) << 1) | self.C
+        self.C = value16 > 0xFF
+        value16 &= 0xFF
+        self.writeMem(address, value16)
+        self.Z = value16 == 0
+        self.S = value16 > 0x7F
+        clock.ticks += 6
+
+
+    def sec(self) :                                                             # 0x38
+        self.C = 1
+        clock.ticks += 2
+
+
+    def andABY(self) :                                                          # 0x39
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        if (address + self.Y) & 0xFF00 :
+            clock.ticks += 5
+        else :
+            clock.ticks += 4
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = (address + self.Y) & 0xFFFF
+        self.A &= self.readMem(address)
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+
+
+    def andABX(self) :                                                          # 0x3D
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        if (address + self.X) & 0xFF00 :
+            clock.ticks += 5
+        else :
+            clock.ticks += 4
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = (address + self.X) & 0xFFFF
+        self.A &= self.readMem(address)
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+
+
+    def rolABX(self) :                                                          # 0x3E
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = (address + self.X) & 0xFFFF
+        value16 = (self.readMem(address) << 1) | self.C
+        self.C = value16 > 0xFF
+        value16 &= 0xFF
+        self.writeMem(address, value16)
+        self.Z = value16 == 0
+        self.S = value16 > 0x7F
+        clock.ticks += 7
+
+
+    def rti(self) :                                                             # 0x40
+        self.SP = (self.SP + 1) & 0xFF
+        self.setP(self.readMem(0x100 + self.SP))
+        self.SP = (self.SP + 1) & 0xFF
+        self.PC = self.readMem(0x100 + self.SP)
+        self.SP = (self.SP + 1) & 0xFF
+        self.PC |= self.readMem(0x100 + self.SP) << 8
+        clock.ticks += 6
+
+
+    def eorIZX(self) :                                                          # 0x41
+        value8 = (self.readMem(self.PC) + self.X) & 0xFF
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = self.readMem(value8)
+        value8 = (value8 + 1) & 0xFF
+        address |= self.readMem(value8) << 8
+        self.A ^= self.readMem(address)
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 6
+
+
+    def eorZPG(self) :                                                          # 0x45
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.A ^= self.readMem(address)
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 3
+
+
+    def lsrZPG(self) :                                                          # 0x46
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        value8 = self.readMem(address)
+        self.C = (value8 & 1) != 0
+        value8 = value8 >> 1
+        self.writeMem(address, value8)
+        self.Z = value8 == 0
+        self.S = value8 > 0x7F
+        clock.ticks += 5
+
+
+    def pha(self) :                                                             # 0x48
+        self.writeMem(0x100 + self.SP, self.A)
+        self.SP = (self.SP - 1) & 0xFF
+        clock.ticks += 3
+
+
+    def eorIMM(self) :                                                          # 0x49
+        self.A ^= self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 2
+
+
+    def lsrACC(self) :                                                          # 0x4A
+        self.C = (self.A & 1) != 0
+        self.A = self.A >> 1
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 2
+
+
+    def jmpABS(self) :                                                          # 0x4C
+        self.PC = self.readMem(self.PC) | (self.readMem(self.PC + 1) << 8)
+        clock.ticks += 3
+
+
+    def eorABS(self) :                                                          # 0x4D
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.A ^= self.readMem(address)
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 4
+
+
+    def lsrABS(self) :                                                          # 0x4E
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        value8 = self.readMem(address)
+        self.C = (value8 & 1) != 0
+        value8 = value8 >> 1
+        self.writeMem(address, value8)
+        self.Z = value8 == 0
+        self.S = value8 > 0x7F
+        clock.ticks += 6
+
+
+    def bvc(self) :                                                             # 0x50
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        if not self.V :
+            clock.ticks += 1
+            if address & self.SIGN:
+                address |= 0xFF00
+            if ((self.PC & 0xFF) + address) & 0xFF00 :
+                clock.ticks += 1
+            self.PC = (self.PC + address) & 0xFFFF
+        clock.ticks += 2
+
+
+    def eorIZY(self) :                                                          # 0x51
+        value8 = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = self.readMem(value8)
+        value8 = (value8 + 1) & 0xFF
+        address |= self.readMem(value8) << 8
+        if ((address & 0xFF) + self.Y) & 0xFF00 :
+            clock.ticks += 6
+        else :
+            clock.ticks += 5
+        self.A ^= self.readMem((address + self.Y) & 0xFFFF)
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+
+
+    def eorZPX(self) :                                                          # 0x55
+        address = (self.readMem(self.PC) + self.X) & 0xFF
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.A ^= self.readMem(address)
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 4
+
+
+    def lsrZPX(self) :                                                          # 0x56
+        address = (self.readMem(self.PC) + self.X) & 0xFF
+        self.PC = (self.PC + 1) & 0xFFFF
+        value8 = self.readMem(address)
+        self.C = (value8 & 1) != 0
+        value8 = value8 >> 1
+        self.writeMem(address, value8)
+        self.Z = value8 == 0
+        self.S = value8 > 0x7F
+        clock.ticks += 6
+
+
+    def cli(self) :                                                             # 0x58
+        self.I = 0
+        clock.ticks += 2
+
+
+    def eorABY(self) :                                                          # 0x59
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        if (address + self.Y) & 0xFF00 :
+            clock.ticks += 5
+        else :
+            clock.ticks += 4
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = (address + self.Y) & 0xFFFF
+        self.A ^= self.readMem(address)
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+
+
+    def eorABX(self) :                                                          # 0x5D
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        if (address + self.X) & 0xFF00 :
+            clock.ticks += 5
+        else :
+            clock.ticks += 4
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = (address + self.X) & 0xFFFF
+        self.A ^= self.readMem(address)
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+
+
+    def lsrABX(self) :                                                          # 0x5E
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = (address + self.X) & 0xFFFF
+        value8 = self.readMem(address)
+        self.C = (value8 & 1) != 0
+        value8 = value8 >> 1
+        self.writeMem(address, value8)
+        self.Z = value8 == 0
+        self.S = value8 > 0x7F
+        clock.ticks += 7
+
+
+    def rts(self) :                                                             # 0x60
+        self.SP = (self.SP + 1) & 0xFF
+        self.PC = self.readMem(0x100 + self.SP)
+        self.SP = (self.SP + 1) & 0xFF
+        self.PC |= self.readMem(0x100 + self.SP) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        clock.ticks += 6
+
+
+    def adcIZX(self) :                                                          # 0x61
+        value8 = (self.readMem(self.PC) + self.X) & 0xFF
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = self.readMem(value8)
+        value8 = (value8 + 1) & 0xFF
+        address |= self.readMem(value8) << 8
+        value8 = self.readMem(address)
+        self.A, self.C, self.V = ADDITION[self.D << 17 | self.C << 16 | self.A << 8 | value8]
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 6
+
+
+    def adcZPG(self) :                                                          # 0x65
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        value8 = self.readMem(address)
+        self.A, self.C, self.V = ADDITION[self.D << 17 | self.C << 16 | self.A << 8 | value8]
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 3
+
+
+    def rorZPG(self) :                                                          # 0x66
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        value8 = self.readMem(address)
+        value16 = (value8 >> 1) | (self.C << 7)
+        self.C = (value8 & 0x1) != 0
+        value16 &= 0xFF
+        self.writeMem(address, value16)
+        self.Z = value16 == 0
+        self.S = value16 > 0x7F
+        clock.ticks += 5
+
+
+    def pla(self) :                                                             # 0x68
+        self.SP = (self.SP + 1) & 0xFF
+        self.A = self.readMem(0x100 + self.SP)
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 4
+
+
+    def adcIMM(self) :                                                          # 0x69
+        value8 = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.A, self.C, self.V = ADDITION[self.D << 17 | self.C << 16 | self.A << 8 | value8]
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 2
+
+
+    def rorACC(self) :                                                          # 0x6A
+        value16 = (self.A >> 1) | (self.C << 7)
+        self.C = (self.A & 0x1) != 0
+        self.A = value16 & 0xFF
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 2
+
+
+    def jmpIND(self) :                                                          # 0x6C
+        address = self.readMem(self.PC) | self.readMem(self.PC + 1) << 8
+        self.PC = self.readMem(address) | (self.readMem(address + 1) << 8)
+        clock.ticks += 5
+
+
+    def adcABS(self) :                                                          # 0x6D
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        value8 = self.readMem(address)
+        self.A, self.C, self.V = ADDITION[self.D << 17 | self.C << 16 | self.A << 8 | value8]
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 4
+
+
+    def rorABS(self) :                                                          # 0x6E
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        value8 = self.readMem(address)
+        value16 = (value8 >> 1) | (self.C << 7)
+        self.C = (value8 & 0x1) != 0
+        value16 = value16 & 0xFF
+        self.writeMem(address, value16)
+        self.Z = value16 == 0
+        self.S = value16 > 0x7F
+        clock.ticks += 6
+
+
+    def bvs(self) :                                                             # 0x70
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        if self.V :
+            clock.ticks += 1
+            if address & self.SIGN :
+                address |= 0xFF00
+            if ((self.PC & 0xFF) + address) & 0xFF00 :
+                clock.ticks += 1
+            self.PC = (self.PC + address) & 0xFFFF
+        clock.ticks += 2
+
+
+    def adcIZY(self) :                                                          # 0x71
+        value8 = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = self.readMem(value8)
+        if (address + self.Y) & 0xFF00 :
+            clock.ticks += 1
+        value8 = (value8 + 1) & 0xFF
+        address |= self.readMem(value8) << 8
+        address = (address + self.Y) & 0xFFFF
+        value8 = self.readMem(address)
+        self.A, self.C, self.V = ADDITION[self.D << 17 | self.C << 16 | self.A << 8 | value8]
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 5
+
+
+    def adcZPX(self) :                                                          # 0x75
+        address = (self.readMem(self.PC) + self.X) & 0xFF
+        self.PC = (self.PC + 1) & 0xFFFF
+        value8 = self.readMem(address)
+        self.A, self.C, self.V = ADDITION[self.D << 17 | self.C << 16 | self.A << 8 | value8]
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 4
+
+
+    def rorZPX(self) :                                                          # 0x76
+        address = (self.readMem(self.PC) + self.X) & 0xFF
+        self.PC = (self.PC + 1) & 0xFFFF
+        value8 = self.readMem(address)
+        value16 = (value8 >> 1) | (self.C << 7)
+        self.C = (value8 & 0x1) != 0
+        value16 = value16 & 0xFF
+        self.writeMem(address, value16)
+        self.Z = value16 == 0
+        self.S = value16 > 0x7F
+        clock.ticks += 6
+
+
+    def sei(self) :                                                             # 0x78
+        self.I = 1
+        clock.ticks += 2
+
+
+    def adcABY(self) :                                                          # 0x79
+        if (self.readMem(self.PC) + self.Y) & 0xFF00 :
+            clock.ticks += 1
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = (address + self.Y) & 0xFFFF
+        value8 = self.readMem(address)
+        self.A, self.C, self.V = ADDITION[self.D << 17 | self.C << 16 | self.A << 8 | value8]
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 4
+
+
+    def adcABX(self) :                                                          # 0x7D
+        if (self.readMem(self.PC) + self.X) & 0xFF00 :
+            clock.ticks += 1
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = (address + self.X) & 0xFFFF
+        value8 = self.readMem(address)
+        self.A, self.C, self.V = ADDITION[self.D << 17 | self.C << 16 | self.A << 8 | value8]
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 4
+
+
+    def rorABX(self) :                                                          # 0x7E
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = (address + self.X) & 0xFFFF
+        value8 = self.readMem(address)
+        value16 = (value8 >> 1) | (self.C << 7)
+        self.C = (value8 & 0x1) != 0
+        value16 = value16 & 0xFF
+        self.writeMem(address, value16)
+        self.Z = value16 == 0
+        self.S = value16 > 0x7F
+        clock.ticks += 7
+
+
+    def staIZX(self) :                                                          # 0x81
+        value8 = (self.readMem(self.PC) + self.X) & 0xFF
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = self.readMem(value8)
+        value8 = (value8 + 1) & 0xFF
+        address |= self.readMem(value8) << 8
+        self.writeMem(address, self.A)
+        clock.ticks += 6
+
+
+    def styZPG(self) :                                                          # 0x84
+        self.writeMem(self.readMem(self.PC), self.Y)
+        self.PC = (self.PC + 1) & 0xFFFF
+        clock.ticks += 3
+
+
+    def staZPG(self) :                                                          # 0x85
+        self.writeMem(self.readMem(self.PC), self.A)
+        self.PC = (self.PC + 1) & 0xFFFF
+        clock.ticks += 3
+
+
+    def stxZPG(self) :                                                          # 0x86
+        self.writeMem(self.readMem(self.PC), self.X)
+        self.PC = (self.PC + 1) & 0xFFFF
+        clock.ticks += 3
+
+
+    def dey(self) :                                                             # 0x88
+        self.Y = (self.Y - 1) & 0xFF
+        self.Z = (self.Y & 0xFF) == 0
+        self.S = (self.Y & self.SIGN) != 0
+        clock.ticks += 2
+
+
+    def txa(self) :                                                             # 0x8A
+        self.A = self.X
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 2
+
+
+    def styABS(self) :                                                          # 0x8C
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.writeMem(address, self.Y)
+        clock.ticks += 4
+
+
+    def staABS(self) :                                                          # 0x8D
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.writeMem(address, self.A)
+        clock.ticks += 4
+
+
+    def stxABS(self) :                                                          # 0x8E
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.writeMem(address, self.X)
+        clock.ticks += 4
+
+
+    def bcc(self) :                                                             # 0x90
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        if not self.C  :
+            clock.ticks += 1
+            if address & self.SIGN :
+                address |= 0xFF00
+            if ((self.PC & 0xFF) + address) & 0xFF00 :
+                clock.ticks += 1
+            self.PC = (self.PC + address) & 0xFFFF
+        clock.ticks += 2
+
+
+    def staIZY(self) :                                                          # 0x91
+        value8 = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = self.readMem(value8)
+        value8 = (value8 + 1) & 0xFF
+        address |= self.readMem(value8) << 8
+        address = (address + self.Y) & 0xFFFF
+        self.writeMem(address, self.A)
+        clock.ticks += 6
+
+
+    def styZPX(self) :                                                          # 0x94
+        address = (self.readMem(self.PC) + self.X) & 0xFF
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.writeMem(address, self.Y)
+        clock.ticks += 4
+
+
+    def staZPX(self) :                                                          # 0x95
+        self.writeMem((self.readMem(self.PC) + self.X) & 0xFF, self.A)
+        self.PC = (self.PC + 1) & 0xFFFF
+        clock.ticks += 4
+
+
+    def stxZPY(self) :                                                          # 0x96
+        self.writeMem((self.readMem(self.PC) + self.Y) & 0xFF, self.X)
+        self.PC = (self.PC + 1) & 0xFFFF
+        clock.ticks += 4
+
+
+    def tya(self) :                                                             # 0x98
+        self.A = self.Y
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 2
+
+
+    def staABY(self) :                                                          # 0x99
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = (address + self.Y) & 0xFFFF
+        self.writeMem(address, self.A)
+        clock.ticks += 5
+
+
+    def txs(self) :                                                             # 0x9A
+        self.SP = self.X
+        clock.ticks += 2
+
+
+    def staABX(self) :                                                          # 0x9D
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = (address + self.X) & 0xFFFF
+        self.writeMem(address, self.A)
+        clock.ticks += 5
+
+
+    def ldyIMM(self) :                                                          # 0xA0
+        self.Y = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.Z = self.Y == 0
+        self.S = self.Y > 0x7F
+        clock.ticks += 2
+
+
+    def ldaIZX(self) :                                                          # 0xA1
+        value8 = (self.readMem(self.PC) + self.X) & 0xFF
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = self.readMem(value8)
+        value8 = (value8 + 1) & 0xFF
+        address |= self.readMem(value8) << 8
+        self.A = self.readMem(address)
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 6
+
+
+    def ldxIMM(self) :                                                          # 0xA2
+        address = self.PC
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.X = self.readMem(address)
+        self.Z = self.X == 0
+        self.S = self.X > 0x7F
+        clock.ticks += 2
+
+
+    def ldyZPG(self) :                                                          # 0xA4
+        self.Y = self.readMem(self.readMem(self.PC))
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.Z = self.Y == 0
+        self.S = self.Y > 0x7F
+        clock.ticks += 3
+
+
+    def ldaZPG(self) :                                                          # 0xA5
+        self.A = self.readMem(self.readMem(self.PC))
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 3
+
+
+    def ldxZPG(self) :                                                          # 0xA6
+        self.X = self.readMem(self.readMem(self.PC))
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.Z = self.X == 0
+        self.S = self.X > 0x7F
+        clock.ticks += 3
+
+
+    def tay(self) :                                                             # 0xA8
+        self.Y = self.A
+        self.Z = self.Y == 0
+        self.S = self.Y > 0x7F
+        clock.ticks += 2
+
+
+    def ldaIMM(self) :                                                          # 0xA9
+        self.A = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 2
+
+
+    def tax(self) :                                                             # 0xAA
+        self.X = self.A
+        self.Z = self.X == 0
+        self.S = self.X > 0x7F
+        clock.ticks += 2
+
+
+    def ldyABS(self) :                                                          # 0xAC
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.Y = self.readMem(address)
+        self.Z = self.Y == 0
+        self.S = self.Y > 0x7F
+        clock.ticks += 4
+
+
+    def ldaABS(self) :                                                          # 0xAD
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.A = self.readMem(address)
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 4
+
+
+    def ldxABS(self) :                                                          # 0xAE
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.X = self.readMem(address)
+        self.Z = self.X == 0
+        self.S = self.X > 0x7F
+        clock.ticks += 4
+
+
+    def bcs(self) :                                                             # 0xB0
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        if self.C :
+            clock.ticks += 1
+            if address & self.SIGN :
+                address |= 0xFF00
+            if ((self.PC & 0xFF) + address) & 0xFF00 :
+                clock.ticks += 1
+            self.PC = (self.PC + address) & 0xFFFF
+        clock.ticks += 2
+
+
+    def ldaIZY(self) :                                                          # 0xB1
+        value8 = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = self.readMem(value8)
+        value8 = (value8 + 1) & 0xFF
+        address |= self.readMem(value8) << 8
+        self.A = self.readMem((address + self.Y) & 0xFFFF)
+        if ((address & 0xFF) + self.Y) & 0xFF00 :
+            clock.ticks += 6
+        else :
+            clock.ticks += 5
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+
+
+    def ldyZPX(self) :                                                          # 0xB4
+        address = (self.readMem(self.PC) + self.X) & 0xFF
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.Y = self.readMem(address)
+        self.Z = self.Y == 0
+        self.S = self.Y > 0x7F
+        clock.ticks += 4
+
+
+    def ldaZPX(self) :                                                          # 0xB5
+        address = (self.readMem(self.PC) + self.X) & 0xFF
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.A = self.readMem(address)
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 4
+
+
+    def ldxZPY(self) :                                                          # 0xB6
+        address = (self.readMem(self.PC) + self.Y) & 0xFF
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.X = self.readMem(address)
+        self.Z = self.X == 0
+        self.S = self.X > 0x7F
+        clock.ticks += 4
+
+
+    def clv(self) :                                                             # 0xB8
+        self.V = 0
+        clock.ticks += 2
+
+
+    def ldaABY(self) :                                                          # 0xB9
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        if (address + self.Y) & 0xFF00 :
+            clock.ticks += 5
+        else :
+            clock.ticks += 4
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = (address + self.Y) & 0xFFFF
+        self.A = self.readMem(address)
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+
+
+    def tsx(self) :                                                             # 0xBA
+        self.X = self.SP
+        self.Z = self.X == 0
+        self.S = self.X > 0x7F
+        clock.ticks += 2
+
+
+    def ldyABX(self) :                                                          # 0xBC
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        if (address + self.X) & 0xFF00 :
+            clock.ticks += 5
+        else :
+            clock.ticks += 4
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = (address + self.X) & 0xFFFF
+        self.Y = self.readMem(address)
+        self.Z = self.Y == 0
+        self.S = self.Y > 0x7F
+
+
+    def ldaABX(self) :                                                          # 0xBD
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        if (address + self.X) & 0xFF00 :
+            clock.ticks += 5
+        else :
+            clock.ticks += 4
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = (address + self.X) & 0xFFFF
+        self.A = self.readMem(address)
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+
+
+    def ldxABY(self) :                                                          # 0xBE
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        if (address + self.Y) & 0xFF00 :
+            clock.ticks += 5
+        else :
+            clock.ticks += 4
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = (address + self.Y) & 0xFFFF
+        self.X = self.readMem(address)
+        self.Z = self.X == 0
+        self.S = self.X > 0x7F
+
+
+    def cpyIMM(self) :                                                          # 0xC0
+        value8 = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.Z = ((self.Y - value8) & 0xFF) == 0
+        self.S = ((self.Y - value8) & self.SIGN) != 0
+        self.C = (self.Y >= value8) != 0
+        clock.ticks += 2
+
+
+    def cmpIZX(self) :                                                          # 0xC1
+        value8 = (self.readMem(self.PC) + self.X) & 0xFF
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = self.readMem(value8)
+        value8 = (value8 + 1) & 0xFF
+        address |= self.readMem(value8) << 8
+        value8 = self.readMem(address)
+        self.Z = ((self.A - value8) & 0xFF) == 0
+        self.S = ((self.A - value8) & self.SIGN) != 0
+        self.C = (self.A >= value8) != 0
+        clock.ticks += 6
+
+
+    def cpyZPG(self) :                                                          # 0xC4
+        value8 = self.readMem(self.readMem(self.PC))
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.Z = ((self.Y - value8) & 0xFF) == 0
+        self.S = ((self.Y - value8) & self.SIGN) != 0
+        self.C = (self.Y >= value8) != 0
+        clock.ticks += 3
+
+
+    def cmpZPG(self) :                                                          # 0xC5
+        value8 = self.readMem(self.readMem(self.PC))
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.Z = ((self.A - value8) & 0xFF) == 0
+        self.S = ((self.A - value8) & self.SIGN) != 0
+        self.C = (self.A >= value8) != 0
+        clock.ticks += 3
+
+
+    def decZPG(self) :                                                          # 0xC6
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        value8 = self.readMem(address)
+        value8 = (value8 - 1) & 0xFF
+        self.writeMem(address, value8)
+        self.Z = value8 == 0
+        self.S = value8 > 0x7F
+        clock.ticks += 5
+
+
+    def iny(self) :                                                             # 0xC8
+        self.Y = (self.Y + 1) & 0xFF
+        self.Z = self.Y  == 0
+        self.S = self.Y > 0x7F
+        clock.ticks += 2
+
+
+    def cmpIMM(self) :                                                          # 0xC9
+        value8 = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.Z = ((self.A - value8) & 0xFF) == 0
+        self.S = ((self.A - value8) & self.SIGN) != 0
+        self.C = (self.A >= value8) != 0
+        clock.ticks += 2
+
+
+    def dex(self) :                                                             # 0xCA
+        self.X = (self.X - 1) & 0xFF
+        self.Z = (self.X & 0xFF) == 0
+        self.S = self.X > 0x7F
+        clock.ticks += 2
+
+
+    def cpyABS(self) :                                                          # 0xCC
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        value8 = self.readMem(address)
+        self.Z = ((self.Y - value8) & 0xFF) == 0
+        self.S = ((self.Y - value8) & self.SIGN) != 0
+        self.C = (self.Y >= value8) != 0
+        clock.ticks += 4
+
+
+    def cmpABS(self) :                                                          # 0xCD
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        value8 = self.readMem(address)
+        self.Z = ((self.A - value8) & 0xFF) == 0
+        self.S = ((self.A - value8) & self.SIGN) != 0
+        self.C = (self.A >= value8) != 0
+        clock.ticks += 4
+
+
+    def decABS(self) :                                                          # 0xCE
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        value8 = self.readMem(address)
+        value8 = (value8 - 1) & 0xFF
+        self.writeMem(address, value8)
+        self.Z = value8 == 0
+        self.S = value8 > 0x7F
+        clock.ticks += 6
+
+
+    def bne(self) :                                                             # 0xD0
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        if not self.Z :
+            clock.ticks += 1
+            if address & self.SIGN :
+                address |= 0xFF00
+            if ((self.PC & 0xFF) + address) & 0xFF00 :
+                clock.ticks += 1
+            self.PC = (self.PC + address) & 0xFFFF
+        clock.ticks += 2
+
+
+    def cmpIZY(self) :                                                          # 0xD1
+        value8 = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = self.readMem(value8)
+        if (address + self.Y) & 0xFF00 :
+            clock.ticks += 6
+        else :
+            clock.ticks += 5
+        value8 = (value8 + 1) & 0xFF
+        address |= self.readMem(value8) << 8
+        address = (address + self.Y) & 0xFFFF
+        value8 = self.readMem(address)
+        self.Z = ((self.A - value8) & 0xFF) == 0
+        self.S = ((self.A - value8) & self.SIGN) != 0
+        self.C = (self.A >= value8) != 0
+
+
+    def cmpZPX(self) :                                                          # 0xD5
+        address = (self.readMem(self.PC) + self.X) & 0xFF
+        self.PC = (self.PC + 1) & 0xFFFF
+        value8 = self.readMem(address)
+        self.Z = ((self.A - value8) & 0xFF) == 0
+        self.S = ((self.A - value8) & self.SIGN) != 0
+        self.C = (self.A >= value8) != 0
+        clock.ticks += 4
+
+
+    def decZPX(self) :                                                          # 0xD6
+        address = (self.readMem(self.PC) + self.X) & 0xFF
+        self.PC = (self.PC + 1) & 0xFFFF
+        value8 = self.readMem(address)
+        value8 = (value8 - 1) & 0xFF
+        self.writeMem(address, value8)
+        self.Z = value8 == 0
+        self.S = value8 > 0x7F
+        clock.ticks += 6
+
+
+    def cld(self) :                                                             # 0xD8
+        self.D = 0
+        clock.ticks += 2
+
+
+    def cmpABY(self) :                                                          # 0xD9
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        if (address + self.Y) & 0xFF00 :
+            clock.ticks += 5
+        else :
+            clock.ticks += 4
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = (address + self.Y) & 0xFFFF
+        value8 = self.readMem(address)
+        self.Z = ((self.A - value8) & 0xFF) == 0
+        self.S = ((self.A - value8) & self.SIGN) != 0
+        self.C = (self.A >= value8) != 0
+
+
+    def cmpABX(self) :                                                          # 0xDD
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        if (address + self.X) & 0xFF00 :
+            clock.ticks += 5
+        else :
+            clock.ticks += 4
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = (address + self.X) & 0xFFFF
+        value8 = self.readMem(address)
+        self.Z = ((self.A - value8) & 0xFF) == 0
+        self.S = ((self.A - value8) & self.SIGN) != 0
+        self.C = (self.A >= value8) != 0
+
+
+    def decABX(self) :                                                          # 0xDE
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = (address + self.X) & 0xFFFF
+        value8 = self.readMem(address)
+        value8 = (value8 - 1) & 0xFF
+        self.writeMem(address, value8)
+        self.Z = value8 == 0
+        self.S = (value8 & self.SIGN) != 0
+        clock.ticks += 7
+
+
+    def cpxIMM(self) :                                                          # 0xE0
+        value8 = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.Z = ((self.X - value8) & 0xFF) == 0
+        self.S = ((self.X - value8) & self.SIGN) != 0
+        self.C = (self.X >= value8) != 0
+        clock.ticks += 2
+
+
+    def sbcIZX(self) :                                                          # 0xE1
+        value8 = (self.readMem(self.PC) + self.X) & 0xFF
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = self.readMem(value8)
+        value8 = (value8 + 1) & 0xFF
+        address |= self.readMem(value8) << 8
+        value8 = self.readMem(address)
+        self.A, self.C, self.V = SUBTRACTION[self.D << 17 | self.C << 16 | self.A << 8 | value8]
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 6
+
+
+    def cpxZPG(self) :                                                          # 0xE4
+        value8 = self.readMem(self.readMem(self.PC))
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.Z = ((self.X - value8) & 0xFF) == 0
+        self.S = ((self.X - value8) & self.SIGN) != 0
+        self.C = (self.X >= value8) != 0
+        clock.ticks += 3
+
+
+    def sbcZPG(self) :                                                          # 0xE5
+        value8 = self.readMem(self.readMem(self.PC))
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.A, self.C, self.V = SUBTRACTION[self.D << 17 | self.C << 16 | self.A << 8 | value8]
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 3
+
+
+    def incZPG(self) :                                                          # 0xE6
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        value8 = (self.readMem(address) + 1) & 0xFF
+        self.writeMem(address, value8)
+        self.Z = value8 == 0
+        self.S = value8 > 0x7F
+        clock.ticks += 5
+
+
+    def inx(self) :                                                             # 0xE8
+        self.X = (self.X + 1) & 0xFF
+        self.Z = self.X == 0
+        self.S = self.X > 0x7F
+        clock.ticks += 2
+
+
+    def sbcIMM(self) :                                                          # 0xE9
+        value8 = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        self.A, self.C, self.V = SUBTRACTION[self.D << 17 | self.C << 16 | self.A << 8 | value8]
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 2
+
+
+    def nop(self) :                                                             # 0xEA
+        clock.ticks += 2
+
+
+    def cpxABS(self) :                                                          # 0xEC
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        value8 = self.readMem(address)
+        self.Z = ((self.X - value8) & 0xFF) == 0
+        self.S = ((self.X - value8) & self.SIGN) != 0
+        self.C = (self.X >= value8) != 0
+        clock.ticks += 4
+
+
+    def sbcABS(self) :                                                          # 0xED
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        value8 = self.readMem(address)
+        self.A, self.C, self.V = SUBTRACTION[self.D << 17 | self.C << 16 | self.A << 8 | value8]
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 4
+
+
+    def incABS(self) :                                                          # 0xEE
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        value8 = self.readMem(address)
+        value8 = (value8 + 1) & 0xFF
+        self.writeMem(address, value8)
+        self.Z = value8 == 0
+        self.S = value8 > 0x7F
+        clock.ticks += 6
+
+
+    def beq(self) :                                                             # 0xF0
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        if self.Z :
+            clock.ticks += 1
+            if address & self.SIGN :
+                address |= 0xFF00
+            if ((self.PC & 0xFF) + address) & 0xFF00 :
+                clock.ticks += 1
+            self.PC = (self.PC + address) & 0xFFFF
+        clock.ticks += 2
+
+
+    def sbcIZY(self) :                                                          # 0xF1
+        value8 = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = self.readMem(value8)
+        if (address + self.Y) & 0xFF00 :
+            clock.ticks += 1
+        value8 = (value8 + 1) & 0xFF
+        address |= self.readMem(value8) << 8
+        address = (address + self.Y) & 0xFFFF
+        value8 = self.readMem(address)
+        self.A, self.C, self.V = SUBTRACTION[self.D << 17 | self.C << 16 | self.A << 8 | value8]
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 5
+
+
+    def sbcZPX(self) :                                                          # 0xF5
+        address = (self.readMem(self.PC) + self.X) & 0xFF
+        self.PC = (self.PC + 1) & 0xFFFF
+        value8 = self.readMem(address)
+        self.A, self.C, self.V = SUBTRACTION[self.D << 17 | self.C << 16 | self.A << 8 | value8]
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 4
+
+
+    def incZPX(self) :                                                          # 0xF6
+        address = (self.readMem(self.PC) + self.X) & 0xFF
+        self.PC = (self.PC + 1) & 0xFFFF
+        value8 = self.readMem(address)
+        value8 = (value8 + 1) & 0xFF
+        self.writeMem(address, value8)
+        self.Z = value8 == 0
+        self.S = value8 > 0x7F
+        clock.ticks += 6
+
+
+    def sed(self) :                                                             # 0xF8
+        self.D = 1
+        clock.ticks += 2
+
+
+    def sbcABY(self) :                                                          # 0xF9
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        if (address + self.Y) & 0xFF00 :
+            clock.ticks += 1
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = (address + self.Y) & 0xFFFF
+        value8 = self.readMem(address)
+        self.A, self.C, self.V = SUBTRACTION[self.D << 17 | self.C << 16 | self.A << 8 | value8]
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 4
+
+
+    def sbcABX(self) :                                                          # 0xFD
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        if (address + self.X) & 0xFF00 :
+            clock.ticks += 1
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = (address + self.X) & 0xFFFF
+        value8 = self.readMem(address)
+        self.A, self.C, self.V = SUBTRACTION[self.D << 17 | self.C << 16 | self.A << 8 | value8]
+        self.Z = self.A == 0
+        self.S = self.A > 0x7F
+        clock.ticks += 4
+
+
+    def incABX(self) :                                                          # 0xFE
+        address = self.readMem(self.PC)
+        self.PC = (self.PC + 1) & 0xFFFF
+        address |= self.readMem(self.PC) << 8
+        self.PC = (self.PC + 1) & 0xFFFF
+        address = (address + self.X) & 0xFFFF
+        value8 = self.readMem(address)
+        value8 = (value8 + 1) & 0xFF
+        self.writeMem(address, value8)
+        self.Z = value8 == 0
+        self.S = value8 > 0x7F
+        clock.ticks += 7
@@ -0,0 +1,158 @@
+#!/bin/env python3
+
+"""
+  Differential tests of the puce6502 cores
+
+  Every core runs the same seeded random programs as the tree core, and must
+  leave the same registers, flags, RAM and clock ticks. The programs are made
+  of the documented opcodes, with forward branches and jumps only so that
+  they end on their last JMP, and run from $D000 where, as in the ROM of the
+  Apple II, writes are ignored : the random stores and indexed addresses go
+  anywhere below $C000 without ever changing the code.
+
+  The registers, the RAM and the zero page pointers start random too, the
+  decimal flag included.
+
+  Then the branches, forward and backward, taken or not, crossing a page or
+  not, are compared one at a time from random addresses.
+"""
+
+import puce6502, puce6502Gen, clock
+import random, sys
+
+
+SIZES = {"IMP" : 1, "ACC" : 1, "IMM" : 2, "ZPG" : 2, "ZPX" : 2, "ZPY" : 2, "IZX" : 2,  # bytes of the instructions by addressing mode
+         "IZY" : 2, "REL" : 2, "ABS" : 3, "ABX" : 3, "ABY" : 3, "IND" : 3}
+CODE = 0xD000                                                                   # where the programs start, read only
+END = 0xF000                                                                    # JMP END, where they stop
+LIMIT = 100000                                                                  # cycles, they take a few thousands
+CORES = ("table", "locals", "lazy", "decoded", "blocks")
+OPCODES = [opcode for opcode, (mnemonic, mode, cycles) in puce6502Gen.OPCODES.items()
+           if mnemonic not in ("BRK", "JSR", "RTI", "RTS") and mode != "IND"]  # the stack and the vectors are random
+BRANCHES = [opcode for opcode, (mnemonic, mode, cycles) in puce6502Gen.OPCODES.items() if mode == "REL"]
+
+
+def program(rng, length) :
+    """ the bytes of a random program of 'length' instructions, starting at CODE """
+
+    instructions = [rng.choice(OPCODES) for i in range(length)] + [0x4C]       # JMP END
+    addresses = [CODE]
+    for opcode in instructions :
+        addresses.append(addresses[-1] + SIZES[puce6502Gen.OPCODES[opcode][1]])
+
+    code = bytearray()
+    for index, opcode in enumerate(instructions) :
+        mnemonic, mode, cycles = puce6502Gen.OPCODES[opcode]
+        code.append(opcode)
+        if mode == "REL" :                                                      # forward, to one of the next instructions in range
+            after = addresses[index] + 2
+            targets = [address for address in addresses[index + 1 : -1] if address - after < 0x80]
+            code.append(rng.choice(targets) - after)
+        elif opcode == 0x4C :                                                   # JMP, forward too
+            target = END if index == length else rng.choice(addresses[index + 1 : -1] + [END])
+            code += target.to_bytes(2, "little")
+        elif mode in ("ABS", "ABX", "ABY") :
+            code += rng.randrange(0x10000).to_bytes(2, "little")
+        elif SIZES[mode] == 2 :
+            code.append(rng.randrange(0x100))
+    return code
+
+
+def run(core, seed, length) :
+    """ the state left by the random program 'seed' on the core """
+
+    rng = random.Random(seed)
+    ram = bytearray(rng.randrange(0x100) for i in range(0x10000))
+    code = program(rng, length)
+    ram[CODE : CODE + len(code)] = code
+    ram[END : END + 3] = bytes((0x4C, END & 0xFF, END >> 8))
+
+    def readMem(address) :
+        return ram[address]
+
+    def writeMem(address, value) :
+        if address < 0xC000 :                                                   # the code is in ROM
+            ram[address] = value
+
+    cpu = puce6502.Puce6502(readMem, writeMem, core, ram = ram)
+    cpu.A, cpu.X, cpu.Y, cpu.SP = (rng.randrange(0x100) for i in range(4))
+    cpu.setP(rng.randrange(0x100))
+    cpu.PC = CODE
+
+    start = clock.ticks
+    while cpu.PC != END and clock.ticks - start < LIMIT :
+        cpu.run(1)                                                              # the blocks core runs a whole block
+    return {"A" : cpu.A, "X" : cpu.X, "Y" : cpu.Y, "SP" : cpu.SP, "P" : cpu.getP(),
+            "PC" : cpu.PC, "ticks" : clock.ticks - start, "ram" : bytes(ram)}
+
+
+def branches(core, seed, count) :
+    """ the PC and the cycles after each of 'count' random branches, both ways """
+
+    rng = random.Random(seed)
+    ram = bytearray(0x10000)
+    cpu = puce6502.Puce6502(ram.__getitem__, ram.__setitem__, core, ram = ram)
+    results = []
+    for i in range(count) :
+        address = rng.randrange(0x0200, 0xBF00)
+        ram[address : address + 2] = bytes((rng.choice(BRANCHES), rng.randrange(0x100)))
+        for cache in (getattr(cpu, "translator", None), getattr(cpu, "decoder", None)) :
+            if cache is not None :                                              # the code changed behind the cpu's back
+                cache.flush()
+        cpu.setP(rng.randrange(0x100))
+        cpu.PC = address
+        start = clock.ticks
+        cpu.run(1)
+        results.append((address, cpu.PC, clock.ticks - start))
+    return results
+
+
+def compare(expected, state) :
+    """ the differences between two states, as text """
+
+    differences = []
+    for name in expected :
+        if name == "ram" and expected["ram"] != state["ram"] :
+            address = next(i for i in range(0x10000) if expected["ram"][i] != state["ram"][i])
+            differences.append(f"ram[{address:04X}]={state['ram'][address]:02X} instead of {expected['ram'][address]:02X}")
+        elif name != "ram" and expected[name] != state[name] :
+            differences.append(f"{name}={state[name]:X} instead of {expected[name]:X}")
+    return ", ".join(differences)
+
+
+if len(sys.argv) > 1 and not sys.argv[1].isdigit() :
+    print("Usage : puce6502CoresTests.py [programs] [instructions] [first seed]", end = '\n\n')
+    print("runs random programs (100) of random instructions (500), then 20 random branches per")
+    print("program, on every core and compares the registers, the RAM and the cycles with the")
+    print("ones of the tree core, from seed 0")
+    exit()
+
+programs = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+length = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+first = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+
+failures = 0
+for seed in range(first, first + programs) :
+    expected = run("tree", seed, length)
+    if expected["PC"] != END :
+        print(f"seed {seed} : the tree core did not reach {END:04X}")
+        failures += 1
+        continue
+    for core in CORES :
+        differences = compare(expected, run(core, seed, length))
+        if differences :
+            print(f"seed {seed} : {core} left {differences}")
+            failures += 1
+
+expected = branches("tree", first, programs * 20)
+for core in CORES :
+    for (address, PC, ticks), state in zip(expected, branches(core, first, programs * 20)) :
+        if state != (address, PC, ticks) :
+            print(f"branch at {address:04X} : {core} left PC={state[1]:X}, ticks={state[2]} instead of PC={PC:X}, ticks={ticks}")
+            failures += 1
+            break
+
+if failures :
+    print(f"\n{failures} failures")
+    exit(1)
+print(f"{programs} programs of {length} instructions and {programs * 20} branches, {', '.join(CORES)} : SUCCESS !")
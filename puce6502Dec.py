@@ -0,0 +1,236 @@
+"""
+    puce6502Dec, predecoded instruction cache for puce6502
+
+    The first time an instruction is executed, its opcode and operand are read
+    and decoded into an entry kept by address : the handler of the opcode, the
+    operand (the immediate value, the zero page or absolute address, or the
+    destination of a branch or a jump), the address of the next instruction
+    and the base cycle count. Running it again skips the fetch and the decode,
+    the handler is called with the operand and returns the new PC.
+
+    The 151 handlers are built once from the templates of puce6502Gen. Each one
+    loads from the cpu the registers it uses and writes back the ones it
+    modifies.
+
+    The entries work like the blocks of puce6502Jit : their pages are flagged
+    in 'code', every store checks the flag and throws away the entries of the
+    page it hit, so self-modifying code is decoded again. The entries above
+    $D000 are also keyed by the value returned by the optional 'bank' function
+    (Memory.getBank). The traps are called before the cache is looked up, the
+    pages they wrote into are invalidated.
+"""
+
+import alu
+import clock
+import collections
+import puce6502Gen
+import re
+
+
+LENGTHS = {"IMP" : 1, "ACC" : 1, "IMM" : 2, "REL" : 2,                          # instruction length for each addressing mode
+           "ZPG" : 2, "ZPX" : 2, "ZPY" : 2, "IZX" : 2, "IZY" : 2,
+           "ABS" : 3, "ABX" : 3, "ABY" : 3, "IND" : 3}
+
+REGISTERS = ("A", "X", "Y", "SP", "C", "Z", "I", "D", "B", "U", "V", "S")      # PC is passed to the handlers and returned
+
+BANKED = 0xD000                                                                 # entries from there may come from the ROM or the language card
+
+
+def nop(PC, operand) :                                                          # undefined opcodes, 1 byte and 0 cycle
+    return PC
+
+
+class Decoder(puce6502Gen.Generator) :
+
+    def __init__(self, cpu, bank = None) :
+
+        super().__init__(cpu.ram is not None)
+        self.cpu = cpu
+        self.bank = bank or (lambda : 0)                                        # what is mapped in $D000-$FFFF
+        self.entries = {}                                                       # decoded instructions below $D000, by address
+        self.banks = collections.defaultdict(dict)                              # decoded instructions above $D000, by bank then address
+        self.pages = [set() for page in range(0x100)]                           # addresses of the entries using each page
+        self.code = bytearray(0x100)                                            # flags the pages holding decoded instructions
+
+        self.namespace = {"clock" : clock,
+                          "ADDITION" : alu.ADDITION,
+                          "SUBTRACTION" : alu.SUBTRACTION,
+                          "cpu" : cpu,
+                          "read" : cpu.readMem,
+                          "write" : cpu.writeMem,
+                          "ram" : cpu.ram,
+                          "code" : self.code,
+                          "invalidate" : self.invalidate}
+        self.handlers = [self.handler(opcode) if opcode in puce6502Gen.OPCODES else nop for opcode in range(0x100)]
+
+
+    #===================================================================== CACHE
+
+    def run(self, cycleCount) :
+
+        cycleCount += clock.ticks                                               # cycleCount becomes the target ticks value
+        cpu = self.cpu
+        traps = cpu.traps
+        entries = self.entries
+        banks = self.banks
+        bank = self.bank
+        PC = cpu.PC
+
+        while clock.ticks < cycleCount :
+            if PC in traps :
+                cpu.PC = PC
+                pages = traps[PC](cpu)
+                if pages is not None :                                          # the trap did the work of the routine at PC
+                    for page in pages :
+                        if self.code[page] :
+                            self.invalidate(page)
+                    PC = cpu.PC
+                    continue
+            if PC < BANKED :
+                entry = entries.get(PC)
+            else :
+                entry = banks[bank()].get(PC)
+            if entry is None :
+                entry = self.decode(PC)
+            handler, operand, PC, cycles = entry
+            PC = handler(PC, operand)
+            clock.ticks += cycles
+
+        cpu.PC = PC
+        return PC
+
+
+    def decode(self, address) :
+        """ reads the instruction at address, caches its entry and returns it """
+
+        read = self.cpu.readMem
+        opcode = read(address)
+        if opcode not in puce6502Gen.OPCODES :
+            length, operand, cycles = 1, 0, 0
+        else :
+            mnemonic, mode, cycles = puce6502Gen.OPCODES[opcode]
+            length = LENGTHS[mode]
+            operand = read((address + 1) & 0xFFFF) if length > 1 else 0
+            if length > 2 :
+                operand |= read((address + 2) & 0xFFFF) << 8
+            if mode == "REL" :                                                  # the destination of the branch
+                offset = operand | 0xFF00 if operand & 0x80 else operand
+                operand = (address + 2 + offset) & 0xFFFF
+
+        entry = (self.handlers[opcode], operand, (address + length) & 0xFFFF, cycles)
+        if address < BANKED :
+            self.entries[address] = entry
+        else :
+            self.banks[self.bank()][address] = entry
+        for page in {address >> 8, ((address + length - 1) & 0xFFFF) >> 8} :
+            self.pages[page].add(address)
+            self.code[page] = 1
+        return entry
+
+
+    def invalidate(self, page) :
+        """ throws away the entries using this page """
+
+        for address in self.pages[page] :
+            if address < BANKED :
+                self.entries.pop(address, None)
+            else :
+                for entries in self.banks.values() :
+                    entries.pop(address, None)
+        self.pages[page].clear()
+        self.code[page] = 0
+
+
+    def flush(self) :
+        """ throws away every entry, after memory was modified behind the cpu's back """
+
+        for page in range(0x100) :
+            self.invalidate(page)
+
+
+    #================================================================== HANDLERS
+
+    def handler(self, opcode) :
+        """ compiles the function running opcode with a decoded operand """
+
+        mnemonic, mode, cycles = puce6502Gen.OPCODES[opcode]
+        self.stored = self.pushed = False
+        lines = getattr(self, mnemonic)(mnemonic, mode)
+        if self.stored :                                                        # hit a page holding decoded instructions ?
+            lines += ["if code[address >> 8] :",
+                      "    invalidate(address >> 8)"]
+        if self.pushed :
+            lines += ["if code[0x01] :",
+                      "    invalidate(0x01)"]
+
+        body = "\n".join(lines)
+        loaded = [register for register in REGISTERS if re.search(rf"\b{register}\b", body)]
+        stored = [register for register in loaded if re.search(rf"^\s*(\w+, )*{register}(, \w+)* *([-+&|^]|<<|>>)?= ", body, re.M)]
+        timed = re.search(r"\bticks\b", body) is not None                       # extra cycles, or a soft switch access
+
+        source  = [f"{register} = cpu.{register}" for register in loaded]
+        source += ["ticks = clock.ticks"] if timed else []
+        source += lines
+        source += [f"cpu.{register} = {register}" for register in stored]
+        source += ["clock.ticks = ticks"] if timed else []
+        source += ["return PC"]
+
+        code = "def handler(PC, operand, cpu = cpu, read = read, write = write, ram = ram, code = code, invalidate = invalidate, clock = clock, ADDITION = ADDITION, SUBTRACTION = SUBTRACTION) :\n"
+        code += "\n".join(puce6502Gen.indent(source)) + "\n"
+        exec(compile(code, f"<{mnemonic} {mode}>", "exec"), self.namespace)
+        return self.namespace["handler"]
+
+
+    def save(self, mode, value) :
+        self.stored = True
+        return super().save(mode, value)
+
+
+    def push(self, value) :
+        self.pushed = True
+        return super().push(value)
+
+
+    #========================================================== DECODED OPERANDS
+
+    def effective(self, mnemonic, mode) :
+
+        if mode == "ZPG" or mode == "ABS" :
+            return ["address = operand"]
+
+        if mode == "ZPX" or mode == "ZPY" :
+            return [f"address = (operand + {mode[2]}) & 0xFF"]
+
+        if mode == "ABX" or mode == "ABY" :
+            return ["address = operand"] + self.indexed(mnemonic, mode[2])
+
+        if mode == "IZX" :
+            return ["value8 = (operand + X) & 0xFF"] + self.pointer()
+
+        if mode == "IZY" :
+            return ["value8 = operand"] + self.pointer() + self.indexed(mnemonic, "Y")
+
+
+    def operand(self, mnemonic, mode, target = "value8") :
+        if mode == "IMM" :
+            return [f"{target} = operand"]
+        return self.effective(mnemonic, mode) + self.load(mode, target)
+
+
+    def JMP(self, mnemonic, mode) :
+        if mode == "ABS" :
+            return ["PC = operand"]
+        return ["address = operand"] + self.word("PC", "address")
+
+
+    def JSR(self, mnemonic, mode) :
+        back = ["PC = (PC - 1) & 0xFFFF"]                                       # the address pushed is the last byte of JSR
+        return back + self.push("PC >> 8") + self.push("PC & 0xFF") + ["PC = operand"]
+
+
+    def branch(self, mnemonic, mode) :
+        return [f"if {puce6502Gen.BRANCHES[mnemonic]} :",                       # branch taken, page crossing costs one more cycle
+                "    ticks += 2 if (PC ^ operand) & 0xFF00 else 1",
+                "    PC = operand"]
+
+    BPL = BMI = BVC = BVS = BCC = BCS = BNE = BEQ = branch
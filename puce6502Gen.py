@@ -0,0 +1,731 @@
+"""
+    puce6502Gen, source code generator for puce6502
+
+    Builds the python source of a cpu core from the description of the 151
+    documented opcodes, compiles it and binds it to a Puce6502 instance.
+
+    The generated run() keeps the registers, the flags and the cycle counter
+    in local variables for the whole call : they are loaded from the cpu when
+    run() is entered and written back when it returns. In between, clock.ticks
+    is only updated before the memory accesses that can reach the soft
+    switches (absolute and indirect addressing modes), as the speaker and the
+    paddles use it to measure durations.
+
+    The opcodes are dispatched with the same binary search tree as run() in
+    puce6502.py (5 levels, then if/elif on groups of 8 opcodes). Given a
+    profile of the executed opcodes (the instructionFrequencies format, see
+    frequencies()), the tree is instead the one doing the fewest comparisons
+    for that workload : the hot opcodes are tested first, the cold ones are
+    left deeper. Running this module prints the source of such a run() :
+
+        python puce6502Gen.py [instructionFrequencies]
+
+    The hottest sequences of instructions (FUSIONS) are fused : once the first
+    one is run, the opcode at PC is checked against the instructions that may
+    follow and the matching one is run from the same branch of the tree. The
+    next instruction is only fused while the run lasts, so the cycles counted
+    are the same as with a dispatch per instruction.
+
+    When the cpu is given the RAM bytearray (Puce6502 'ram' argument), the
+    generated code indexes it directly for the zero page, the stack and every
+    read below $C000. Stores outside the zero page still go through writeMem.
+
+    With lazy flags (the "lazy" core), the instructions setting N and Z only
+    keep their result in the NZ local variable. The flags are derived from it
+    when needed : by the branches, PHP and BRK, and when the registers are
+    written back to the cpu (traps, end of run()). NZ is a result byte, or
+    0x100 for N and Z both set, which no result gives but BIT, PLP and RTI.
+"""
+
+import alu
+import clock
+import re
+import sys
+import types
+
+
+OPCODES = {                                                                     # mnemonic, addressing mode and base cycles
+    0x00 : ("BRK", "IMP", 7),
+    0x01 : ("ORA", "IZX", 6),
+    0x05 : ("ORA", "ZPG", 3),
+    0x06 : ("ASL", "ZPG", 5),
+    0x08 : ("PHP", "IMP", 3),
+    0x09 : ("ORA", "IMM", 2),
+    0x0A : ("ASL", "ACC", 2),
+    0x0D : ("ORA", "ABS", 4),
+    0x0E : ("ASL", "ABS", 6),
+    0x10 : ("BPL", "REL", 2),
+    0x11 : ("ORA", "IZY", 5),
+    0x15 : ("ORA", "ZPX", 4),
+    0x16 : ("ASL", "ZPX", 6),
+    0x18 : ("CLC", "IMP", 2),
+    0x19 : ("ORA", "ABY", 4),
+    0x1D : ("ORA", "ABX", 4),
+    0x1E : ("ASL", "ABX", 7),
+    0x20 : ("JSR", "ABS", 6),
+    0x21 : ("AND", "IZX", 6),
+    0x24 : ("BIT", "ZPG", 3),
+    0x25 : ("AND", "ZPG", 3),
+    0x26 : ("ROL", "ZPG", 5),
+    0x28 : ("PLP", "IMP", 4),
+    0x29 : ("AND", "IMM", 2),
+    0x2A : ("ROL", "ACC", 2),
+    0x2C : ("BIT", "ABS", 4),
+    0x2D : ("AND", "ABS", 4),
+    0x2E : ("ROL", "ABS", 6),
+    0x30 : ("BMI", "REL", 2),
+    0x31 : ("AND", "IZY", 5),
+    0x35 : ("AND", "ZPX", 4),
+    0x36 : ("ROL", "ZPX", 6),
+    0x38 : ("SEC", "IMP", 2),
+    0x39 : ("AND", "ABY", 4),
+    0x3D : ("AND", "ABX", 4),
+    0x3E : ("ROL", "ABX", 7),
+    0x40 : ("RTI", "IMP", 6),
+    0x41 : ("EOR", "IZX", 6),
+    0x45 : ("EOR", "ZPG", 3),
+    0x46 : ("LSR", "ZPG", 5),
+    0x48 : ("PHA", "IMP", 3),
+    0x49 : ("EOR", "IMM", 2),
+    0x4A : ("LSR", "ACC", 2),
+    0x4C : ("JMP", "ABS", 3),
+    0x4D : ("EOR", "ABS", 4),
+    0x4E : ("LSR", "ABS", 6),
+    0x50 : ("BVC", "REL", 2),
+    0x51 : ("EOR", "IZY", 5),
+    0x55 : ("EOR", "ZPX", 4),
+    0x56 : ("LSR", "ZPX", 6),
+    0x58 : ("CLI", "IMP", 2),
+    0x59 : ("EOR", "ABY", 4),
+    0x5D : ("EOR", "ABX", 4),
+    0x5E : ("LSR", "ABX", 7),
+    0x60 : ("RTS", "IMP", 6),
+    0x61 : ("ADC", "IZX", 6),
+    0x65 : ("ADC", "ZPG", 3),
+    0x66 : ("ROR", "ZPG", 5),
+    0x68 : ("PLA", "IMP", 4),
+    0x69 : ("ADC", "IMM", 2),
+    0x6A : ("ROR", "ACC", 2),
+    0x6C : ("JMP", "IND", 5),
+    0x6D : ("ADC", "ABS", 4),
+    0x6E : ("ROR", "ABS", 6),
+    0x70 : ("BVS", "REL", 2),
+    0x71 : ("ADC", "IZY", 5),
+    0x75 : ("ADC", "ZPX", 4),
+    0x76 : ("ROR", "ZPX", 6),
+    0x78 : ("SEI", "IMP", 2),
+    0x79 : ("ADC", "ABY", 4),
+    0x7D : ("ADC", "ABX", 4),
+    0x7E : ("ROR", "ABX", 7),
+    0x81 : ("STA", "IZX", 6),
+    0x84 : ("STY", "ZPG", 3),
+    0x85 : ("STA", "ZPG", 3),
+    0x86 : ("STX", "ZPG", 3),
+    0x88 : ("DEY", "IMP", 2),
+    0x8A : ("TXA", "IMP", 2),
+    0x8C : ("STY", "ABS", 4),
+    0x8D : ("STA", "ABS", 4),
+    0x8E : ("STX", "ABS", 4),
+    0x90 : ("BCC", "REL", 2),
+    0x91 : ("STA", "IZY", 6),
+    0x94 : ("STY", "ZPX", 4),
+    0x95 : ("STA", "ZPX", 4),
+    0x96 : ("STX", "ZPY", 4),
+    0x98 : ("TYA", "IMP", 2),
+    0x99 : ("STA", "ABY", 5),
+    0x9A : ("TXS", "IMP", 2),
+    0x9D : ("STA", "ABX", 5),
+    0xA0 : ("LDY", "IMM", 2),
+    0xA1 : ("LDA", "IZX", 6),
+    0xA2 : ("LDX", "IMM", 2),
+    0xA4 : ("LDY", "ZPG", 3),
+    0xA5 : ("LDA", "ZPG", 3),
+    0xA6 : ("LDX", "ZPG", 3),
+    0xA8 : ("TAY", "IMP", 2),
+    0xA9 : ("LDA", "IMM", 2),
+    0xAA : ("TAX", "IMP", 2),
+    0xAC : ("LDY", "ABS", 4),
+    0xAD : ("LDA", "ABS", 4),
+    0xAE : ("LDX", "ABS", 4),
+    0xB0 : ("BCS", "REL", 2),
+    0xB1 : ("LDA", "IZY", 5),
+    0xB4 : ("LDY", "ZPX", 4),
+    0xB5 : ("LDA", "ZPX", 4),
+    0xB6 : ("LDX", "ZPY", 4),
+    0xB8 : ("CLV", "IMP", 2),
+    0xB9 : ("LDA", "ABY", 4),
+    0xBA : ("TSX", "IMP", 2),
+    0xBC : ("LDY", "ABX", 4),
+    0xBD : ("LDA", "ABX", 4),
+    0xBE : ("LDX", "ABY", 4),
+    0xC0 : ("CPY", "IMM", 2),
+    0xC1 : ("CMP", "IZX", 6),
+    0xC4 : ("CPY", "ZPG", 3),
+    0xC5 : ("CMP", "ZPG", 3),
+    0xC6 : ("DEC", "ZPG", 5),
+    0xC8 : ("INY", "IMP", 2),
+    0xC9 : ("CMP", "IMM", 2),
+    0xCA : ("DEX", "IMP", 2),
+    0xCC : ("CPY", "ABS", 4),
+    0xCD : ("CMP", "ABS", 4),
+    0xCE : ("DEC", "ABS", 6),
+    0xD0 : ("BNE", "REL", 2),
+    0xD1 : ("CMP", "IZY", 5),
+    0xD5 : ("CMP", "ZPX", 4),
+    0xD6 : ("DEC", "ZPX", 6),
+    0xD8 : ("CLD", "IMP", 2),
+    0xD9 : ("CMP", "ABY", 4),
+    0xDD : ("CMP", "ABX", 4),
+    0xDE : ("DEC", "ABX", 7),
+    0xE0 : ("CPX", "IMM", 2),
+    0xE1 : ("SBC", "IZX", 6),
+    0xE4 : ("CPX", "ZPG", 3),
+    0xE5 : ("SBC", "ZPG", 3),
+    0xE6 : ("INC", "ZPG", 5),
+    0xE8 : ("INX", "IMP", 2),
+    0xE9 : ("SBC", "IMM", 2),
+    0xEA : ("NOP", "IMP", 2),
+    0xEC : ("CPX", "ABS", 4),
+    0xED : ("SBC", "ABS", 4),
+    0xEE : ("INC", "ABS", 6),
+    0xF0 : ("BEQ", "REL", 2),
+    0xF1 : ("SBC", "IZY", 5),
+    0xF5 : ("SBC", "ZPX", 4),
+    0xF6 : ("INC", "ZPX", 6),
+    0xF8 : ("SED", "IMP", 2),
+    0xF9 : ("SBC", "ABY", 4),
+    0xFD : ("SBC", "ABX", 4),
+    0xFE : ("INC", "ABX", 7),
+}
+
+PAGECROSS = ("ADC", "AND", "CMP", "EOR", "LDA", "LDX", "LDY", "ORA", "SBC")     # ABX, ABY and IZY take one more cycle when crossing a page
+
+IOMODES = ("ABS", "ABX", "ABY", "IZX", "IZY")                                   # addressing modes able to reach the soft switches
+
+REGISTERS = ("A", "X", "Y", "SP", "PC", "C", "Z", "I", "D", "B", "U", "V", "S")
+
+BRANCHES = {"BPL" : "not S", "BMI" : "S", "BVC" : "not V", "BVS" : "V",         # condition for the branch to be taken
+            "BCC" : "not C", "BCS" : "C", "BNE" : "not Z", "BEQ" : "Z"}
+
+GETP = "(C + Z * 2 + I * 4 + D * 8 + B * 16 + U * 32 + V * 64 + S * 128)"       # inlined Puce6502.getP()
+
+FUSIONS = ((0x88, 0xD0), (0xCA, 0xD0), (0xC8, 0xD0), (0xE8, 0xD0),              # DEY, DEX, INY, INX then BNE : delay and copy loops
+           (0xE6, 0xD0), (0xC6, 0xD0),                                          # INC and DEC zero page, then BNE
+           (0x38, 0xE9, 0xD0), (0xE9, 0xD0), (0xC9, 0xD0), (0xC9, 0xF0),        # SEC, SBC # then BNE (Monitor WAIT), CMP # then BNE or BEQ
+           (0xBD, 0x10), (0xAD, 0x10),                                          # LDA then BPL : polling the keyboard and the disk
+           (0xEA, 0xEA, 0xEA))                                                  # NOP slides, as found by puce6502Pairs.py
+
+LAZYREGISTERS = ("A", "X", "Y", "SP", "PC", "C", "I", "D", "B", "U", "V")      # Z and S are derived from NZ
+
+LAZYBRANCHES = {**BRANCHES, "BPL" : "NZ < 0x80", "BMI" : "NZ > 0x7F",           # N is bit 7 of the result, or bit 8
+                "BNE" : "NZ & 0xFF", "BEQ" : "not NZ & 0xFF"}                   # Z is set by a null low byte
+
+LAZYGETP = GETP.replace("Z * 2", "(not NZ & 0xFF) * 2").replace("S * 128", "(NZ > 0x7F) * 128")
+
+
+def frequencies(filename) :
+    """ reads an opcode profile, lines like 'D0 = 21779502' """
+
+    profile = {}
+    with open(filename) as file :
+        for line in file :
+            match = re.match(r"^([0-9A-Fa-f]{2}) = (\d+)", line)                # other lines are ignored
+            if match :
+                profile[int(match.group(1), 16)] = int(match.group(2))
+    return profile
+
+
+def indent(lines, level = 1) :
+    return [("    " * level + line) if line else line for line in lines]
+
+
+RAMSIZE = 0xC000                                                                # reads below can index the RAM directly
+
+
+class Generator() :
+
+    def __init__(self, ram = False, traps = False, lazy = False, fusions = (), profile = None) :
+        self.ram = ram                                                          # index the RAM bytearray instead of calling read()
+        self.traps = traps                                                      # look for cpu.traps before each instruction
+        self.lazy = lazy                                                        # keep the last result in NZ instead of the N and Z flags
+        self.status = LAZYGETP if lazy else GETP                                # expression of the P register
+        self.branches = LAZYBRANCHES if lazy else BRANCHES
+        self.profile = profile                                                  # executed count of each opcode, shapes the dispatch tree
+        self.fusions = {}                                                       # the sequences to fuse, as a tree of opcodes
+        for sequence in fusions :
+            node = self.fusions
+            for opcode in sequence :
+                node = node.setdefault(opcode, {})
+
+
+    #==================================================================== MEMORY
+
+    def byte(self, target, address = "PC") :
+        """ lines reading the byte at address (a variable name) into target """
+
+        if not self.ram :
+            return [f"{target} = read({address})"]
+        return [f"{target} = ram[{address}] if {address} < 0x{RAMSIZE:04X} else read({address})"]
+
+
+    def word(self, target, address = "PC") :
+        """ lines reading the little endian word at address into target """
+
+        lines = [f"{target} = read({address}) | (read(({address} + 1) & 0xFFFF) << 8)"]
+        if not self.ram :
+            return lines
+        return [f"if {address} < 0x{RAMSIZE - 1:04X} :",
+                f"    {target} = ram[{address}] | (ram[{address} + 1] << 8)",
+                "else :"] + indent(lines)
+
+
+    def peek(self, address) :
+        """ expression reading the zero page or the stack """
+
+        return f"ram[{address}]" if self.ram else f"read({address})"
+
+
+    def poke(self, address, value) :
+        return f"ram[{address}] = {value}" if self.ram else f"write({address}, {value})"
+
+
+    #========================================================== ADDRESSING MODES
+
+    def effective(self, mnemonic, mode) :
+        """ lines leaving the effective address of the operand in 'address' """
+
+        if mode == "ZPG" :
+            return self.byte("address") + ["PC = (PC + 1) & 0xFFFF"]
+
+        if mode == "ZPX" or mode == "ZPY" :
+            return self.byte("address") + [f"address = (address + {mode[2]}) & 0xFF",
+                                           "PC = (PC + 1) & 0xFFFF"]
+
+        if mode == "ABS" :
+            return self.word("address") + ["PC = (PC + 2) & 0xFFFF"]
+
+        if mode == "ABX" or mode == "ABY" :
+            lines = self.word("address") + ["PC = (PC + 2) & 0xFFFF"]
+            return lines + self.indexed(mnemonic, mode[2])
+
+        if mode == "IZX" :
+            return self.byte("value8") + ["value8 = (value8 + X) & 0xFF",
+                                          "PC = (PC + 1) & 0xFFFF"] + self.pointer()
+
+        if mode == "IZY" :
+            lines = self.byte("value8") + ["PC = (PC + 1) & 0xFFFF"] + self.pointer()
+            return lines + self.indexed(mnemonic, "Y")
+
+
+    def pointer(self) :
+        """ reads the zero page pointer at 'value8' into 'address' """
+
+        return [f"address = {self.peek('value8')} | ({self.peek('(value8 + 1) & 0xFF')} << 8)"]
+
+
+    def indexed(self, mnemonic, index) :
+        lines = []
+        if mnemonic in PAGECROSS :
+            lines += [f"if (address & 0xFF) + {index} > 0xFF :",               # page crossed
+                      "    ticks += 1"]
+        return lines + [f"address = (address + {index}) & 0xFFFF"]
+
+
+    def sync(self, mode) :
+        """ lines updating clock.ticks before an access that may reach a soft switch """
+
+        return ["clock.ticks = ticks"] if mode in IOMODES else []
+
+
+    def load(self, mode, target = "value8") :
+        """ lines reading the memory at 'address' into target """
+
+        if not self.ram :
+            return self.sync(mode) + [f"{target} = read(address)"]
+        if mode not in IOMODES :                                                # zero page
+            return [f"{target} = ram[address]"]
+        return [f"if address < 0x{RAMSIZE:04X} :",
+                f"    {target} = ram[address]",
+                "else :"] + indent(self.sync(mode) + [f"{target} = read(address)"])
+
+
+    def save(self, mode, value) :
+        """ lines writing value into the memory at 'address' """
+
+        if self.ram and mode not in IOMODES :                                   # zero page
+            return [f"ram[address] = {value}"]
+        return self.sync(mode) + [f"write(address, {value})"]
+
+
+    def operand(self, mnemonic, mode, target = "value8") :
+        """ lines reading the operand of the instruction into target """
+
+        if mode == "IMM" :
+            return self.byte(target) + ["PC = (PC + 1) & 0xFFFF"]
+        return self.effective(mnemonic, mode) + self.load(mode, target)
+
+
+    #=================================================================== HELPERS
+
+    def nz(self, value) :
+        if self.lazy :
+            return [f"NZ = {value}"]
+        return [f"Z = {value} == 0",
+                f"S = {value} > 0x7F"]
+
+
+    def push(self, value) :
+        return [self.poke("0x100 + SP", value),
+                "SP = (SP - 1) & 0xFF"]
+
+
+    def pull(self, target) :
+        return ["SP = (SP + 1) & 0xFF",
+                f"{target} = {self.peek('0x100 + SP')}"]
+
+
+    def setP(self, value) :
+        lines = [f"C = {value} & 1",
+                 f"Z = ({value} >> 1) & 1",
+                 f"I = ({value} >> 2) & 1",
+                 f"D = ({value} >> 3) & 1",
+                 f"B = ({value} >> 4) & 1",
+                 f"U = ({value} >> 5) & 1",
+                 f"V = ({value} >> 6) & 1",
+                 f"S = {value} >> 7"]
+        if self.lazy :                                                          # a non null low byte when Z is clear, bit 8 for N
+            return lines[0:1] + lines[2:7] + [f"NZ = (~{value} & 2) | ({value} & 0x80) << 1"]
+        return lines
+
+
+    def store(self) :
+        """ lines writing the registers back to the cpu """
+
+        if not self.lazy :
+            return [f"cpu.{register} = {register}" for register in REGISTERS]
+        return [f"cpu.{register} = {register}" for register in LAZYREGISTERS] + \
+               ["cpu.Z = not NZ & 0xFF",
+                "cpu.S = NZ > 0x7F"]
+
+
+    def fetch(self) :
+        """ lines loading the registers from the cpu """
+
+        if not self.lazy :
+            return [f"{register} = cpu.{register}" for register in REGISTERS]
+        return [f"{register} = cpu.{register}" for register in LAZYREGISTERS] + \
+               ["NZ = (not cpu.Z) | cpu.S << 8"]
+
+
+    def readModifyWrite(self, mnemonic, mode, operation) :
+        if mode == "ACC" :
+            return operation("A") + self.nz("A")
+        return self.effective(mnemonic, mode) + self.load(mode) + \
+               operation("value8") + self.save(mode, "value8") + self.nz("value8")
+
+
+    #============================================================== INSTRUCTIONS
+
+    def ADC(self, mnemonic, mode) :
+        return self.operand(mnemonic, mode) + self.add("ADDITION")
+
+    def SBC(self, mnemonic, mode) :
+        return self.operand(mnemonic, mode) + self.add("SUBTRACTION")
+
+    def add(self, table) :                                                      # shared by ADC and SBC, see alu.py
+        return [f"A, C, V = {table}[D << 17 | C << 16 | A << 8 | value8]"] + self.nz("A")
+
+    def AND(self, mnemonic, mode) :
+        return self.operand(mnemonic, mode) + ["A &= value8"] + self.nz("A")
+
+    def ORA(self, mnemonic, mode) :
+        return self.operand(mnemonic, mode) + ["A |= value8"] + self.nz("A")
+
+    def EOR(self, mnemonic, mode) :
+        return self.operand(mnemonic, mode) + ["A ^= value8"] + self.nz("A")
+
+    def CMP(self, mnemonic, mode, register = "A") :
+        return self.operand(mnemonic, mode) + [f"value16 = ({register} - value8) & 0xFF",
+                                               f"C = {register} >= value8"] + self.nz("value16")
+
+    def CPX(self, mnemonic, mode) :
+        return self.CMP(mnemonic, mode, "X")
+
+    def CPY(self, mnemonic, mode) :
+        return self.CMP(mnemonic, mode, "Y")
+
+    def BIT(self, mnemonic, mode) :
+        if self.lazy :                                                          # Z from A & M, N from bit 7 of M moved to bit 8
+            return self.operand(mnemonic, mode) + ["NZ = (A & value8) | (value8 & 0x80) << 1",
+                                                   "V = (value8 >> 6) & 1"]
+        return self.operand(mnemonic, mode) + ["Z = (A & value8) == 0",
+                                               "V = (value8 >> 6) & 1",
+                                               "S = value8 >> 7"]
+
+    def LDA(self, mnemonic, mode) :
+        return self.operand(mnemonic, mode, "A") + self.nz("A")
+
+    def LDX(self, mnemonic, mode) :
+        return self.operand(mnemonic, mode, "X") + self.nz("X")
+
+    def LDY(self, mnemonic, mode) :
+        return self.operand(mnemonic, mode, "Y") + self.nz("Y")
+
+    def STA(self, mnemonic, mode) :
+        return self.effective(mnemonic, mode) + self.save(mode, "A")
+
+    def STX(self, mnemonic, mode) :
+        return self.effective(mnemonic, mode) + self.save(mode, "X")
+
+    def STY(self, mnemonic, mode) :
+        return self.effective(mnemonic, mode) + self.save(mode, "Y")
+
+    def ASL(self, mnemonic, mode) :
+        return self.readModifyWrite(mnemonic, mode, lambda r : [f"C = {r} >> 7",
+                                                                f"{r} = ({r} << 1) & 0xFF"])
+
+    def LSR(self, mnemonic, mode) :
+        return self.readModifyWrite(mnemonic, mode, lambda r : [f"C = {r} & 1",
+                                                                f"{r} >>= 1"])
+
+    def ROL(self, mnemonic, mode) :
+        return self.readModifyWrite(mnemonic, mode, lambda r : [f"value16 = ({r} << 1) | C",
+                                                                "C = value16 >> 8",
+                                                                f"{r} = value16 & 0xFF"])
+
+    def ROR(self, mnemonic, mode) :
+        return self.readModifyWrite(mnemonic, mode, lambda r : [f"value16 = ({r} >> 1) | (C << 7)",
+                                                                f"C = {r} & 1",
+                                                                f"{r} = value16"])
+
+    def INC(self, mnemonic, mode) :
+        return self.readModifyWrite(mnemonic, mode, lambda r : [f"{r} = ({r} + 1) & 0xFF"])
+
+    def DEC(self, mnemonic, mode) :
+        return self.readModifyWrite(mnemonic, mode, lambda r : [f"{r} = ({r} - 1) & 0xFF"])
+
+    def INX(self, mnemonic, mode) :
+        return ["X = (X + 1) & 0xFF"] + self.nz("X")
+
+    def INY(self, mnemonic, mode) :
+        return ["Y = (Y + 1) & 0xFF"] + self.nz("Y")
+
+    def DEX(self, mnemonic, mode) :
+        return ["X = (X - 1) & 0xFF"] + self.nz("X")
+
+    def DEY(self, mnemonic, mode) :
+        return ["Y = (Y - 1) & 0xFF"] + self.nz("Y")
+
+    def TAX(self, mnemonic, mode) :
+        return ["X = A"] + self.nz("X")
+
+    def TAY(self, mnemonic, mode) :
+        return ["Y = A"] + self.nz("Y")
+
+    def TXA(self, mnemonic, mode) :
+        return ["A = X"] + self.nz("A")
+
+    def TYA(self, mnemonic, mode) :
+        return ["A = Y"] + self.nz("A")
+
+    def TSX(self, mnemonic, mode) :
+        return ["X = SP"] + self.nz("X")
+
+    def TXS(self, mnemonic, mode) :
+        return ["SP = X"]
+
+    def CLC(self, mnemonic, mode) :
+        return ["C = 0"]
+
+    def SEC(self, mnemonic, mode) :
+        return ["C = 1"]
+
+    def CLI(self, mnemonic, mode) :
+        return ["I = 0"]
+
+    def SEI(self, mnemonic, mode) :
+        return ["I = 1"]
+
+    def CLD(self, mnemonic, mode) :
+        return ["D = 0"]
+
+    def SED(self, mnemonic, mode) :
+        return ["D = 1"]
+
+    def CLV(self, mnemonic, mode) :
+        return ["V = 0"]
+
+    def NOP(self, mnemonic, mode) :
+        return []
+
+    def PHA(self, mnemonic, mode) :
+        return self.push("A")
+
+    def PHP(self, mnemonic, mode) :
+        return self.push(self.status + " | 0x10")
+
+    def PLA(self, mnemonic, mode) :
+        return self.pull("A") + self.nz("A")
+
+    def PLP(self, mnemonic, mode) :
+        return self.pull("value8") + self.setP("(value8 | 0x20)")
+
+    def JMP(self, mnemonic, mode) :
+        if mode == "ABS" :
+            return self.word("PC")
+        return self.word("address") + self.word("PC", "address")
+
+    def JSR(self, mnemonic, mode) :
+        return self.word("address") + ["PC = (PC + 1) & 0xFFFF"] + \
+               self.push("PC >> 8") + self.push("PC & 0xFF") + ["PC = address"]
+
+    def RTS(self, mnemonic, mode) :
+        return self.pull("PC") + self.pull("address") + ["PC = ((address << 8) + PC + 1) & 0xFFFF"]
+
+    def RTI(self, mnemonic, mode) :
+        return self.pull("value8") + self.setP("value8") + \
+               self.pull("PC") + self.pull("address") + ["PC |= address << 8"]
+
+    def BRK(self, mnemonic, mode) :
+        return ["PC = (PC + 1) & 0xFFFF"] + self.push("PC >> 8") + self.push("PC & 0xFF") + \
+               self.push(self.status + " | 0x10") + ["I = 1",
+                                              "D = 0",
+                                              "PC = read(0xFFFE) | (read(0xFFFF) << 8)"]
+
+    def branch(self, mnemonic, mode) :
+        taken = self.byte("address") + ["PC = (PC + 1) & 0xFFFF",              # branch taken, page crossing costs one more cycle
+                                        "ticks += 1",
+                                        "if address & 0x80 :",
+                                        "    address |= 0xFF00",
+                                        "if ((PC & 0xFF) + address) & 0xFF00 :",
+                                        "    ticks += 1",
+                                        "PC = (PC + address) & 0xFFFF"]
+        return [f"if {self.branches[mnemonic]} :"] + indent(taken) + \
+               ["else :",                                                       # not taken, skip the offset
+                "    PC = (PC + 1) & 0xFFFF"]
+
+    BPL = BMI = BVC = BVS = BCC = BCS = BNE = BEQ = branch
+
+
+    #================================================================== DISPATCH
+
+    def instruction(self, opcode, fusions = None) :
+        mnemonic, mode, cycles = OPCODES[opcode]
+        lines = getattr(self, mnemonic)(mnemonic, mode) + [f"ticks += {cycles}"]
+        followers = (self.fusions if fusions is None else fusions).get(opcode)
+        return lines + self.fuse(followers) if followers else lines
+
+
+    def fuse(self, followers) :
+        """ lines running the next instruction if it follows in a fused sequence """
+
+        if self.ram :                                                           # never read the soft switches twice
+            fetch = f"inst = ram[PC] if PC < 0x{RAMSIZE:04X} else read(PC) if PC > 0xC0FF else 0x100"
+        else :
+            fetch = "inst = read(PC) if PC >> 8 != 0xC0 else 0x100"
+        lines = [fetch]
+        for opcode in followers :
+            mnemonic, mode, cycles = OPCODES[opcode]
+            test = f"{'elif' if len(lines) > 1 else 'if'} inst == 0x{opcode:02X} :"
+            lines += [test.ljust(24) + f"# {mode} {mnemonic}"]
+            lines += indent(["PC = (PC + 1) & 0xFFFF"] + self.instruction(opcode, followers))
+        condition = "ticks < cycleCount and PC not in traps" if self.traps else "ticks < cycleCount"
+        return [f"if {condition} :"] + indent(lines)
+
+
+    def tree(self, low, high) :
+        """ binary search tree down to groups of 8 opcodes, like run() does """
+
+        if high - low > 8 :
+            middle = (low + high) // 2
+            return [f"if inst < 0x{middle:02X} :"] + indent(self.tree(low, middle)) + \
+                   ["else :"] + indent(self.tree(middle, high))
+
+        return self.chain([opcode for opcode in range(low, high) if opcode in OPCODES])
+
+
+    def chain(self, opcodes) :
+        """ if/elif on the opcodes, in the given order """
+
+        lines = []
+        for opcode in opcodes :
+            mnemonic, mode, cycles = OPCODES[opcode]
+            test = f"{'elif' if lines else 'if'} inst == 0x{opcode:02X} :"
+            lines += [test.ljust(24) + f"# {mode} {mnemonic}"]
+            lines += indent(self.instruction(opcode))
+        return lines or ["pass"]
+
+
+    def weighted(self) :
+        """ search tree making the fewest comparisons for the profile """
+
+        weight = {opcode : self.profile.get(opcode, 0) + 1 for opcode in OPCODES}
+        opcodes = sorted(OPCODES)
+        weights = [weight[opcode] for opcode in opcodes]                        # + 1 above orders the opcodes never seen
+        count = len(opcodes)
+        costs = {}                                                              # comparisons made for opcodes[i:j], and where to split them
+        for length in range(1, count + 1) :
+            for i in range(count - length + 1) :
+                j = i + length
+                hottest = sorted(weights[i:j], reverse = True)                  # a chain tests the hottest opcodes first
+                best = (sum(hot * rank for rank, hot in enumerate(hottest, 1)), None)
+                total = sum(hottest)
+                for k in range(i + 1, j) :                                      # one 'inst <' test, then the best trees of each side
+                    cost = total + costs[i, k][0] + costs[k, j][0]
+                    if cost < best[0] :
+                        best = (cost, k)
+                costs[i, j] = best
+
+        def tree(i, j) :
+            split = costs[i, j][1]
+            if split is None :
+                return self.chain(sorted(opcodes[i:j], key = lambda opcode : -weight[opcode]))
+            return [f"if inst < 0x{opcodes[split]:02X} :"] + indent(tree(i, split)) + \
+                   ["else :"] + indent(tree(split, j))
+
+        return tree(0, count)
+
+
+    def source(self) :
+        """ the python source of run(cpu, cycleCount) """
+
+        lines  = ["read = cpu.readMem",
+                  "write = cpu.writeMem"]
+        lines += ["traps = cpu.traps"] if self.traps else []
+        lines += ["ram = cpu.ram"] if self.ram else []
+        lines += self.fetch()
+        lines += ["ticks = clock.ticks",
+                  "cycleCount += ticks",                                        # cycleCount becomes the target ticks value
+                  "",
+                  "while ticks < cycleCount :"]
+        if self.traps :                                                         # the trap works on the cpu, the registers go through it
+            trap  = self.store()
+            trap += ["clock.ticks = ticks",
+                     "if traps[PC](cpu) is not None :"]
+            trap += indent(self.fetch())
+            trap += indent(["ticks = clock.ticks",
+                            "continue"])
+            lines += indent(["if PC in traps :"] + indent(trap))
+        lines += indent(self.byte("inst") + ["PC = (PC + 1) & 0xFFFF"])
+        lines += indent(self.weighted() if self.profile else self.tree(0x00, 0x100))
+        lines += [""]
+        lines += self.store()
+        lines += ["clock.ticks = ticks",
+                  "return PC"]
+
+        return "\n".join(["def run(cpu, cycleCount, ADDITION = ADDITION, SUBTRACTION = SUBTRACTION) :", ""] + indent(lines)) + "\n"
+
+
+    def build(self, cpu) :
+        """ compiles the source and returns run() bound to cpu """
+
+        namespace = {"clock" : clock,
+                     "ADDITION" : alu.ADDITION,
+                     "SUBTRACTION" : alu.SUBTRACTION}
+        exec(compile(self.source(), "<puce6502Gen>", "exec"), namespace)
+        return types.MethodType(namespace["run"], cpu)
+
+
+if __name__ == "__main__" :
+    profile = frequencies(sys.argv[1]) if len(sys.argv) > 1 else None
+    print(Generator(True, True, False, FUSIONS, profile).source(), end = "")
@@ -0,0 +1,403 @@
+"""
+    puce6502Jit, basic block translator for puce6502
+
+    Translates the straight-line code starting at a given address into a
+    python function executing the whole block in one call. A block ends after
+    a branch, a jump, a subroutine call or return, a BRK, at the end of the
+    memory page or after MAXLENGTH instructions. The operands are read once at
+    translation time and inlined as constants, the instructions are generated
+    by the templates of puce6502Gen.
+
+    The blocks are cached by entry address and their pages are flagged in
+    'code'. Every store is followed by a look at this flag : when the write hit
+    a page holding compiled code, the blocks of this page are thrown away and
+    the running block returns right after the store, so that self-modifying
+    code executes what has just been written.
+
+    Blocks above $D000 are also keyed by the value returned by the optional
+    'bank' function (Memory.getBank), as the language card can map different
+    code at the same address.
+
+    Two kinds of loops are not executed iteration by iteration. A counted loop
+    (DEX, DEY, INX, INY, SBC #1 or DEC/INC of a zero page byte, then BNE back to
+    itself) is computed at once. A block jumping to itself without storing
+    anything and only reading memory, the push buttons or the keyboard is an
+    idle loop : when an iteration leaves every register unchanged, nothing can
+    happen until the next run() call, which brings new key presses, and the
+    clock is moved forward to the end of the run. The cycles skipped this way
+    are added up in 'skipped'. Reading $C000 takes the next key queued by
+    Keyctrl : a keyboard loop is only idle while the queue of the 'keyboard'
+    given by the machine is empty, and never without it.
+
+    A block starting at the address of one of the cpu's traps calls it first
+    and only runs its own code when the trap declines.
+"""
+
+import alu
+import clock
+import collections
+import puce6502Gen
+import re
+
+
+LENGTHS = {"IMP" : 1, "ACC" : 1, "IMM" : 2, "REL" : 2,                          # instruction length for each addressing mode
+           "ZPG" : 2, "ZPX" : 2, "ZPY" : 2, "IZX" : 2, "IZY" : 2,
+           "ABS" : 3, "ABX" : 3, "ABY" : 3, "IND" : 3}
+
+ENDINGS = ("BRK", "JMP", "JSR", "RTS", "RTI") + tuple(puce6502Gen.BRANCHES)     # instructions ending a block
+
+REGISTERS = ("A", "X", "Y", "SP", "C", "Z", "I", "D", "B", "U", "V", "S")      # PC only lives in the blocks as a local variable
+
+MAXLENGTH = 32                                                                  # maximum number of instructions per block
+
+BANKED = 0xD000                                                                 # blocks from there may come from the ROM or the language card
+
+QUIET = (0xC061, 0xC062)                                                        # soft switches read without side effects : push buttons
+
+KEYBOARD = 0xC000                                                               # read without side effect while no key is queued
+
+COUNTERS = {"DEX" : "X", "DEY" : "Y", "INX" : "X", "INY" : "Y",                 # instructions counting the iterations of a loop ending with BNE
+            "SBC" : "A", "DEC" : "value8", "INC" : "value8"}
+
+
+class Translator(puce6502Gen.Generator) :
+
+    def __init__(self, cpu, bank = None) :
+
+        super().__init__(cpu.ram is not None)
+        self.cpu = cpu
+        self.bank = bank or (lambda : 0)                                        # what is mapped in $D000-$FFFF
+        self.blocks = {}                                                        # blocks below $D000, by entry address
+        self.banks = collections.defaultdict(dict)                              # blocks above $D000, by bank then entry address
+        self.pages = [set() for page in range(0x100)]                           # entry addresses of the blocks using each page
+        self.code = bytearray(0x100)                                            # flags the pages holding compiled code
+        self.deadline = 0                                                       # ticks value ending the current run
+        self.skipped = 0                                                        # cycles skipped in idle and counted loops
+        self.keyboard = None                                                    # Keyctrl, makes the keyboard loops idle while its queue is empty
+
+        self.namespace = {"clock" : clock,
+                          "ADDITION" : alu.ADDITION,
+                          "SUBTRACTION" : alu.SUBTRACTION,
+                          "cpu" : cpu,
+                          "read" : cpu.readMem,
+                          "write" : cpu.writeMem,
+                          "ram" : cpu.ram,
+                          "code" : self.code,
+                          "invalidate" : self.invalidate,
+                          "translator" : self,
+                          "traps" : cpu.traps}
+
+
+    #===================================================================== CACHE
+
+    def run(self, cycleCount) :
+
+        cycleCount += clock.ticks                                               # cycleCount becomes the target ticks value
+        self.deadline = cycleCount
+        blocks = self.blocks
+        banks = self.banks
+        bank = self.bank
+        PC = self.cpu.PC
+
+        while clock.ticks < cycleCount :
+            if PC < BANKED :
+                block = blocks.get(PC)
+            else :
+                block = banks[bank()].get(PC)
+            if block is None :
+                block = self.translate(PC)
+            PC = block()                                                        # a block returns the address of the next one
+
+        self.cpu.PC = PC
+        return PC
+
+
+    def idle(self, period) :
+        """ moves the clock forward to the end of the run, by whole iterations of an idle loop """
+
+        cycles = (self.deadline - clock.ticks) // period * period
+        if cycles > 0 :
+            clock.ticks += cycles
+            self.skipped += cycles
+
+
+    def invalidate(self, page) :
+        """ throws away the blocks using this page """
+
+        for entry in self.pages[page] :
+            if entry < BANKED :
+                self.blocks.pop(entry, None)
+            else :
+                for blocks in self.banks.values() :
+                    blocks.pop(entry, None)
+        self.pages[page].clear()
+        self.code[page] = 0
+
+
+    def flush(self) :
+        """ throws away every block, after memory was modified behind the cpu's back """
+
+        for page in range(0x100) :
+            self.invalidate(page)
+
+
+    #=============================================================== TRANSLATION
+
+    def translate(self, entry) :
+        """ compiles the block starting at entry, caches it and returns it """
+
+        read = self.cpu.readMem
+        self.cycles = 0                                                         # base cycles of the instructions translated so far
+        self.jump = None                                                        # constant destination of the last instruction
+        self.pure = True                                                        # no store and no read with side effects so far
+        self.polled = False                                                     # reads the keyboard, idle only while no key is queued
+        lines = []
+        steps = []
+        address = entry
+        ended = False
+
+        for count in range(MAXLENGTH) :
+            opcode = read(address)
+            if opcode not in puce6502Gen.OPCODES :                              # undefined opcodes are 1 byte, 0 cycle nops
+                address = (address + 1) & 0xFFFF
+                continue
+
+            mnemonic, mode, cycles = puce6502Gen.OPCODES[opcode]
+            self.address = address
+            self.next = (address + LENGTHS[mode]) & 0xFFFF
+            self.operand8 = read((address + 1) & 0xFFFF) if LENGTHS[mode] > 1 else 0
+            self.operand16 = self.operand8 | (read((address + 2) & 0xFFFF) << 8 if LENGTHS[mode] > 2 else 0)
+
+            lines += [f"# {address:04X} {mnemonic} {mode}"]
+            lines += self.instruction(opcode)
+            steps += [(mnemonic, mode, cycles, self.operand8)]
+            address = self.next
+
+            if mnemonic in ENDINGS :
+                ended = True
+                break
+            if address >> 8 != entry >> 8 :                                     # stop at the end of the page
+                break
+            if address in self.cpu.traps :                                      # a trap starts its own block
+                break
+
+        last = (address - 1) & 0xFFFF                                           # last byte of the block
+        lines += ["EXIT PC" if ended else f"EXIT 0x{address:04X}"]
+        looping = self.jump == entry
+        if looping and len(steps) == 2 and steps[1][0] == "BNE" :
+            lines = self.counted(steps[0], address) + lines
+        if entry in self.cpu.traps :                                            # the trap runs first, the block is the fallback
+            lines = self.trap(entry) + lines
+
+        block = self.build(entry, lines, looping and self.pure, self.polled)
+        if entry < BANKED :
+            self.blocks[entry] = block
+        else :
+            self.banks[self.bank()][entry] = block
+        for page in {entry >> 8, last >> 8} :
+            self.pages[page].add(entry)
+            self.code[page] = 1
+        return block
+
+
+    def build(self, entry, lines, idle = False, polled = False) :
+        """ wraps the instructions into a function and compiles it """
+
+        body = "\n".join(lines)
+        loaded = [register for register in REGISTERS if re.search(rf"\b{register}\b", body)]
+        stored = [register for register in loaded if re.search(rf"^\s*(\w+, )*{register}(, \w+)* *([-+&|^]|<<|>>)?= ", body, re.M)]
+        timed = re.search(r"\bticks\b", body) is not None                       # only when a cycle count depends on the data
+
+        source  = [f"{register} = cpu.{register}" for register in loaded]
+        source += ["ticks = clock.ticks"] if timed else []
+        if idle :                                                               # to tell an iteration changing nothing
+            source += ["start = clock.ticks",
+                       f"before = [{', '.join(stored)}]"]
+        for line in lines :
+            if line.lstrip().startswith("EXIT ") :                              # epilogue, returning to the address given
+                margin = line[:len(line) - len(line.lstrip())]
+                source += [margin + exit for exit in self.epilogue(stored, timed, line.split()[1:])]
+            else :
+                source += [line]
+        if idle :
+            queued = " and not translator.keyboard.keyQueue" if polled else ""  # no key to read before the next run()
+            source[-1:-1] = [f"if PC == 0x{entry:04X} and [{', '.join(stored)}] == before{queued} :",
+                             "    translator.idle(clock.ticks - start)"]
+
+        code = "def block(cpu = cpu, read = read, write = write, ram = ram, code = code, invalidate = invalidate, clock = clock, translator = translator, traps = traps, ADDITION = ADDITION, SUBTRACTION = SUBTRACTION) :\n"
+        code += "\n".join(puce6502Gen.indent(source)) + "\n"
+        exec(compile(code, f"<block 0x{entry:04X}>", "exec"), self.namespace)
+        return self.namespace["block"]
+
+
+    def epilogue(self, stored, timed, arguments) :
+        """ lines syncing the cpu and the clock, then returning the next address """
+
+        target = arguments[0]
+        cycles = arguments[1] if len(arguments) > 1 else self.cycles            # a number or the name of a variable
+        lines  = [f"cpu.{register} = {register}" for register in stored]
+        lines += [f"clock.ticks = ticks + {cycles}" if timed else f"clock.ticks += {cycles}"]
+        return lines + [f"return {target}"]
+
+
+    #==================================================================== CHECKS
+
+    def instruction(self, opcode) :
+        """ the instruction, followed by the self-modifying code check """
+
+        mnemonic, mode, cycles = puce6502Gen.OPCODES[opcode]
+        self.stored = self.pushed = False
+        lines = getattr(self, mnemonic)(mnemonic, mode)
+        self.cycles += cycles
+
+        if self.stored :                                                        # hit a page holding compiled code ?
+            lines += ["if code[address >> 8] :",
+                      "    invalidate(address >> 8)",
+                      f"    EXIT 0x{self.next:04X} {self.cycles}"]
+        if self.pushed and mnemonic not in ENDINGS :                            # code in the stack page (JSR and BRK end the block anyway)
+            lines += ["if code[0x01] :",
+                      "    invalidate(0x01)",
+                      f"    EXIT 0x{self.next:04X} {self.cycles}"]
+        return lines
+
+
+    def sync(self, mode) :
+        return [f"clock.ticks = ticks + {self.cycles}"] if mode in puce6502Gen.IOMODES else []
+
+
+    def load(self, mode, target = "value8") :
+        if mode == "IZX" or mode == "IZY" :                                     # could reach any soft switch
+            self.pure = False
+        elif mode == "ABS" and self.operand16 == KEYBOARD and self.keyboard is not None :
+            self.polled = True
+        elif mode == "ABS" and 0xC000 <= self.operand16 < 0xD000 :
+            self.pure = self.pure and self.operand16 in QUIET
+        elif (mode == "ABX" or mode == "ABY") and 0xC000 - 0xFF <= self.operand16 < 0xD000 :
+            self.pure = False
+        return super().load(mode, target)
+
+
+    def save(self, mode, value) :
+        self.stored = True
+        self.pure = False
+        return super().save(mode, value)
+
+
+    def push(self, value) :
+        self.pushed = True
+        self.pure = False
+        return super().push(value)
+
+
+    def trap(self, entry) :
+        """ lines calling the trap at entry, then returning if it did the work """
+
+        return [f"pages = traps[0x{entry:04X}](cpu)",
+                "if pages is not None :",
+                "    for page in pages :",                                      # the trap wrote into these pages
+                "        if code[page] :",
+                "            invalidate(page)",
+                "    return cpu.PC"]
+
+
+    #===================================================================== LOOPS
+
+    def counted(self, step, exit) :
+        """ lines running a whole counted loop at once, before the code of a single iteration """
+
+        mnemonic, mode, cycles, operand = step
+        if mnemonic not in COUNTERS or mode not in ("IMP", "ZPG", "IMM") :
+            return []
+        if mnemonic == "SBC" and (mode != "IMM" or operand != 0x01) :
+            return []
+
+        counter = COUNTERS[mnemonic]
+        period = cycles + 3 + self.crossed                                      # the instruction and the branch taken
+        if mnemonic == "SBC" :                                                  # A - 1 down to 0, C stays set and V clear
+            guard, lines, last = "C and not D and A", [], ["A = 0", "V = False"]
+        elif mode == "ZPG" :                                                    # unless the zero page holds code
+            counterByte = f"0x{operand:02X}"
+            guard, lines, last = "not code[0x00]", [f"value8 = {self.peek(counterByte)}"], [self.poke(counterByte, "0")]
+        else :
+            guard, lines, last = None, [], [f"{counter} = 0"]
+
+        if mnemonic.startswith("IN") :
+            lines += [f"count = (0x100 - {counter}) & 0xFF or 0x100"]
+        else :
+            lines += [f"count = {counter} or 0x100"]
+        lines += [f"cycles = count * {period} - {1 + self.crossed}",            # the last branch is not taken
+                  "translator.skipped += cycles"]
+        lines += last + ["Z = True",
+                         "S = False",
+                         f"EXIT 0x{exit:04X} cycles"]
+        return [f"if {guard} :"] + puce6502Gen.indent(lines) if guard else lines
+
+
+    #============================================================ CONSTANT OPERANDS
+
+    def effective(self, mnemonic, mode) :
+
+        if mode == "ZPG" :
+            return [f"address = 0x{self.operand8:02X}"]
+
+        if mode == "ZPX" or mode == "ZPY" :
+            return [f"address = (0x{self.operand8:02X} + {mode[2]}) & 0xFF"]
+
+        if mode == "ABS" :
+            return [f"address = 0x{self.operand16:04X}"]
+
+        if mode == "ABX" or mode == "ABY" :
+            lines = []
+            if mnemonic in puce6502Gen.PAGECROSS :
+                lines += [f"if {mode[2]} > 0x{0xFF - (self.operand16 & 0xFF):02X} :",  # page crossed
+                          "    ticks += 1"]
+            return lines + [f"address = (0x{self.operand16:04X} + {mode[2]}) & 0xFFFF"]
+
+        if mode == "IZX" :
+            return [f"value8 = (0x{self.operand8:02X} + X) & 0xFF"] + self.pointer()
+
+        if mode == "IZY" :
+            low, high = self.peek(f"0x{self.operand8:02X}"), self.peek(f"0x{(self.operand8 + 1) & 0xFF:02X}")
+            return [f"address = {low} | ({high} << 8)"] + self.indexed(mnemonic, "Y")
+
+
+    def operand(self, mnemonic, mode, target = "value8") :
+        if mode == "IMM" :
+            return [f"{target} = 0x{self.operand8:02X}"]
+        return self.effective(mnemonic, mode) + self.load(mode, target)
+
+
+    def JMP(self, mnemonic, mode) :
+        if mode == "ABS" :
+            self.jump = self.operand16
+            return [f"PC = 0x{self.operand16:04X}"]
+        return [f"PC = read(0x{self.operand16:04X}) | (read(0x{(self.operand16 + 1) & 0xFFFF:04X}) << 8)"]
+
+
+    def JSR(self, mnemonic, mode) :
+        back = (self.address + 2) & 0xFFFF                                      # the address pushed is the last byte of JSR
+        return self.push(f"0x{back >> 8:02X}") + self.push(f"0x{back & 0xFF:02X}") + \
+               [f"PC = 0x{self.operand16:04X}"]
+
+
+    def BRK(self, mnemonic, mode) :
+        back = (self.address + 2) & 0xFFFF
+        return self.push(f"0x{back >> 8:02X}") + self.push(f"0x{back & 0xFF:02X}") + \
+               self.push(puce6502Gen.GETP + " | 0x10") + ["I = 1",
+                                                          "D = 0",
+                                                          "PC = read(0xFFFE) | (read(0xFFFF) << 8)"]
+
+
+    def branch(self, mnemonic, mode) :
+        offset = self.operand8 | 0xFF00 if self.operand8 & 0x80 else self.operand8
+        target = (self.next + offset) & 0xFFFF
+        crossed = ((self.next & 0xFF) + offset) & 0xFF00                         # same cycle count as the interpreter
+        self.jump = target
+        self.crossed = 1 if crossed else 0
+        return [f"if {puce6502Gen.BRANCHES[mnemonic]} :",                       # branch taken
+                f"    ticks += {2 if crossed else 1}",
+                f"    PC = 0x{target:04X}",
+                "else :",
+                f"    PC = 0x{self.next:04X}"]
+
+    BPL = BMI = BVC = BVS = BCC = BCS = BNE = BEQ = branch
@@ -0,0 +1,64 @@
+#!/bin/env python3
+
+"""
+    puce6502Pairs, mines the opcode sequences worth fusing from a trace
+
+    Reads a trace where each executed instruction is a line starting with its
+    address and its opcode in hexadecimal, like the ones printed by option a
+    of puce6502Tests.py :
+
+        3457 69 55     ADC #$55       A=AA  X=0E  Y=FF  S=FF ...
+
+    and counts the sequences of two and three instructions executed one after
+    the other. The most frequent ones are printed in the instructionFrequencies
+    format, with the share of the executed instructions they start, and can
+    be added to puce6502Gen.FUSIONS.
+
+    The counts of the single opcodes come first : with a count of 256, the
+    output is a profile of the workload for puce6502Gen (see frequencies()).
+
+    Usage : python puce6502Tests.py a | python puce6502Pairs.py [count]
+            python puce6502Pairs.py count trace.txt
+"""
+
+import sys, re, collections
+
+LINE = re.compile(r"^([0-9A-F]{4}) ([0-9A-F]{2}) ")                             # address and opcode of an executed instruction
+
+
+def mine(lines, lengths = (1, 2, 3)) :
+    """ counts the sequences of each length of opcodes found in the trace lines, in a single pass """
+
+    sequences = {length : collections.Counter() for length in lengths}
+    windows = {length : collections.deque(maxlen = length) for length in lengths}
+    total = 0
+    for line in lines :                                                         # a trace of millions of lines is never held in memory
+        match = LINE.match(line)
+        if not match :                                                          # not an instruction, breaks the sequences
+            for window in windows.values() :
+                window.clear()
+            continue
+        opcode = match.group(2)
+        total += 1
+        for length, window in windows.items() :
+            window.append(opcode)
+            if len(window) == length :
+                sequences[length][" ".join(window)] += 1
+    return sequences, total
+
+
+def main() :
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    trace = open(sys.argv[2]) if len(sys.argv) > 2 else sys.stdin
+
+    with trace :
+        sequences, total = mine(trace)
+    for length, counter in sequences.items() :
+        print(f"# {length} instructions, {total} executed")
+        for sequence, executed in counter.most_common(count) :
+            print(f"{sequence} = {executed}".ljust(24) + f"# {100 * executed / total:5.2f} %")
+        print()
+
+
+if __name__ == "__main__" :
+    main()
@@ -36,7 +36,7 @@
   to your will and verify your changes
 """
 
-import puce6502, clock
+import puce6502, puce6502Gen, clock
 import sys
 
 # mnemonics
@@ -90,7 +90,9 @@ def writeMem(address, value) :
 
 open('6502_functional_test.bin', 'rb').readinto(ram)
 
-cpu = puce6502.Puce6502(readMem, writeMem)
+core = sys.argv[2] if len(sys.argv) > 2 else "tree"                            # cpu core to test : tree (default), table, locals, lazy, decoded or blocks
+profile = puce6502Gen.frequencies(sys.argv[3]) if len(sys.argv) > 3 else None   # opcode profile shaping the dispatch of the locals and lazy cores
+cpu = puce6502.Puce6502(readMem, writeMem, core, ram = ram, profile = profile)  # the generated cores index the 48K below $C000 directly
 cpu.rst();                                                                      # reset the CPU
 cpu.PC = 0x400;                                                                 # set Program Counter to start of code
 
@@ -99,10 +101,12 @@ oldPC = cpu.PC
 newPC = cpu.PC                                                                  # for detecting the BNE $FE when a test fails
 
 
-if len(sys.argv)  != 2 :
-    print("Usage : puce6502Tests.py a|b", end = '\n\n')
+if len(sys.argv) < 2 :
+    print("Usage : puce6502Tests.py a|b [tree|table|locals|lazy|decoded|blocks] [profile]", end = '\n\n')
     print("where option a runs the functonnal test to check the Accurary of the emulation")
-    print("and option b runs the functonnal tests with no output for Benchmarking (total of 96240573 clock cycles)")
+    print("and option b runs the functonnal tests with no output for Benchmarking, until its success trap")
+    print("the optional second argument selects the cpu core to test (default is tree)")
+    print("the optional third one is an opcode profile, in the format of instructionFrequencies")
     exit()
 
 if sys.argv[1] == 'a' :
@@ -164,7 +168,11 @@ if sys.argv[1] == 'a' :
 
 else :                                                                           # Benchmarks
 
-    cpu.run(96240573)
+    while cpu.PC != 0x3469 and clock.ticks - oldticks < 200000000 :             # the cores count about 96 to 100 millions cycles
+        cpu.run(10000)
+    if cpu.PC != 0x3469 :
+        print(f"6502_functional_test failed @ {cpu.PC:04X}")
+        exit(1)
 
 
 
@@ -172,14 +180,14 @@ else :
     # test results :
 
     <--->
-    3457 69 55     ADC #$55       A=AA  X=0E  Y=FF  S=FF  *S=34  NVUB----   Cycles: 2   Total: 96240555
-    3459 C9 AA     CMP #$AA       A=AA  X=0E  Y=FF  S=FF  *S=34  -VUB--ZC   Cycles: 2   Total: 96240557
-    345B D0 FE     BNE $FE        A=AA  X=0E  Y=FF  S=FF  *S=34  -VUB--ZC   Cycles: 2   Total: 96240559
-    345D AD 0002   LDA $0200      A=2B  X=0E  Y=FF  S=FF  *S=34  -VUB---C   Cycles: 4   Total: 96240563
-    3460 C9 2B     CMP #$2B       A=2B  X=0E  Y=FF  S=FF  *S=34  -VUB--ZC   Cycles: 2   Total: 96240565
-    3462 D0 FE     BNE $FE        A=2B  X=0E  Y=FF  S=FF  *S=34  -VUB--ZC   Cycles: 2   Total: 96240567
-    3464 A9 F0     LDA #$F0       A=F0  X=0E  Y=FF  S=FF  *S=34  NVUB---C   Cycles: 2   Total: 96240569
-    3466 8D 0002   STA $0200      A=F0  X=0E  Y=FF  S=FF  *S=34  NVUB---C   Cycles: 4   Total: 96240573
+    3457 69 55     ADC #$55       A=AA  X=0E  Y=FF  S=FF  *S=34  NVUB----   Cycles: 2
+    3459 C9 AA     CMP #$AA       A=AA  X=0E  Y=FF  S=FF  *S=34  -VUB--ZC   Cycles: 2
+    345B D0 FE     BNE $FE        A=AA  X=0E  Y=FF  S=FF  *S=34  -VUB--ZC   Cycles: 2
+    345D AD 0002   LDA $0200      A=2B  X=0E  Y=FF  S=FF  *S=34  -VUB---C   Cycles: 4
+    3460 C9 2B     CMP #$2B       A=2B  X=0E  Y=FF  S=FF  *S=34  -VUB--ZC   Cycles: 2
+    3462 D0 FE     BNE $FE        A=2B  X=0E  Y=FF  S=FF  *S=34  -VUB--ZC   Cycles: 2
+    3464 A9 F0     LDA #$F0       A=F0  X=0E  Y=FF  S=FF  *S=34  NVUB---C   Cycles: 2
+    3466 8D 0002   STA $0200      A=F0  X=0E  Y=FF  S=FF  *S=34  NVUB---C   Cycles: 4
 
     Reached end of 6502_functional_test @ 3469 : SUCCESS !
 
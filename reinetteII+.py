@@ -4,7 +4,7 @@ import sys, os
 import ctypes
 from sdl2 import *                                                              # pip install pysdl2 pysdl2-dll
 
-import puce6502, memory, keyctrl, screen, speaker, paddle, disk, clock
+import puce6502, memory, keyctrl, screen, speaker, paddle, disk, clock, monitor, applesoft, savestate, rewind
 
 # import cProfile
 # from pstats import Stats, SortKey
@@ -32,6 +32,13 @@ F10  : toggle pause
 F11  : here is your RESET key
 F12  : power cycle
 
+SHIFT F6  : in turbo, render more often
+SHIFT F7  : in turbo, render less often
+SHIFT F9  : toggle turbo, unthrottled
+SHIFT F10 : rewind one second
+SHIFT F11 : save the state of the machine
+SHIFT F12 : restore it
+
 Joystick : 1,2,3 and 5 on keypad.
            CTRL and ALT for the buttons
 
@@ -49,18 +56,40 @@ paddle1 = paddle.Paddle()
 keyctrl = keyctrl.Keyctrl()                                                     # keyboard controller
 
 disk = disk.Disk()                                                              # instanciate one disk drive
-if len(sys.argv) > 1 :                                                          # load floppy if provided at command line
+if len(sys.argv) > 1 and not sys.argv[1].endswith(".state") :                   # load floppy if provided at command line
     disk.insertFloppy(sys.argv[1])
     screen.setWindowTitle("nib", os.path.basename(sys.argv[1][:-4]))            # adding name to title, removing the .nib extension
 
 mem = memory.Memory(disk, keyctrl, paddle0, paddle1, screen, speaker)           # memory has side effects on peripherals through soft swiches
-cpu = puce6502.Puce6502(mem.readMem, mem.writeMem)                              # cpu instantiation with pointer to functions to read and write  memory
+hle = monitor.Monitor(mem)                                                      # high level emulation of WAIT, SCROLL, HOME and CLREOL
+fpu = applesoft.Applesoft(mem)                                                  # and of the Applesoft FADD, FSUB, FMULT and FDIV
+traps = {**hle.traps, **fpu.traps}
+cpu = puce6502.Puce6502(mem.readMem, mem.writeMem, "tree", mem.getBank, mem.ram, traps) # cpu instantiation with pointer to functions to read and write  memory
+                                                                                # core : "tree", "table", "locals", "lazy", "decoded" or "blocks", the last two use getBank
+                                                                                # the ram is indexed directly by the "locals", "lazy", "decoded" and "blocks" cores
+                                                                                # traps : None to run the Monitor and Applesoft routines from the ROM
+if hasattr(cpu, "translator") :                                                 # the "blocks" core skips the keyboard loops while no key is queued
+    cpu.translator.keyboard = keyctrl
+
+stateFile = "reinette.state"                                                    # where SHIFT F11 saves the machine
+if len(sys.argv) > 1 and sys.argv[1].endswith(".state") :                       # or resume from a save state given at command line
+    stateFile = sys.argv[1]
+    try :
+        savestate.load(stateFile, cpu, mem)
+    except (OSError, ValueError) as error :                                     # the machine was left untouched, it boots as usual
+        screen.setWindowTitle("r/w", str(error), fade = 300)
+
+history = rewind.Rewind(cpu, mem, seconds = 10)                                 # the last ten emulated seconds, for SHIFT F10
 
 
 #===================================================================== MAIN LOOP
 
 running = True
 paused  = False
+turbo   = False                                                                 # SHIFT F9, the cpu runs as fast as the host allows
+turboFrames = 0                                                                 # in turbo, render every Nth frame, 0 : one frame per 1/FPS second
+skipped = 0                                                                     # frames run since the last one rendered
+turboStart = turboTicks = 0                                                     # when and at which tick it was rendered
 event = SDL_Event()
 
 while running :
@@ -77,9 +106,23 @@ while running :
         retries -= 1                                                            # retries prevents an infinite loop if motor don't go off
 
 
+    #================================================================ TURBO MODE
+
+    if turbo and not paused :
+        skipped += 1
+        elapsed = SDL_GetTicks() - turboStart
+        if skipped < turboFrames or (not turboFrames and elapsed < 1000.0 / screen.FPS) :
+            continue                                                            # no video, events nor rewind entry for this frame
+        screen.setWindowTitle("mhz", (clock.ticks - turboTicks) / max(elapsed, 1) / 1000)  # cycles per ms / 1000 = MHz
+        skipped, turboStart, turboTicks = 0, SDL_GetTicks(), clock.ticks
+
+    if not paused :
+        history.capture()                                                       # one rewind entry per frame, per rendered frame in turbo
+
+
     #============================================================== UPDATE VIDEO
 
-    screen.update(mem.ram)                                                      # refresh screen
+    screen.update(mem.ram, not turbo)                                           # refresh screen, without waiting in turbo
 
 
     #==================================================== CATCH USER INTERACTION
@@ -147,6 +190,16 @@ while running :
                 screen.toggleMonochrome()
                 continue
 
+            elif event.key.keysym.sym == SDLK_F6 and shift :                    # SHIFT F6 -> turbo renders more often
+                turboFrames = max(turboFrames - 1, 0)
+                screen.setWindowTitle("frames", turboFrames)
+                continue
+
+            elif event.key.keysym.sym == SDLK_F7 and shift :                    # SHIFT F7 -> turbo renders every Nth frame, N + 1
+                turboFrames += 1
+                screen.setWindowTitle("frames", turboFrames)
+                continue
+
             elif event.key.keysym.sym == SDLK_F6 :                              # F6 -> decrease window size
                 screen.setZoom(-1)
                 continue
@@ -159,15 +212,38 @@ while running :
                 screen.FPS -= 1
                 continue
 
+            elif event.key.keysym.sym == SDLK_F9 and shift :                    # SHIFT F9 -> toggle turbo
+                turbo = not turbo
+                screen.setWindowTitle("turbo", turbo)
+                speaker.setTurbo(turbo)
+                skipped, turboStart, turboTicks = 0, SDL_GetTicks(), clock.ticks
+                continue
+
             elif event.key.keysym.sym == SDLK_F9 :                              # F9 -> increase target FPS
                 screen.FPS += 1
                 continue
 
+            elif event.key.keysym.sym == SDLK_F10 and shift :                   # SHIFT F10 -> rewind one second
+                history.rewind(clock.CPU_FREQUENCY)                             # emulated time, whatever the frames rendered
+                continue
+
             elif event.key.keysym.sym == SDLK_F10 :                             # F10 -> toggle pause
                 paused = not paused
                 screen.setWindowTitle("paused", paused)
                 continue
 
+            elif event.key.keysym.sym == SDLK_F11 and shift :                   # SHIFT F11 -> save the state of the machine
+                savestate.save(stateFile, cpu, mem)
+                continue
+
+            elif event.key.keysym.sym == SDLK_F12 and shift :                   # SHIFT F12 -> restore it
+                if os.path.exists(stateFile) :
+                    try :
+                        savestate.load(stateFile, cpu, mem)
+                    except (OSError, ValueError) as error :                     # the machine goes on as it was
+                        screen.setWindowTitle("r/w", str(error), fade = 300)
+                continue
+
             elif event.key.keysym.sym == SDLK_F11 :                             # F11 -> reset the cpu
                 cpu.rst()
                 continue
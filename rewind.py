@@ -0,0 +1,139 @@
+"""
+    rewind, ring buffer of the last seconds of the machine
+
+    capture() is called once per frame. An entry holds the registers and
+    switches of the machine (savestate.pack()), the pages that changed since
+    the previous entry : the 256 bytes pages of the RAM and of the language
+    card, and the tracks of the floppy, and clock.ticks. The pages are found
+    by comparing the buffers with a shadow copy of the last entry.
+
+    Every 'keyframe' entries, a full copy of the buffers is taken instead, so
+    that restoring an entry never applies more than 'keyframe' deltas. The
+    entries are grouped behind their keyframe and the oldest group is dropped
+    once the remaining ones cover the requested seconds, or when the bytes
+    held go above the ceiling.
+
+    The seconds are emulated ones, counted in clock ticks, so that they hold
+    whatever the number of entries per second : in turbo mode an entry is
+    only captured for the frames rendered.
+"""
+
+import collections
+import savestate
+import clock
+
+
+class Rewind() :
+
+    def __init__(self, cpu, mem, seconds = 10, ceiling = 64 << 20, keyframe = 60) :
+
+        self.cpu = cpu
+        self.mem = mem
+        self.span = seconds * clock.CPU_FREQUENCY                               # cycles to keep at least
+        self.ceiling = ceiling                                                  # maximum bytes held, whatever the seconds
+        self.keyframe = keyframe                                                # entries between two full copies
+
+        self.buffers = [(mem.ram, 0x100), (mem.lgc, 0x100), (mem.bk2, 0x100),   # buffers and the size of their pages
+                        (mem.disk.data, 0x1A00)]                                # a page of the floppy is a track
+        self.shadows = [bytearray(buffer) for buffer, size in self.buffers]     # the buffers as of the last entry
+        self.groups = collections.deque()                                       # a keyframe and the deltas following it
+        self.entries = 0
+        self.size = 0                                                           # bytes held by the entries
+        self.captured = 0                                                       # bytes captured since the start, for the stats
+        self.count = 0                                                          # entries captured since the start
+        self.start = clock.ticks                                                # of the first capture, for the stats
+
+
+    def capture(self) :
+        """ records the current state, a keyframe or the pages changed since the last entry """
+
+        state = savestate.pack(self.cpu, self.mem)
+        if not self.groups or len(self.groups[-1]) >= self.keyframe :
+            pages = [bytes(buffer) for buffer, size in self.buffers]
+            for shadow, (buffer, size) in zip(self.shadows, self.buffers) :
+                shadow[:] = buffer
+            entry = (state, pages, True, clock.ticks)
+            self.groups.append([entry])
+        else :
+            pages = []
+            for index, (buffer, size) in enumerate(self.buffers) :
+                view, shadow = memoryview(buffer), memoryview(self.shadows[index])
+                for offset in range(0, len(buffer), size) :
+                    if view[offset : offset + size] != shadow[offset : offset + size] :
+                        page = bytes(view[offset : offset + size])
+                        shadow[offset : offset + size] = page
+                        pages.append((index, offset, page))
+            entry = (state, pages, False, clock.ticks)
+            self.groups[-1].append(entry)
+
+        size = self.sizeOf(entry)
+        self.size += size
+        self.captured += size
+        self.entries += 1
+        self.count += 1
+        self.trim()
+
+
+    def sizeOf(self, entry) :
+        state, pages, key, ticks = entry
+        if key :
+            return len(state) + sum(len(page) for page in pages)
+        return len(state) + sum(len(page) for index, offset, page in pages)
+
+
+    def trim(self) :
+        """ drops the oldest groups no longer needed, or above the ceiling """
+
+        newest = self.groups[-1][-1][3]
+        while len(self.groups) > 1 :
+            oldest = self.groups[0]
+            if newest - self.groups[1][0][3] < self.span and self.size <= self.ceiling : # the others would not cover the span
+                break
+            self.groups.popleft()
+            self.entries -= len(oldest)
+            self.size -= sum(self.sizeOf(entry) for entry in oldest)
+
+
+    def rewind(self, cycles) :
+        """ restores the newest state captured 'cycles' ago or before, or the oldest one, and forgets the newer entries
+
+            returns the cycles actually rewound
+        """
+
+        if not self.entries :
+            return 0
+        target = clock.ticks - cycles
+        keep = sum(entry[3] <= target for group in self.groups for entry in group) # entries left, the last one is restored
+        keep = max(keep, 1)                                                     # or the oldest one
+        while self.entries - len(self.groups[-1]) >= keep :                     # drop the newer groups
+            newest = self.groups.pop()
+            self.entries -= len(newest)
+            self.size -= sum(self.sizeOf(entry) for entry in newest)
+        group = self.groups[-1]
+        while self.entries > keep :                                             # then the newer entries of the last group
+            self.size -= self.sizeOf(group.pop())
+            self.entries -= 1
+
+        state, pages, key, ticks = group[0]                                     # the keyframe
+        for page, shadow, (buffer, size) in zip(pages, self.shadows, self.buffers) :
+            buffer[:] = page
+            shadow[:] = page
+        for state, pages, key, ticks in group[1:] :                             # then the deltas, the last state is restored
+            for index, offset, page in pages :
+                buffer, size = self.buffers[index]
+                buffer[offset : offset + size] = page
+                self.shadows[index][offset : offset + size] = page
+        now = clock.ticks
+        savestate.unpack(state, self.cpu, self.mem)                             # which invalidates the video and the cpu caches
+        return now - clock.ticks
+
+
+    def stats(self) :
+        """ emulated seconds held, bytes held and bytes captured per emulated second """
+
+        if not self.entries :
+            return 0, 0, 0
+        seconds = (self.groups[-1][-1][3] - self.groups[0][0][3]) / clock.CPU_FREQUENCY
+        elapsed = (self.groups[-1][-1][3] - self.start) / clock.CPU_FREQUENCY
+        perSecond = self.captured / elapsed if elapsed else 0
+        return seconds, self.size, perSecond
@@ -0,0 +1,129 @@
+"""
+    savestate, save states of the whole machine
+
+    A save state file is made of :
+    - a header, the MAGIC string and the VERSION of the format
+    - the registers and switches of the cpu, the language card, the disk
+      drive, the screen, the paddles, the keyboard and the speaker, and
+      clock.ticks, packed with the STATE structure
+    - the raw buffers : the 48K of RAM, the 12K and 4K of the language card
+      and the nibblelized floppy image
+
+    The buffers are written from memoryviews of the bytearrays of Memory and
+    Disk, no copy is made. A file is read whole and its size checked before
+    anything is restored : a file that is not a save state, or that is
+    truncated, raises ValueError and leaves the machine as it was.
+
+    Anything the cpu cores derived from the memory (the blocks of the "blocks"
+    core, the entries of the "decoded" one) is thrown away after a load.
+"""
+
+import struct
+import clock
+
+MAGIC = b"RII+"
+VERSION = 1
+
+HEADER = struct.Struct("<4sH")                                                  # magic, version
+
+STATE = struct.Struct("<BBBBHB"                                                 # cpu : A, X, Y, SP, PC and P
+                      "????B"                                                   # language card : LCWR, LCRD, LCBK2, LCWFF and the disk latch
+                      "???4?4?4?BBBBH"                                          # disk : readOnly, motorOn, writeMode, phases, pIdx, pIdxB, track, halfTrk, nibble
+                      "????"                                                    # screen : TEXT, MIXED, PAGE2, HIRES
+                      "BBddBBdd"                                                # paddles : pushButton, position, countdown, countdownTrigger
+                      "BBd"                                                     # keyboard latch, speaker state and previous tick
+                      "d")                                                      # clock.ticks, a float once the "blocks" core skipped cycles
+
+
+def buffers(mem) :
+    return (mem.ram, mem.lgc, mem.bk2, mem.disk.data)
+
+
+def pack(cpu, mem) :
+    """ the registers and switches of the machine, packed with STATE """
+
+    disk, screen, paddles = mem.disk, mem.screen, (mem.paddle0, mem.paddle1)
+    values  = [cpu.A, cpu.X, cpu.Y, cpu.SP, cpu.PC, cpu.getP()]
+    values += [mem.LCWR, mem.LCRD, mem.LCBK2, mem.LCWFF, mem.DLATCH]
+    values += [disk.readOnly, disk.motorOn, disk.writeMode]
+    values += disk.phases + disk.phasesB + disk.phasesBB
+    values += [disk.pIdx, disk.pIdxB, disk.track, disk.halfTrk, disk.nibble]
+    values += [screen.TEXT, screen.MIXED, screen.PAGE2, screen.HIRES]
+    for paddle in paddles :
+        values += [paddle.pushButton, paddle.position, paddle.countdown, paddle.countdownTrigger]
+    values += [mem.keyctrl.key, mem.speaker.SPKR, mem.speaker.previousTick]
+    values += [clock.ticks]
+    return STATE.pack(*values)
+
+
+def unpack(state, cpu, mem) :
+    """ restores the registers and switches packed by pack(), once the buffers are restored """
+
+    values = list(STATE.unpack(state))
+
+    def take(count) :
+        taken = values[:count]
+        del values[:count]
+        return taken
+
+    cpu.A, cpu.X, cpu.Y, cpu.SP, cpu.PC, P = take(6)
+    cpu.setP(P)
+
+    mem.LCWR, mem.LCRD, mem.LCBK2, mem.LCWFF, mem.DLATCH = take(5)
+    mem.lcState = None                                                          # forces the mapping of $D000-$FFFF
+    mem.mapLanguageCard()
+
+    disk = mem.disk
+    disk.readOnly, disk.motorOn, disk.writeMode = take(3)
+    disk.phases, disk.phasesB, disk.phasesBB = take(4), take(4), take(4)
+    disk.pIdx, disk.pIdxB, disk.track, disk.halfTrk, disk.nibble = take(5)
+
+    screen = mem.screen
+    TEXT, MIXED, PAGE2, HIRES = take(4)
+    screen.setTEXT(TEXT)                                                        # the setters update the video mode
+    screen.setMIXED(MIXED)
+    screen.setPAGE2(PAGE2)
+    screen.setHIRES(HIRES)
+    screen.invalidate()                                                         # the RAM changed, the last frame is stale
+
+    for paddle in (mem.paddle0, mem.paddle1) :
+        paddle.pushButton, paddle.position, paddle.countdown, paddle.countdownTrigger = take(4)
+
+    mem.keyctrl.key, mem.speaker.SPKR, mem.speaker.previousTick = take(3)
+    ticks, = take(1)
+    clock.ticks = int(ticks) if ticks.is_integer() else ticks
+
+    for cache in (getattr(cpu, "translator", None), getattr(cpu, "decoder", None)) :
+        if cache is not None :                                                  # memory changed behind the cpu's back
+            cache.flush()
+
+
+def save(filename, cpu, mem) :
+    """ writes the state of the machine into filename """
+
+    with open(filename, "wb") as file :
+        file.write(HEADER.pack(MAGIC, VERSION))
+        file.write(pack(cpu, mem))
+        for buffer in buffers(mem) :
+            file.write(memoryview(buffer))
+
+
+def load(filename, cpu, mem) :
+    """ restores the state of the machine saved into filename """
+
+    with open(filename, "rb") as file :
+        data = memoryview(file.read())
+    if len(data) < HEADER.size or HEADER.unpack_from(data)[0] != MAGIC :
+        raise ValueError(f"{filename} is not a save state")
+    magic, version = HEADER.unpack_from(data)
+    if version != VERSION :
+        raise ValueError(f"{filename} : unsupported save state version {version}")
+    size = HEADER.size + STATE.size + sum(len(buffer) for buffer in buffers(mem))
+    if len(data) != size :
+        raise ValueError(f"{filename} : damaged save state, {len(data)} bytes instead of {size}")
+
+    offset = HEADER.size + STATE.size                                           # checked, the machine can be overwritten
+    for buffer in buffers(mem) :
+        memoryview(buffer)[:] = data[offset : offset + len(buffer)]
+        offset += len(buffer)
+    unpack(data[HEADER.size : HEADER.size + STATE.size], cpu, mem)
@@ -0,0 +1,70 @@
+#!/bin/env python3
+
+"""
+  Tests of the save states
+
+  A machine boots a floppy for a while and is saved. The file is loaded by a
+  new machine and saved again : both files must be byte identical. Then the
+  new machine, and the first one back from where it went on, run the same
+  frames from the file : they must save the same file as the first machine
+  did when it first ran them. By default, the file is saved while DOS reads
+  the disk, in the middle of a track.
+
+  The machines run one after the other, they share clock.ticks.
+"""
+
+import headless, savestate
+import os, sys, tempfile
+
+
+def saved(machine, filename) :
+    """ saves the machine and returns the bytes of the file """
+
+    savestate.save(filename, machine.cpu, machine.mem)
+    with open(filename, "rb") as file :
+        return file.read()
+
+
+def loaded(machine, filename) :
+    """ loads the file into the machine, and saves it back into another file """
+
+    savestate.load(filename, machine.cpu, machine.mem)
+    return saved(machine, filename + ".again")
+
+
+if len(sys.argv) > 1 and not sys.argv[1].endswith(".nib") :
+    print("Usage : savestateTests.py [floppy.nib] [frames] [tree|table|locals|lazy|decoded|blocks ...]", end = '\n\n')
+    print("boots the floppy (DOS 3.3) for some frames (90), saves the machine, loads the file in a new")
+    print("machine and checks that saving it again gives the same bytes, and that the machines go on the same")
+    print("the optional last arguments select the cpu cores to test (default is tree)")
+    exit()
+
+floppy = sys.argv[1] if len(sys.argv) > 1 else "nib/DOS 3.3.nib"
+frames = int(sys.argv[2]) if len(sys.argv) > 2 else 90
+cores = sys.argv[3:] or ["tree"]
+
+failures = 0
+with tempfile.TemporaryDirectory() as directory :
+    filename = os.path.join(directory, "test.state")
+    for core in cores :
+        first = headless.Machine(floppy, core)
+        first.run(frames)
+        state = saved(first, filename)
+        first.run(frames // 2)
+        expected = saved(first, filename + ".later")
+
+        second = headless.Machine(floppy, core)
+        results = {"a new machine" : second, "the same machine" : first}
+        for name, machine in results.items() :
+            if loaded(machine, filename) != state :
+                print(f"{core} : {name} saves the state loaded with other bytes")
+                failures += 1
+            machine.run(frames // 2)
+            if saved(machine, filename + ".later") != expected :
+                print(f"{core} : {name} goes on differently from the state loaded")
+                failures += 1
+
+if failures :
+    print(f"\n{failures} failures")
+    exit(1)
+print(f"{floppy}, {frames} frames, {', '.join(cores)} : SUCCESS !")
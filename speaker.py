@@ -30,6 +30,7 @@ class Speaker() :
         self.buffer.append((ctypes.c_int * Speaker.BUFFER_LENGHT)())            # silence, when speaker hasn't been switched for a while
 
         self.muted = False                                                      # mute/unmute switch
+        self.turbo = False                                                      # silent while the cpu runs unthrottled
 
         for i in range(0, Speaker.BUFFER_LENGHT) :
             self.buffer[0][i] = -32
@@ -53,6 +54,11 @@ class Speaker() :
         self.muted = not self.muted
 
 
+    def setTurbo(self, value) :
+        self.turbo = value
+        audio.SDL_ClearQueuedAudio(self.device)                                 # drop the sound queued ahead
+
+
     def playSound(self) :
         """
         Plays sound
@@ -67,7 +73,7 @@ class Speaker() :
         duration = int((clock.ticks - self.previousTick) / Speaker.RATE)          # lenght of the square wave
         self.previousTick = clock.ticks
 
-        if not self.muted :
+        if not self.muted and not self.turbo :
             if duration > Speaker.BUFFER_LENGHT :
                 audio.SDL_QueueAudio(self.device, self.buffer[2], Speaker.BUFFER_LENGHT)  # silence
             else :
@@ -0,0 +1,385 @@
+"""
+    video, the video generation of the Apple II, without SDL
+
+    Video holds the video soft switches and the constants of the video modes.
+    render() generates the current page of TEXT, GR or HGR into 'pixels', a
+    280 x 192 framebuffer of RGB triplets, and png() encodes it. The glyphs are
+    read from the font bitmaps of assets/. Like the SDL renderer used to, it
+    keeps a cache of the video memory and only redraws the cells, and the
+    groups of 7 HGR dots, that changed since the last frame. A snapshot of the
+    displayed pages tells which rows changed, only those are scanned, and the
+    frame is skipped altogether when none did. Given the page flags of
+    Memory.trackVideo(), the pages written since the last frame tell it
+    instead, without copying the pages.
+
+    With backend "numpy", render() is the whole page rasterizer of videoNumpy
+    instead, when NumPy is installed.
+
+    screen.Screen uploads the framebuffer into its SDL window once per frame,
+    headless.Screen only renders it when asked for.
+"""
+
+import struct
+import zlib
+
+try :
+    import videoNumpy                                                           # optional, needs NumPy
+except ImportError :
+    videoNumpy = None
+
+
+class Video() :
+
+    #================================================================= CONSTANTS
+
+    WIDTH  = 280
+    HEIGHT = 192
+
+    GR_COLOR = [                                                                # the 16 low res colors
+        [0,   0,   0  ], [226, 57,  86 ], [28,  116, 205], [126, 110, 173],
+        [31,  129, 128], [137, 130, 122], [86,  168, 228], [144, 178, 223],
+        [151, 88,  34 ], [234, 108, 21 ], [158, 151, 143], [255, 206, 240],
+        [144, 192, 49 ], [255, 253, 166], [159, 210, 213], [255, 255, 255]
+    ]
+
+    HGR_COLORS = [                                                              # the high res colors (2 light levels)
+        [0,   0,   0  ], [144, 192,  49], [126, 110, 173], [255, 255, 255],
+        [0,   0,   0  ], [234, 108,  21], [ 86, 168, 228], [255, 255, 255],
+        [0,   0,   0  ], [ 63,  55,  86], [ 72,  96,  25], [255, 255, 255],
+        [0,   0,   0  ], [ 43,  84, 114], [117,  54,  10], [255, 255, 255]
+    ]
+
+    GR_OFFSET = [                                                               # helper for TEXT and GR video generation
+        0x0000, 0x0080, 0x0100, 0x0180, 0x0200, 0x0280, 0x0300, 0x0380,         # lines 0-7
+        0x0028, 0x00A8, 0x0128, 0x01A8, 0x0228, 0x02A8, 0x0328, 0x03A8,         # lines 8-15
+        0x0050, 0x00D0, 0x0150, 0x01D0, 0x0250, 0x02D0, 0x0350, 0x03D0          # lines 16-23
+    ]
+
+    HGR_OFFSET = [                                                              # helper for HGR video generation
+        0x0000, 0x0400, 0x0800, 0x0C00, 0x1000, 0x1400, 0x1800, 0x1C00,         # lines 0-7
+        0x0080, 0x0480, 0x0880, 0x0C80, 0x1080, 0x1480, 0x1880, 0x1C80,         # lines 8-15
+        0x0100, 0x0500, 0x0900, 0x0D00, 0x1100, 0x1500, 0x1900, 0x1D00,         # lines 16-23
+        0x0180, 0x0580, 0x0980, 0x0D80, 0x1180, 0x1580, 0x1980, 0x1D80,
+        0x0200, 0x0600, 0x0A00, 0x0E00, 0x1200, 0x1600, 0x1A00, 0x1E00,
+        0x0280, 0x0680, 0x0A80, 0x0E80, 0x1280, 0x1680, 0x1A80, 0x1E80,
+        0x0300, 0x0700, 0x0B00, 0x0F00, 0x1300, 0x1700, 0x1B00, 0x1F00,
+        0x0380, 0x0780, 0x0B80, 0x0F80, 0x1380, 0x1780, 0x1B80, 0x1F80,
+        0x0028, 0x0428, 0x0828, 0x0C28, 0x1028, 0x1428, 0x1828, 0x1C28,
+        0x00A8, 0x04A8, 0x08A8, 0x0CA8, 0x10A8, 0x14A8, 0x18A8, 0x1CA8,
+        0x0128, 0x0528, 0x0928, 0x0D28, 0x1128, 0x1528, 0x1928, 0x1D28,
+        0x01A8, 0x05A8, 0x09A8, 0x0DA8, 0x11A8, 0x15A8, 0x19A8, 0x1DA8,
+        0x0228, 0x0628, 0x0A28, 0x0E28, 0x1228, 0x1628, 0x1A28, 0x1E28,
+        0x02A8, 0x06A8, 0x0AA8, 0x0EA8, 0x12A8, 0x16A8, 0x1AA8, 0x1EA8,
+        0x0328, 0x0728, 0x0B28, 0x0F28, 0x1328, 0x1728, 0x1B28, 0x1F28,
+        0x03A8, 0x07A8, 0x0BA8, 0x0FA8, 0x13A8, 0x17A8, 0x1BA8, 0x1FA8,
+        0x0050, 0x0450, 0x0850, 0x0C50, 0x1050, 0x1450, 0x1850, 0x1C50,
+        0x00D0, 0x04D0, 0x08D0, 0x0CD0, 0x10D0, 0x14D0, 0x18D0, 0x1CD0,
+        0x0150, 0x0550, 0x0950, 0x0D50, 0x1150, 0x1550, 0x1950, 0x1D50,
+        0x01D0, 0x05D0, 0x09D0, 0x0DD0, 0x11D0, 0x15D0, 0x19D0, 0x1DD0,
+        0x0250, 0x0650, 0x0A50, 0x0E50, 0x1250, 0x1650, 0x1A50, 0x1E50,
+        0x02D0, 0x06D0, 0x0AD0, 0x0ED0, 0x12D0, 0x16D0, 0x1AD0, 0x1ED0,         # lines 168-183
+        0x0350, 0x0750, 0x0B50, 0x0F50, 0x1350, 0x1750, 0x1B50, 0x1F50,         # lines 176-183
+        0x03D0, 0x07D0, 0x0BD0, 0x0FD0, 0x13D0, 0x17D0, 0x1BD0, 0x1FD0          # lines 184-191
+    ]
+
+    NORMAL  = 0
+    INVERSE = 1
+    FLASH   = 2
+
+
+    def __init__(self, backend = "python") :
+
+        self.ATTRIBUTES = [ Video.NORMAL if x>0x7F else Video.INVERSE if x<0x40 else Video.FLASH for x in range(0x100)]
+
+        self.TEXT  = True                                                       # $C050 CLRTEXT   / $C051 SETTEXT
+        self.MIXED = False                                                      # $C052 CLRMIXED  / $C053 SETMIXED
+        self.PAGE2 = False                                                      # $C054 PAGE2 off / $C055 PAGE2 on
+        self.HIRES = False                                                      # $C056 GR        / $C057 HGR
+
+        self.previousMode = None                                                # mode of the last frame rendered, anything else flushes the caches
+        self.snapshot = None                                                    # the pages displayed by the last frame, see diffPages()
+        self.dirtyPages = None                                                  # or the pages written, flagged by Memory.trackVideo()
+        self.changed = True                                                     # False when the last render() had nothing to redraw
+        self.skippedFrames = 0
+
+        self.monochrome = False
+
+        self.FPS = 60.0                                                         # NTSC Frame Rate
+        self.frameNumber = 0                                                    # TEXT cursor flashes at 2Hz
+
+        self.title = {"paused" : False,                                         # update the window title with dynamic data
+                      "fps"    : self.FPS,
+                      "turbo"  : False,                                         # the emulated MHz instead of the FPS
+                      "frames" : 0,                                             # in turbo, one frame rendered every N, 0 : every 1/FPS second
+                      "mhz"    : 0.0,
+                      "r/w"    : '',
+                      "nib"    : 'no floppy',
+                      }
+        self.titleFade = 30
+
+        self.pixels = bytearray(Video.WIDTH * Video.HEIGHT * 3)                 # the framebuffer, RGB
+        self.rgbGR  = [bytes(color) * 7 for color in Video.GR_COLOR]            # a line of a GR block
+        self.rgbHGR = [bytes(color) for color in Video.HGR_COLORS]
+        self.hgrTables = [None, None]                                           # color and monochrome, built when first needed
+        self.normGlyphs = self.loadFont("assets/font-normal.bmp")
+        self.revGlyphs  = self.loadFont("assets/font-reverse.bmp")
+
+        self.backend = "numpy" if backend == "numpy" and videoNumpy else "python"  # falls back when NumPy is missing
+        if self.backend == "numpy" :
+            self.render = videoNumpy.Rasterizer(self).render                    # no cache, the whole page every time
+
+
+    def loadFont(self, filename) :
+        """ reads the 128 glyphs of a 1 bit font bitmap, 8 lines of 7 RGB pixels each """
+
+        with open(filename, "rb") as file :
+            bmp = file.read()
+        start, = struct.unpack_from("<I", bmp, 10)                              # where the pixels are
+        width, height = struct.unpack_from("<ii", bmp, 18)
+        palette = [bytes(reversed(bmp[54 + 4 * i : 57 + 4 * i])) for i in (0, 1)]  # BGRA to RGB
+        stride = (width + 31) // 32 * 4                                         # rows are padded to 4 bytes
+        glyphs = []
+        for glyph in range(128) :
+            lines = []
+            for line in range(8) :
+                row = start + (height - 1 - line) * stride                      # bottom-up bitmap
+                dots = b""
+                for x in range(glyph * 7, glyph * 7 + 7) :
+                    dots += palette[(bmp[row + (x >> 3)] >> (7 - (x & 7))) & 1]
+                lines.append(dots)
+            glyphs.append(lines)
+        return glyphs
+
+
+    def buildHgrTable(self) :
+        """ the 7 dots of every HGR byte, in color or monochrome
+
+            Two tables, for the first and the second byte of the groups of 14
+            dots render() draws, indexed by the byte and the left neighbour dot
+            in bit 8, give the 21 bytes of the 7 RGB dots. The groups start on
+            even columns, so the darker dots are always the odd ones of the
+            first byte and the even ones of the second : the column parity is
+            the choice of the table.
+        """
+
+        tables = []
+        for even in (0, 8) :                                                    # the first dot of the byte is darker for the second one
+            table = []
+            for pbit in (0, 1) :
+                for byte in range(0x100) :
+                    colorSet = (byte >> 7) * 4                                  # selected by bit 7
+                    dots, left, shade = b"", pbit, even
+                    for bit in range(7) :
+                        dot = (byte >> bit) & 1
+                        if self.monochrome :
+                            colorIdx = dot * 3                                  # black if bit==0, white if bit==1
+                        else :
+                            colorIdx = shade + colorSet + (dot << 1) + left
+                        dots += self.rgbHGR[colorIdx]
+                        left = dot
+                        shade = 0 if shade else 8                               # one pixel every other is darker
+                    table.append(dots)
+            tables.append(table)
+        self.hgrTables[self.monochrome] = tables
+        return tables
+
+
+    #======================= GETERS AND SETTERS FOR VIDEO RELATED SOFT SWITCHES
+
+    def setTEXT(self, value) :
+        self.TEXT = value
+
+    def setMIXED(self, value) :
+        self.MIXED = value
+
+    def setHIRES(self, value) :
+        self.HIRES = value
+
+    def setPAGE2(self, value) :
+        self.PAGE2 = value
+
+
+    def getTEXT(self) :
+        return self.TEXT
+
+    def getMIXED(self) :
+        return self.MIXED
+
+    def getHIRES(self) :
+        return self.HIRES
+
+    def getPAGE2(self) :
+        return self.PAGE2
+
+
+    #============================================================== WINDOW TITLE
+
+    def setWindowTitle(self, attribute, value, fade = 30) :
+        self.title[attribute] = value                                           # update the attribute
+        if attribute == "r/w" :                                                 # shown for fade frames
+            self.titleFade = fade
+
+
+    #=============================================================== FRAMEBUFFER
+
+    def invalidate(self) :
+        """ forgets the last frame, when the RAM changed behind the renderer """
+
+        self.previousMode = None                                                # flushes the caches
+        self.snapshot = None                                                    # and redraws every line, whatever the renderer
+
+
+    def diffPages(self, ram) :
+        """ the HGR lines and TEXT/GR rows whose bytes changed since the last frame
+
+            The displayed pages are compared with their snapshot of the last
+            frame, or, with dirtyPages, the flags of the pages written since
+            are read and cleared : when the mode, the page or the flashing
+            changed, or without snapshot, all the lines and rows are returned,
+            None when nothing changed and the frame can be skipped.
+        """
+
+        flashing = (self.TEXT or self.MIXED) and self.frameNumber % self.FPS > self.FPS / 2
+        state = (self.TEXT, self.MIXED, self.HIRES, self.PAGE2, self.monochrome, flashing)
+        hgrBase  = 0x2000 + self.PAGE2 * 0x2000 if not self.TEXT and self.HIRES else 0
+        textBase = 0x400 + self.PAGE2 * 0x0400 if self.TEXT or self.MIXED or not self.HIRES else 0
+
+        dirty = self.dirtyPages
+        if dirty is None :                                                      # a copy of the displayed pages
+            hgrPage  = ram[hgrBase : hgrBase + 0x2000] if hgrBase else b""
+            textPage = ram[textBase : textBase + 0x400] if textBase else b""
+        else :                                                                  # a copy of their flags, cleared for the next frame
+            hgrPage  = dirty[hgrBase >> 8 : (hgrBase >> 8) + 0x20] if hgrBase else b""
+            textPage = dirty[textBase >> 8 : (textBase >> 8) + 0x04] if textBase else b""
+            dirty[:] = bytes(len(dirty))
+
+        snapshot, self.snapshot = self.snapshot, (state, hgrPage, textPage)
+        if snapshot is None or snapshot[0] != state :
+            return range(192), range(24)
+        if dirty is not None :
+            if not any(hgrPage) and not any(textPage) :                         # nothing written
+                self.skippedFrames += 1
+                return None
+            lines = [line for line, offset in enumerate(Video.HGR_OFFSET) if hgrPage and hgrPage[offset >> 8]]  # a line never crosses a page
+            rows  = [row  for row,  offset in enumerate(Video.GR_OFFSET)  if textPage and textPage[offset >> 8]]
+            return lines, rows
+        previousHgr, previousText = snapshot[1], snapshot[2]
+        if hgrPage == previousHgr and textPage == previousText :                # a single comparison of each page
+            self.skippedFrames += 1
+            return None
+        lines = [line for line, offset in enumerate(Video.HGR_OFFSET) if hgrPage[offset : offset + 40] != previousHgr[offset : offset + 40]]
+        rows  = [row  for row,  offset in enumerate(Video.GR_OFFSET)  if textPage[offset : offset + 40] != previousText[offset : offset + 40]]
+        return lines, rows
+
+
+    def render(self, ram) :
+        """ generates the current video page into self.pixels, redrawing only what changed """
+
+        mode = (self.TEXT, self.MIXED, self.HIRES, self.monochrome)
+        if self.previousMode != mode :                                          # Clear the video caches when video mode change
+            self.TextCache   = [[-1 for x in range(40)] for y in range( 24)]
+            self.LoResCache  = [[-1 for x in range(40)] for y in range( 24)]
+            self.HiResCache  = [[-1 for x in range(40)] for y in range(192)]
+            self.previousBit = [[ 0 for x in range(40)] for y in range(192)]
+            self.previousMode = mode
+            self.snapshot = None                                                # and scan every line
+
+        pixels = self.pixels
+        changes = self.diffPages(ram)
+        self.changed = changes is not None
+        if not self.changed :                                                   # same pages, same frame
+            return pixels
+        lines, rows = changes
+        pitch = Video.WIDTH * 3                                                 # bytes per line
+
+        #========================================================= HGR VIDEO OUT
+
+        if not self.TEXT and self.HIRES :                                       # HIGH RES GRAPHICS, mixed or not
+            vRamBase = 0x2000 + self.PAGE2 * 0x2000
+            lastLine = 160 if self.MIXED else 192
+            first, second = self.hgrTables[self.monochrome] or self.buildHgrTable()
+            for line in lines :
+                if line >= lastLine :
+                    break
+                addr = vRamBase + Video.HGR_OFFSET[line]
+                cache = self.HiResCache[line]
+                previousBit = self.previousBit[line]
+                for col in range(0, 40, 2) :                                    # for every 7 horizontal dots
+                    word = (ram[addr + col + 1] << 8) + ram[addr + col]         # store the two next bytes into 'word'
+                    if cache[col] == word :                                     # check if this group of 7 dots need a redraw
+                        continue
+                    cache[col] = word                                           # update the video cache
+
+                    offset = line * pitch + col * 21
+                    dots = first[word & 0xFF | previousBit[col] << 8]           # the 7 dots of the first byte
+                    dots += second[word >> 8 | (word << 2) & 0x100]             # bit 6 is left of the second byte
+                    pixels[offset : offset + 42] = dots                         # the 14 dots at once
+                    pbit = (word >> 14) & 1                                     # the last dot, left of the next group
+
+                    if col < 37 and previousBit[col + 2] != pbit :              # check color franging effect on next dot
+                        previousBit[col + 2] = pbit                             # set pbit
+                        cache[col + 2] = -1                                     # invalidate video cache for the next dot
+
+        #========================================================== GR VIDEO OUT
+
+        elif not self.TEXT :                                                    # lOW RES GRAPHICS, mixed or not
+            vRamBase = 0x400 + self.PAGE2 * 0x0400
+            lastLine = 20 if self.MIXED else 24
+            for line in rows :
+                if line >= lastLine :
+                    break
+                cache = self.LoResCache[line]
+                for col in range(0, 40) :
+                    glyph = ram[vRamBase + Video.GR_OFFSET[line] + col]         # read video memory
+                    if cache[col] == glyph :
+                        continue
+                    cache[col] = glyph                                          # update the video cache
+                    offset = line * 8 * pitch + col * 21
+                    for y in range(8) :                                         # first nibble on top, second below
+                        pixels[offset : offset + 21] = self.rgbGR[glyph & 0x0F if y < 4 else glyph >> 4]
+                        offset += pitch
+
+        #======================================================== TEXT VIDEO OUT
+
+        if self.TEXT or self.MIXED :                                            # TEXT 40 COLUMNS, can be mixed with lo or hi res
+            vRamBase = 0x400 + self.PAGE2 * 0x0400
+            firstLine = 0 if self.TEXT else 20
+            flashing = self.frameNumber % self.FPS > self.FPS / 2               # flashing twice a second
+            for line in rows :
+                if line < firstLine :
+                    continue
+                cache = self.TextCache[line]
+                for col in range(0, 40) :
+                    glyph = ram[vRamBase + Video.GR_OFFSET[line] + col]         # read video memory
+                    glyphAttr = self.ATTRIBUTES[glyph]
+                    if glyphAttr != Video.FLASH and cache[col] == glyph :
+                        continue
+                    cache[col] = glyph                                          # update the video cache
+                    glyph &= 0x7F                                               # unset bit 7
+                    if glyph > 0x5F :
+                        glyph &= 0x3F                                           # shifts to match the ASCII codes
+                    if glyph < 0x20 :
+                        glyph |= 0x40
+                    if (glyphAttr == Video.NORMAL) or (glyphAttr == Video.FLASH and flashing) :
+                        dots = self.normGlyphs[glyph]
+                    else :                                                      # it's reverse or flashing off
+                        dots = self.revGlyphs[glyph]
+                    offset = line * 8 * pitch + col * 21
+                    for y in range(8) :
+                        pixels[offset : offset + 21] = dots[y]
+                        offset += pitch
+
+        return pixels
+
+
+    def png(self) :
+        """ the framebuffer encoded as a PNG file """
+
+        pitch = Video.WIDTH * 3
+        rows = b"".join(b"\x00" + self.pixels[y * pitch : (y + 1) * pitch] for y in range(Video.HEIGHT))  # filter type 0
+
+        def chunk(kind, data) :
+            return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+        header = struct.pack(">IIBBBBB", Video.WIDTH, Video.HEIGHT, 8, 2, 0, 0, 0)   # 8 bits RGB
+        return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b"")
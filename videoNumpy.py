@@ -0,0 +1,110 @@
+"""
+    videoNumpy, whole page rasterizer for video.Video using NumPy
+
+    render() generates the whole frame with a few array operations instead of
+    walking the video memory : the RAM is seen through a zero-copy view, the
+    page is gathered with indices precomputed from HGR_OFFSET and GR_OFFSET,
+    and the colors and glyphs are looked up in arrays. The HGR dots and their
+    fringing are decoded once, with vectorized bit operations, into the tables
+    of the 7 RGB dots of every byte, as the ones of video.Video. The frame is
+    written straight into video.pixels, through an array over the same
+    bytearray.
+
+    There is no cache, every frame that changed is generated whole, see
+    video.Video.diffPages() : that suits the batch and headless runs rendering
+    now and then. video.Video uses it when created with backend "numpy", and
+    falls back to its own renderer when NumPy is not installed.
+"""
+
+import numpy                                                                    # pip install numpy
+
+
+class Rasterizer() :
+
+    def __init__(self, video) :
+
+        self.video = video
+        self.frame = numpy.frombuffer(video.pixels, numpy.uint8).reshape(video.HEIGHT, video.WIDTH, 3)  # writes go to video.pixels
+
+        columns = numpy.arange(40)
+        self.hgrIndex = numpy.array(video.HGR_OFFSET)[:, None] + columns        # offsets of the 192 x 40 bytes in the HGR page
+        self.grIndex  = numpy.array(video.GR_OFFSET)[:, None] + columns         # offsets of the 24 x 40 cells in the TEXT/GR page
+
+        self.hgrTables = [None, None]                                           # color and monochrome, built when first needed
+        self.grColors  = numpy.array(video.GR_COLOR, numpy.uint8)
+        self.bottom = numpy.arange(8)[None, :, None] >= 4                       # the lower half of a GR block shows the high nibble
+
+        chars = numpy.arange(0x100) & 0x7F                                      # unset bit 7
+        chars = numpy.where(chars > 0x5F, chars & 0x3F, chars)                  # shifts to match the ASCII codes
+        self.chars = numpy.where(chars < 0x20, chars | 0x40, chars)
+        self.attributes = numpy.array(video.ATTRIBUTES)
+        self.glyphs = numpy.array([[list(b"".join(lines)) for lines in glyphs]  # normal and reverse, 128 glyphs of 8 x 7 RGB dots
+                                   for glyphs in (video.normGlyphs, video.revGlyphs)], numpy.uint8).reshape(2, 128, 8, 7, 3)
+
+
+    def buildHgrTable(self) :
+        """ the 21 RGB bytes of the 7 dots of every HGR byte
+
+            Indexed as the tables of video.Video : the byte and the left
+            neighbour dot in bit 8, one table for the first byte of the groups
+            of 14 dots, one for the second.
+        """
+
+        words = numpy.arange(0x200)[:, None]
+        bits = numpy.arange(7)                                                  # the 7 dots of the byte, bit 7 selects the colors
+        dots = (words >> bits) & 1
+        if self.video.monochrome :
+            colorIdx = [dots * 3] * 2                                           # black if bit==0, white if bit==1
+        else :
+            colorSet = (words >> 7) & 1
+            left = numpy.empty_like(dots)                                       # the dot on the left of each one
+            left[:, 0] = words[:, 0] >> 8
+            left[:, 1:] = dots[:, :-1]
+            shades = [((bits + parity) & 1) * 8 for parity in (0, 1)]           # the odd dots of the frame are darker
+            colorIdx = [shade + colorSet * 4 + dots * 2 + left for shade in shades]
+        colors = numpy.array(self.video.HGR_COLORS, numpy.uint8)
+        tables = [colors[index].reshape(0x200, 21) for index in colorIdx]
+        self.hgrTables[self.video.monochrome] = tables
+        return tables
+
+
+    def render(self, ram) :
+        """ generates the current video page into video.pixels """
+
+        video = self.video
+        video.changed = video.diffPages(ram) is not None
+        if not video.changed :                                                  # same pages, same frame
+            return video.pixels
+        memory = numpy.frombuffer(ram, numpy.uint8)                             # no copy
+        frame = self.frame
+
+        if not video.TEXT and video.HIRES :                                     # HIGH RES GRAPHICS, mixed or not
+            lastLine = 160 if video.MIXED else 192
+            page = memory[0x2000 + video.PAGE2 * 0x2000 :][: 0x2000]
+            first, second = self.hgrTables[video.monochrome] or self.buildHgrTable()
+            data = page[self.hgrIndex[:lastLine]].astype(numpy.int32)           # lastLine x 40 bytes
+            even, odd = data[:, 0::2], data[:, 1::2]
+            left = numpy.zeros_like(even)                                       # the last dot of the previous pair, black for the first one
+            left[:, 1:] = (odd[:, :-1] >> 6) & 1
+            groups = frame[:lastLine].reshape(lastLine, 20, 2, 21)              # the two bytes of the groups of 14 dots
+            groups[:, :, 0] = first[even | left << 8]
+            groups[:, :, 1] = second[odd | (even << 2) & 0x100]                 # bit 6 is left of the second byte
+
+        elif not video.TEXT :                                                   # lOW RES GRAPHICS, mixed or not
+            lastLine = 20 if video.MIXED else 24
+            page = memory[0x400 + video.PAGE2 * 0x400 :][: 0x400]
+            cells = page[self.grIndex[:lastLine]][:, None, :]                   # lastLine x 1 x 40
+            nibbles = numpy.where(self.bottom, cells >> 4, cells & 0x0F)        # lastLine x 8 x 40
+            frame[: lastLine * 8] = numpy.repeat(self.grColors[nibbles], 7, axis = 2).reshape(lastLine * 8, video.WIDTH, 3)
+
+        if video.TEXT or video.MIXED :                                          # TEXT 40 COLUMNS, can be mixed with lo or hi res
+            firstLine = 0 if video.TEXT else 20
+            page = memory[0x400 + video.PAGE2 * 0x400 :][: 0x400]
+            cells = page[self.grIndex[firstLine:]]
+            flashing = video.frameNumber % video.FPS > video.FPS / 2            # flashing twice a second
+            attributes = self.attributes[cells]
+            reverse = (attributes == video.INVERSE) | ((attributes == video.FLASH) & (not flashing))
+            glyphs = self.glyphs[reverse.astype(numpy.uint8), self.chars[cells]]   # rows x 40 x 8 x 7 x 3
+            frame[firstLine * 8 :] = glyphs.transpose(0, 2, 1, 3, 4).reshape(-1, video.WIDTH, 3)
+
+        return video.pixels